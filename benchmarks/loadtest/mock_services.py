@@ -0,0 +1,261 @@
+"""
+Local stand-ins for the Telegram Bot API, Sarvam (LLM, STT, TTS) and
+Gemini embeddings, with configurable latency and failure injection.
+
+Run on its own with:
+
+    uvicorn benchmarks.loadtest.mock_services:app --port 9100
+
+LOADTEST_MOCK_PROFILE may hold a JSON object (or a path to one) that
+overrides DEFAULT_PROFILE per service, e.g. {"sarvam_llm": {"median": 2.0}}.
+"""
+import os
+import json
+import math
+import time
+import uuid
+import base64
+import random
+import asyncio
+import hashlib
+from collections import Counter
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+# Latency is log-normal, fitted to the median and p99 in seconds
+DEFAULT_PROFILE = {
+    "telegram": {"median": 0.05, "p99": 0.3, "error_rate": 0.0, "rate_limit_rate": 0.0},
+    "telegram_file": {"median": 0.08, "p99": 0.4, "error_rate": 0.0},
+    "sarvam_llm": {"median": 1.2, "p99": 4.0, "error_rate": 0.0},
+    "sarvam_stt": {"median": 0.8, "p99": 2.5, "error_rate": 0.0},
+    "sarvam_tts": {"median": 0.9, "p99": 3.0, "error_rate": 0.0},
+    "gemini": {"median": 0.15, "p99": 0.6, "error_rate": 0.0},
+}
+
+# Voice files carry their transcript after this header so STT can echo it
+VOICE_HEADER = b"OggS-loadtest:"
+
+# 16 kbit/s Opus, for realistic voice note download sizes
+VOICE_BYTES_PER_SECOND = 2000
+
+# Bytes of TTS audio per character of reply text, about 24 kbit/s speech
+TTS_BYTES_PER_CHAR = 200
+
+LLM_REPLIES = [
+    "We are open from 9 AM to 9 PM on weekdays. Is there anything else I can help you with?",
+    "Yes, we deliver within 5 km of the store. Delivery usually takes 30 to 45 minutes.",
+    "Our most popular item is the paneer thali. Would you like to place an order?",
+    "You can pay by UPI, card or cash on delivery.",
+    "Sorry, that item is out of stock today. It should be back tomorrow morning.",
+]
+
+
+def load_profile() -> dict:
+    profile = {service: dict(settings) for service, settings in DEFAULT_PROFILE.items()}
+
+    override = os.getenv("LOADTEST_MOCK_PROFILE")
+    if override:
+        if os.path.isfile(override):
+            with open(override) as f:
+                override = f.read()
+        for service, settings in json.loads(override).items():
+            profile.setdefault(service, {}).update(settings)
+
+    return profile
+
+
+class ServiceModel:
+    """Latency and failure behaviour of one mocked service"""
+
+    def __init__(self, name: str, median: float, p99: float, error_rate: float = 0.0, rate_limit_rate: float = 0.0):
+        self.name = name
+        self.mu = math.log(max(median, 1e-6))
+        # z(0.99) = 2.326
+        self.sigma = max(math.log(max(p99, median) / max(median, 1e-6)) / 2.326, 0.0)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+
+    async def delay(self):
+        await asyncio.sleep(random.lognormvariate(self.mu, self.sigma))
+
+    def fails(self) -> bool:
+        return random.random() < self.error_rate
+
+    def rate_limited(self) -> bool:
+        return random.random() < self.rate_limit_rate
+
+
+PROFILE = load_profile()
+SERVICES = {name: ServiceModel(name, **settings) for name, settings in PROFILE.items()}
+
+calls = Counter()
+failures = Counter()
+started = time.monotonic()
+
+app = FastAPI(title="SunoHQ load test mocks")
+
+
+async def _simulate(service: str):
+    """Wait out the service latency; returns an error response to send instead, if any"""
+    model = SERVICES[service]
+    calls[service] += 1
+    await model.delay()
+
+    if model.rate_limited():
+        failures[f"{service}_429"] += 1
+        return JSONResponse(
+            {"ok": False, "error_code": 429, "description": "Too Many Requests: retry after 1", "parameters": {"retry_after": 1}},
+            status_code=429,
+        )
+
+    if model.fails():
+        failures[service] += 1
+        return JSONResponse({"ok": False, "error_code": 500, "description": "Injected failure"}, status_code=500)
+
+    return None
+
+
+@app.get("/_stats")
+def stats():
+    return {
+        "uptime_seconds": round(time.monotonic() - started, 1),
+        "calls": dict(calls),
+        "failures": dict(failures),
+        "profile": PROFILE,
+    }
+
+
+@app.post("/_reset")
+def reset():
+    calls.clear()
+    failures.clear()
+    return {"ok": True}
+
+
+# Telegram Bot API
+
+@app.get("/file/bot{token}/{file_path:path}")
+async def telegram_file(token: str, file_path: str):
+    error = await _simulate("telegram_file")
+    if error:
+        return error
+
+    # file_path is voice/<file_id>.ogg; the file id carries the transcript
+    file_id = os.path.splitext(os.path.basename(file_path))[0]
+    transcript = base64.urlsafe_b64decode(file_id.split("_", 1)[1] + "==").decode()
+
+    # About 15 characters of speech per second
+    body = VOICE_HEADER + transcript.encode()
+    size = len(transcript) * VOICE_BYTES_PER_SECOND // 15
+    return Response(body + b"\0" * max(0, size - len(body)), media_type="audio/ogg")
+
+
+@app.api_route("/bot{token}/{method}", methods=["GET", "POST"])
+async def telegram_method(token: str, method: str, request: Request):
+    error = await _simulate("telegram")
+    if error:
+        return error
+
+    if method == "getMe":
+        bot_id = int(token.split(":", 1)[0]) if token.split(":", 1)[0].isdigit() else 1
+        return {"ok": True, "result": {"id": bot_id, "is_bot": True, "first_name": "Load Test", "username": f"loadtest_{bot_id}_bot"}}
+
+    if method in ("setWebhook", "deleteWebhook"):
+        return {"ok": True, "result": True}
+
+    if method == "getWebhookInfo":
+        return {"ok": True, "result": {"url": "", "pending_update_count": 0}}
+
+    if method == "getFile":
+        file_id = request.query_params.get("file_id", "")
+        return {"ok": True, "result": {"file_id": file_id, "file_path": f"voice/{file_id}.ogg"}}
+
+    if method in ("sendMessage", "sendVoice", "sendChatAction"):
+        if method == "sendVoice":
+            await request.body()
+        return {"ok": True, "result": True if method == "sendChatAction" else {"message_id": calls["telegram"]}}
+
+    return JSONResponse({"ok": False, "error_code": 404, "description": "Not Found"}, status_code=404)
+
+
+# Sarvam
+
+@app.post("/v1/chat/completions")
+async def sarvam_chat(request: Request):
+    payload = await request.json()
+
+    error = await _simulate("sarvam_llm")
+    if error:
+        return error
+
+    question = payload["messages"][-1]["content"] if payload.get("messages") else ""
+    reply = LLM_REPLIES[int(hashlib.md5(question.encode()).hexdigest(), 16) % len(LLM_REPLIES)]
+
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": payload.get("model") or "sarvam-m",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": reply}}],
+    }
+
+
+@app.post("/speech-to-text")
+async def sarvam_stt(request: Request):
+    form = await request.form()
+    audio = await form["file"].read()
+
+    error = await _simulate("sarvam_stt")
+    if error:
+        return error
+
+    transcript = audio[len(VOICE_HEADER):].split(b"\0", 1)[0].decode() if audio.startswith(VOICE_HEADER) else ""
+    return {"request_id": uuid.uuid4().hex, "transcript": transcript, "language_code": "hi-IN"}
+
+
+@app.post("/text-to-speech")
+async def sarvam_tts(request: Request):
+    payload = await request.json()
+
+    error = await _simulate("sarvam_tts")
+    if error:
+        return error
+
+    audio = os.urandom(len(payload.get("text", "")) * TTS_BYTES_PER_CHAR)
+    return {"request_id": uuid.uuid4().hex, "audios": [base64.b64encode(audio).decode()]}
+
+
+# Gemini
+
+def _embedding(text: str, dimensions: int) -> list:
+    # Deterministic per text, so answer-cache and dedup behave as in production
+    seed = int(hashlib.sha256(text.encode()).hexdigest()[:16], 16)
+    vector = np.random.default_rng(seed).standard_normal(dimensions)
+    return (vector / np.linalg.norm(vector)).round(6).tolist()
+
+
+def _content_text(content: dict) -> str:
+    return " ".join(part.get("text", "") for part in (content or {}).get("parts", []))
+
+
+@app.post("/{version}/models/{target}")
+async def gemini_embed(version: str, target: str, request: Request):
+    payload = await request.json()
+
+    error = await _simulate("gemini")
+    if error:
+        return error
+
+    if target.endswith(":batchEmbedContents"):
+        requests = payload.get("requests", [])
+    else:
+        requests = [payload]
+
+    return {
+        "embeddings": [
+            {"values": _embedding(_content_text(item.get("content")), item.get("outputDimensionality") or 768)}
+            for item in requests
+        ]
+    }
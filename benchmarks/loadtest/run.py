@@ -0,0 +1,372 @@
+"""
+End-to-end load test of the Telegram webhook pipeline.
+
+Starts the mock services and the API server (with every external
+service pointed at the mocks and an in-memory Qdrant), seeds load test
+businesses with a small knowledge base, then replays synthetic text and
+voice updates across many bots and chats at a target rate (open loop,
+Poisson arrivals) and reports turn latency percentiles, throughput and
+error rates.
+
+The server still needs a Postgres database: DATABASE_URL is taken from
+the environment. Use a scratch database; seeded businesses are deleted
+at the end unless --keep is given.
+
+    python -m benchmarks.loadtest.run --bots 20 --rate 10 --duration 60
+"""
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import base64
+import random
+import asyncio
+import argparse
+import subprocess
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+SUCCESS_STATUSES = {"success", "voice_success", "ok"}
+
+TEXT_MESSAGES = [
+    # Small talk, skipped by the retrieval gate
+    "hi",
+    "thanks!",
+    "namaste",
+    # Profile questions, answered without the LLM
+    "What time do you open?",
+    "where are you located?",
+    "kya aap abhi khule hain?",
+    # Knowledge base questions, full RAG + LLM turns
+    "Do you deliver to Indiranagar?",
+    "What is the price of the paneer thali?",
+    "Can I pay with UPI?",
+    "Is the biryani spicy? And do you have a vegetarian version?",
+    "mujhe kal ke liye 4 logon ka table book karna hai",
+    "Do you have any offers this weekend?",
+]
+
+KNOWLEDGE_BASE = [
+    "We deliver within 5 km of the store. Delivery takes 30 to 45 minutes.",
+    "The paneer thali costs 220 rupees and includes two rotis, rice, dal and paneer butter masala.",
+    "We accept UPI, debit and credit cards, and cash on delivery.",
+    "Our chicken biryani is medium spicy. A vegetable biryani is also available.",
+    "Table reservations can be made for up to 10 people, one day in advance.",
+    "Every weekend we offer 15 percent off on orders above 500 rupees.",
+    "We are closed on public holidays.",
+    "Orders can be cancelled within 5 minutes of placing them.",
+]
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    # Nearest rank
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def latency_summary(values: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "p99": round(percentile(values, 99), 3),
+        "max": round(max(values), 3) if values else 0.0,
+    }
+
+
+def start_process(module_app: str, port: int, env: Dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", module_app, "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+
+
+async def wait_until_up(client: httpx.AsyncClient, url: str, process: Optional[subprocess.Popen], timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode}")
+        try:
+            if (await client.get(url)).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.25)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+class Bot:
+    def __init__(self, index: int, run_id: str):
+        self.token = f"{900000 + index}:loadtest-{run_id}-{uuid.uuid4().hex}"
+        self.business_id: Optional[str] = None
+        self.bot_uuid: Optional[str] = None
+
+
+async def seed_bots(client: httpx.AsyncClient, app_url: str, count: int, run_id: str) -> List[Bot]:
+    bots = [Bot(index, run_id) for index in range(count)]
+
+    async def seed(bot: Bot):
+        response = await client.post(f"{app_url}/api/business/", json={
+            "user_id": f"loadtest-{run_id}",
+            "bot_token": bot.token,
+            "business_name": f"Load Test Kitchen {bot.token.split(':')[0]}",
+            "category": "restaurant",
+            "language": "en-IN",
+            "location": "Indiranagar, Bengaluru",
+            "phone": "+91 98765 43210",
+            "operating_hours": {"weekday": "09:00-21:00", "weekend": "10:00-18:00"},
+        })
+        response.raise_for_status()
+        business = response.json()
+        bot.business_id = business["id"]
+        bot.bot_uuid = business["botUuid"]
+
+        response = await client.put(
+            f"{app_url}/api/qdrant/documents/{bot.business_id}",
+            json={"texts": KNOWLEDGE_BASE},
+        )
+        response.raise_for_status()
+
+    # A few at a time; seeding is not what is being measured
+    semaphore = asyncio.Semaphore(8)
+
+    async def bounded(bot: Bot):
+        async with semaphore:
+            await seed(bot)
+
+    await asyncio.gather(*(bounded(bot) for bot in bots))
+    return bots
+
+
+async def delete_bots(client: httpx.AsyncClient, app_url: str, bots: List[Bot]):
+    await asyncio.gather(*(
+        client.delete(f"{app_url}/api/business/{bot.business_id}")
+        for bot in bots if bot.business_id
+    ), return_exceptions=True)
+
+
+def make_update(update_id: int, chat_id: int, voice: bool) -> dict:
+    text = random.choice(TEXT_MESSAGES)
+    message = {
+        "message_id": update_id,
+        "date": int(time.time()),
+        "chat": {"id": chat_id, "type": "private"},
+        "from": {"id": chat_id, "is_bot": False, "first_name": f"Customer{chat_id}", "username": f"customer{chat_id}"},
+    }
+
+    if voice:
+        # The mock file server and STT recover the transcript from the file id
+        encoded = base64.urlsafe_b64encode(text.encode()).decode().rstrip("=")
+        message["voice"] = {
+            "file_id": f"{update_id}_{encoded}",
+            "file_unique_id": str(update_id),
+            "duration": max(1, len(text) // 15),
+            "mime_type": "audio/ogg",
+        }
+    else:
+        message["text"] = text
+
+    return {"update_id": update_id, "message": message}
+
+
+class Results:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Counter = Counter()
+        self.http_errors: Counter = Counter()
+
+    def record(self, channel: str, seconds: float, http_status: int, turn_status: str):
+        self.latencies[channel].append(seconds)
+        self.latencies["all"].append(seconds)
+        self.statuses[turn_status] += 1
+        if http_status != 200:
+            self.http_errors[http_status] += 1
+
+    @property
+    def completed(self) -> int:
+        return len(self.latencies["all"])
+
+    @property
+    def failed(self) -> int:
+        return sum(count for status, count in self.statuses.items() if status not in SUCCESS_STATUSES)
+
+
+async def replay(
+    client: httpx.AsyncClient,
+    app_url: str,
+    bots: List[Bot],
+    chats_per_bot: int,
+    rate: float,
+    duration: float,
+    voice_ratio: float,
+) -> Tuple[Results, float]:
+    results = Results()
+    update_ids = iter(range(1, 10 ** 9))
+    tasks = []
+
+    async def send(bot: Bot, update: dict, channel: str):
+        started = time.perf_counter()
+        try:
+            response = await client.post(f"{app_url}/api/telegram/webhook/{bot.bot_uuid}", json=update)
+            http_status = response.status_code
+            turn_status = response.json().get("status", "unknown") if http_status == 200 else f"http_{http_status}"
+        except httpx.HTTPError as e:
+            http_status, turn_status = 0, type(e).__name__
+        results.record(channel, time.perf_counter() - started, http_status, turn_status)
+
+    started = time.monotonic()
+    next_at = started
+
+    while next_at - started < duration:
+        await asyncio.sleep(max(0.0, next_at - time.monotonic()))
+
+        bot = random.choice(bots)
+        chat_id = int(bot.token.split(":")[0]) * 1000 + random.randrange(chats_per_bot)
+        voice = random.random() < voice_ratio
+        update = make_update(next(update_ids), chat_id, voice)
+        tasks.append(asyncio.create_task(send(bot, update, "voice" if voice else "text")))
+
+        next_at += random.expovariate(rate)
+
+    await asyncio.gather(*tasks)
+    return results, time.monotonic() - started
+
+
+def report(results: Results, elapsed: float, offered: float, mock_stats: Optional[dict]) -> dict:
+    return {
+        "offered_rate": offered,
+        "elapsed_seconds": round(elapsed, 1),
+        "completed": results.completed,
+        "throughput_per_second": round(results.completed / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(results.failed / results.completed, 4) if results.completed else 0.0,
+        "latency_seconds": {channel: latency_summary(values) for channel, values in results.latencies.items()},
+        "statuses": dict(results.statuses),
+        "http_errors": {str(code): count for code, count in results.http_errors.items()},
+        "upstream_calls": mock_stats.get("calls") if mock_stats else None,
+        "injected_failures": mock_stats.get("failures") if mock_stats else None,
+    }
+
+
+def print_report(summary: dict):
+    print(f"\nOffered {summary['offered_rate']}/s for {summary['elapsed_seconds']}s: "
+          f"{summary['completed']} turns, {summary['throughput_per_second']}/s, "
+          f"error rate {summary['error_rate']:.2%}")
+
+    print(f"\n{'channel':<8} {'count':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for channel, row in summary["latency_seconds"].items():
+        print(f"{channel:<8} {row['count']:>7} {row['p50']:>8.3f} {row['p95']:>8.3f} {row['p99']:>8.3f} {row['max']:>8.3f}")
+
+    print("\nTurn statuses: " + ", ".join(f"{status}={count}" for status, count in sorted(summary["statuses"].items())))
+    if summary["upstream_calls"] is not None:
+        print("Upstream calls: " + ", ".join(f"{name}={count}" for name, count in sorted(summary["upstream_calls"].items())))
+    if summary["injected_failures"]:
+        print("Injected failures: " + ", ".join(f"{name}={count}" for name, count in sorted(summary["injected_failures"].items())))
+
+
+async def main(args):
+    run_id = uuid.uuid4().hex[:8]
+    mock_url = f"http://127.0.0.1:{args.mock_port}"
+    app_url = args.app_url or f"http://127.0.0.1:{args.app_port}"
+    processes = []
+
+    mock_env = dict(os.environ)
+    if args.mock_profile:
+        mock_env["LOADTEST_MOCK_PROFILE"] = args.mock_profile
+
+    app_env = dict(os.environ)
+    app_env.update({
+        "TELEGRAM_API_BASE": mock_url,
+        "SARVAM_BASE_URL": mock_url,
+        "GEMINI_BASE_URL": mock_url,
+        "SARVAM_API_KEY": "loadtest",
+        "GEMINI_API_KEY": "loadtest",
+        "QDRANT_URL": ":memory:",
+    })
+    # Without BASE_URL the server does not re-register webhooks of real bots
+    app_env.pop("BASE_URL", None)
+
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        try:
+            if not args.no_mocks:
+                processes.append(start_process("benchmarks.loadtest.mock_services:app", args.mock_port, mock_env))
+                await wait_until_up(client, f"{mock_url}/_stats", processes[-1])
+
+            if not args.app_url:
+                processes.append(start_process("server.main:app", args.app_port, app_env))
+                await wait_until_up(client, f"{app_url}/ready", processes[-1])
+
+            print(f"Seeding {args.bots} bots...")
+            bots = await seed_bots(client, app_url, args.bots, run_id)
+
+            try:
+                if args.warmup:
+                    print(f"Warming up for {args.warmup:.0f}s...")
+                    await replay(client, app_url, bots, args.chats, args.rate, args.warmup, args.voice_ratio)
+
+                if not args.no_mocks:
+                    await client.post(f"{mock_url}/_reset")
+
+                print(f"Replaying {args.rate}/s for {args.duration:.0f}s across {args.bots} bots x {args.chats} chats...")
+                results, elapsed = await replay(
+                    client, app_url, bots, args.chats, args.rate, args.duration, args.voice_ratio
+                )
+            finally:
+                if not args.keep:
+                    await delete_bots(client, app_url, bots)
+
+            mock_stats = None if args.no_mocks else (await client.get(f"{mock_url}/_stats")).json()
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.wait()
+
+    summary = report(results, elapsed, args.rate, mock_stats)
+    print_report(summary)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+    if args.max_p95 is not None and summary["latency_seconds"]["all"]["p95"] > args.max_p95:
+        print(f"\np95 {summary['latency_seconds']['all']['p95']:.3f}s exceeds --max-p95 {args.max_p95}s")
+        return 1
+    return 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load test the Telegram webhook pipeline against local mocks")
+    parser.add_argument("--bots", type=int, default=20, help="businesses to seed")
+    parser.add_argument("--chats", type=int, default=50, help="customer chats per bot")
+    parser.add_argument("--rate", type=float, default=10.0, help="webhook updates per second")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=5.0, help="seconds of unmeasured load first")
+    parser.add_argument("--voice-ratio", type=float, default=0.3, help="fraction of updates that are voice notes")
+    parser.add_argument("--mock-profile", help="JSON (or path to JSON) overriding mock latency and failure rates")
+    parser.add_argument("--mock-port", type=int, default=9100)
+    parser.add_argument("--app-port", type=int, default=9200)
+    parser.add_argument("--app-url", help="use an already running server instead of starting one")
+    parser.add_argument("--no-mocks", action="store_true", help="do not start the mock services")
+    parser.add_argument("--max-connections", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument("--max-p95", type=float, help="exit non-zero if overall p95 exceeds this many seconds")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded businesses")
+    parser.add_argument("--output", help="write the summary as JSON")
+    parser.add_argument("--seed", type=int, help="random seed for a repeatable update mix")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.seed is not None:
+        random.seed(args.seed)
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,55 @@
+"""
+Run the micro-benchmarks against this machine's saved baseline.
+
+Fails (non-zero exit) when any benchmark's median is more than the
+threshold slower than in the baseline. When no baseline has been saved
+yet, or with --save-baseline, the run is recorded as the new baseline
+instead and nothing is compared.
+
+    python -m benchmarks.micro.compare
+    python -m benchmarks.micro.compare --save-baseline
+"""
+import os
+import sys
+import glob
+import argparse
+import subprocess
+
+MICRO_DIR = os.path.dirname(os.path.abspath(__file__))
+# Must match --benchmark-storage in pytest.ini
+STORAGE_DIR = os.path.join(MICRO_DIR, ".benchmarks")
+BASELINE_NAME = "baseline"
+DEFAULT_FAIL_THRESHOLD = "median:15%"
+
+
+def latest_baseline():
+    """Newest saved baseline run, or None"""
+    runs = glob.glob(os.path.join(STORAGE_DIR, "*", f"*_{BASELINE_NAME}.json"))
+    return max(runs, key=os.path.basename) if runs else None
+
+
+def main(args) -> int:
+    command = [sys.executable, "-m", "pytest", *args.pytest_args]
+    baseline = None if args.save_baseline else latest_baseline()
+
+    if baseline is None:
+        print(f"Saving a new baseline under {STORAGE_DIR}")
+        command.append(f"--benchmark-save={BASELINE_NAME}")
+    else:
+        print(f"Comparing against {os.path.relpath(baseline, MICRO_DIR)} (fail on {args.fail})")
+        command += [f"--benchmark-compare={baseline}", f"--benchmark-compare-fail={args.fail}"]
+
+    # pytest.ini and the storage path are relative to this directory
+    return subprocess.call(command, cwd=MICRO_DIR)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the micro-benchmarks with the saved baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="record this run as the new baseline")
+    parser.add_argument(
+        "--fail",
+        default=DEFAULT_FAIL_THRESHOLD,
+        help="pytest-benchmark regression threshold (default: %(default)s)",
+    )
+    parser.add_argument("pytest_args", nargs="*", help="extra arguments passed to pytest (after --)")
+    sys.exit(main(parser.parse_args()))
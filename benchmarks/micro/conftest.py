@@ -0,0 +1,145 @@
+import os
+import sys
+import json
+import random
+from types import ModuleType, SimpleNamespace
+
+import pytest
+
+# Import the server from the repository root without a live environment
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+os.environ.setdefault("SARVAM_API_KEY", "benchmark")
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ.setdefault("TRACING_ENABLED", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def _stub_prisma():
+    """Stand in for the Prisma client until `prisma generate` has been run"""
+    try:
+        from prisma import Json, Prisma  # noqa: F401
+        return
+    except (ImportError, RuntimeError):
+        pass
+
+    class Prisma:
+        def __init__(self, *args, **kwargs):
+            pass
+
+    class Json(dict):
+        pass
+
+    stub = ModuleType("prisma")
+    stub.Prisma = Prisma
+    stub.Json = Json
+    sys.modules["prisma"] = stub
+
+
+_stub_prisma()
+
+WORDS = (
+    "delivery order paneer thali biryani table booking price rupees weekend offer "
+    "open close timing location parking payment upi card cash refund cancel menu "
+    "vegetarian spicy family pack discount store kitchen"
+).split()
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+@pytest.fixture(scope="session")
+def rng():
+    return random.Random(1234)
+
+
+@pytest.fixture(scope="session")
+def large_business(rng):
+    """A business record as Prisma returns it, with every optional field filled"""
+    return SimpleNamespace(
+        id="0b7f3c2e-5d1a-4a7e-9d55-6c1f2f0f8e11",
+        botUuid="a3c5e7f9-1b2d-4f6a-8c0e-2d4f6a8c0e1b",
+        businessName="Sharma Family Restaurant & Caterers",
+        category="restaurant",
+        description=" ".join(sentence(rng, 18) for _ in range(20)),
+        language="hi-IN",
+        voiceSpeaker="shubh",
+        botPersona="warm, polite and concise; answers in the customer's language",
+        operatingHours=json.dumps({
+            "weekday": "09:00-22:30",
+            "weekend": "10:00-23:00",
+            "closed_days": ["Tuesday"],
+        }),
+        location="12th Main, HAL 2nd Stage, Indiranagar, Bengaluru 560038",
+        phone="+91 98450 12345",
+        email="orders@sharmafamily.example",
+        webhookEnabled=True,
+        status="active",
+        settings={"plan": "pro", "retrieval_gating": {"enabled": True, "min_content_tokens": 2}},
+    )
+
+
+@pytest.fixture(scope="session")
+def long_history(rng):
+    """500 stored messages as they come back from the Json[] column"""
+    messages = []
+    for index in range(500):
+        messages.append({
+            "role": "user" if index % 2 == 0 else "assistant",
+            "content": sentence(rng, 12 if index % 2 == 0 else 40),
+            "timestamp": f"2026-01-01T10:{index // 60 % 60:02d}:{index % 60:02d}",
+        })
+    return messages
+
+
+@pytest.fixture(scope="session")
+def qdrant_response(rng):
+    """A raw query_points response with 50 scored payloads"""
+    return {
+        "points": [
+            {
+                "id": f"00000000-0000-0000-0000-{index:012d}",
+                "version": 3,
+                "score": 0.95 - index * 0.01,
+                "payload": {
+                    "text": " ".join(sentence(rng, 20) for _ in range(3)),
+                    "business_id": "0b7f3c2e-5d1a-4a7e-9d55-6c1f2f0f8e11",
+                    "content_hash": f"{index:064x}",
+                },
+                "vector": None,
+            }
+            for index in range(50)
+        ]
+    }
+
+
+def _update(message: dict) -> bytes:
+    return json.dumps({"update_id": 912345678, "message": message}).encode()
+
+
+@pytest.fixture(scope="session")
+def text_update_body() -> bytes:
+    return _update({
+        "message_id": 4821,
+        "from": {"id": 5123456789, "is_bot": False, "first_name": "Priya", "username": "priya_b", "language_code": "en"},
+        "chat": {"id": 5123456789, "first_name": "Priya", "username": "priya_b", "type": "private"},
+        "date": 1760870400,
+        "text": "Do you deliver to Koramangala, and what is the price of the family biryani pack?",
+    })
+
+
+@pytest.fixture(scope="session")
+def voice_update_body() -> bytes:
+    return _update({
+        "message_id": 4822,
+        "from": {"id": 5123456789, "is_bot": False, "first_name": "Priya", "username": "priya_b", "language_code": "hi"},
+        "chat": {"id": 5123456789, "first_name": "Priya", "username": "priya_b", "type": "private"},
+        "date": 1760870460,
+        "voice": {
+            "duration": 7,
+            "mime_type": "audio/ogg",
+            "file_id": "AwACAgUAAxkBAAIBQ2bX4zVd8s9kY2J1ZkQ4b1h2ZTBmAAKgEAACq3fxVkYAAZ-5W8kz2TUE",
+            "file_unique_id": "AgADoBAAAqt38VY",
+            "file_size": 14230,
+        },
+    })
@@ -0,0 +1,147 @@
+"""
+Micro-benchmarks of the pure-Python work done on every Telegram turn.
+See benchmarks/README.md for saving baselines and comparing against them.
+"""
+import json
+from types import SimpleNamespace
+
+import msgspec
+import pytest
+
+from server.core.conversation import ConversationService
+from server.core.rag import format_rag_context
+from server.core.sarvam_llm import sarvam_llm_service
+from server.handlers import business_handlers
+from server.handlers.business_handlers import BusinessCRUD
+from server.models.models import BusinessUpdate
+from server.models.telegram_models import decode_update
+from server.utils.qdrant_utils import clean_qdrant_response
+import server.core.conversation as conversation_module
+
+
+def run_sync(coro):
+    """Drive a coroutine that never really suspends, without an event loop"""
+    try:
+        coro.send(None)
+    except StopIteration as done:
+        return done.value
+    raise RuntimeError("coroutine suspended; use a real event loop")
+
+
+class _FakeTable:
+    """Stands in for a Prisma model client; returns immediately"""
+
+    def __init__(self, record=None):
+        self.record = record
+
+    async def find_unique(self, where):
+        return self.record
+
+    async def update(self, where, data):
+        return data
+
+
+@pytest.fixture
+def fake_prisma(monkeypatch, long_history):
+    conversation = SimpleNamespace(id="conversation-1", messages=long_history)
+    prisma = SimpleNamespace(conversation=_FakeTable(conversation), business=_FakeTable())
+    monkeypatch.setattr(conversation_module, "prisma", prisma)
+    monkeypatch.setattr(business_handlers, "prisma", prisma)
+    return prisma
+
+
+# Prompt building
+
+def test_build_system_prompt(benchmark, large_business):
+    prompt = benchmark(sarvam_llm_service.build_system_prompt, large_business)
+    assert large_business.businessName in prompt
+
+
+# Conversation history
+
+def test_recent_messages_cached(benchmark, fake_prisma, long_history, monkeypatch):
+    # The in-memory cache keeps the last 50 messages per conversation
+    monkeypatch.setattr(ConversationService, "_message_cache", {"conversation-1": list(long_history[-50:])})
+
+    recent = benchmark(lambda: run_sync(ConversationService.get_recent_messages("conversation-1", limit=5)))
+    assert recent and recent[0]["role"] == "user"
+
+
+def test_recent_messages_cold(benchmark, fake_prisma, monkeypatch):
+    # After a restart the whole stored history is loaded and reshaped
+    cache = {}
+    monkeypatch.setattr(ConversationService, "_message_cache", cache)
+
+    recent = benchmark.pedantic(
+        lambda: run_sync(ConversationService.get_recent_messages("conversation-1", limit=5)),
+        setup=cache.clear,
+        rounds=500,
+    )
+    assert len(recent) <= 5
+
+
+# Retrieval results
+
+@pytest.mark.parametrize("top_k", [3, 10, 50])
+def test_clean_qdrant_response(benchmark, qdrant_response, top_k):
+    raw = {"points": qdrant_response["points"][:top_k]}
+    cleaned = benchmark(clean_qdrant_response, raw)
+    assert len(cleaned) == top_k
+
+
+@pytest.mark.parametrize("top_k", [3, 10, 50])
+def test_format_rag_context(benchmark, qdrant_response, top_k):
+    results = clean_qdrant_response({"points": qdrant_response["points"][:top_k]})
+    context = benchmark(format_rag_context, results)
+    assert context.startswith("- ")
+
+
+# Webhook payload
+
+@pytest.mark.parametrize("kind", ["text", "voice"])
+def test_parse_webhook_payload(benchmark, kind, text_update_body, voice_update_body):
+    body = text_update_body if kind == "text" else voice_update_body
+
+    def parse():
+        # What the webhook does with the request body before dispatching
+        message = decode_update(body).message
+        return message.chat.id, str(message.from_.id), message.from_.first_name, message.text, message.voice
+
+    chat_id, *_ = benchmark(parse)
+    assert chat_id == 5123456789
+
+
+def test_reject_malformed_payload(benchmark, text_update_body):
+    # A chat id of the wrong type fails validation before any DB lookup
+    body = text_update_body.replace(b'"chat": {"id": 5123456789', b'"chat": {"id": "5123456789"')
+
+    def reject():
+        try:
+            decode_update(body)
+        except msgspec.DecodeError:
+            return True
+        return False
+
+    assert benchmark(reject)
+
+
+# Business updates
+
+def test_update_business_mapping(benchmark, fake_prisma, large_business):
+    update = BusinessUpdate(
+        business_name=large_business.businessName,
+        category=large_business.category,
+        description=large_business.description,
+        language=large_business.language,
+        voice_speaker=large_business.voiceSpeaker,
+        bot_persona=large_business.botPersona,
+        operating_hours=json.loads(large_business.operatingHours),
+        location=large_business.location,
+        phone=large_business.phone,
+        email=large_business.email,
+        status=large_business.status,
+        settings=large_business.settings,
+    )
+
+    data = benchmark(lambda: run_sync(BusinessCRUD.update_business(large_business.id, update)))
+    assert data["businessName"] == large_business.businessName
@@ -46,6 +46,25 @@ const VOICE_SPEAKERS = [
 ]
 
 
+type KnowledgeDocument = { id: string; text: string }
+
+// The documents endpoint is paginated; follow next_offset until the last page
+async function fetchAllDocuments(businessId: string): Promise<KnowledgeDocument[]> {
+  const documents: KnowledgeDocument[] = []
+  let offset: string | null = null
+
+  do {
+    const response: { data: { documents: KnowledgeDocument[]; next_offset: string | null } } = await axios.get(
+      `${import.meta.env.VITE_API_URL}/api/documents/${businessId}`,
+      { params: { limit: 100, offset: offset ?? undefined } }
+    )
+    documents.push(...(response.data.documents || []))
+    offset = response.data.next_offset
+  } while (offset)
+
+  return documents
+}
+
 interface ValidationState {
   isValid: boolean
   isValidating: boolean
@@ -65,7 +84,7 @@ export default function OnboardingPage() {
   const [isTokenEditable, setIsTokenEditable] = useState(false)
 
   // State for knowledge base documents
-  const [documents, setDocuments] = useState<{ id: string; text: string }[]>([])
+  const [documents, setDocuments] = useState<KnowledgeDocument[]>([])
   const [newDocText, setNewDocText] = useState('')
   const [docsLoading, setDocsLoading] = useState(false)
 
@@ -199,8 +218,7 @@ export default function OnboardingPage() {
 
         // Fetch existing documents for this business
         try {
-          const docsResponse = await axios.get(`${import.meta.env.VITE_API_URL}/api/documents/${botId}`)
-          setDocuments(docsResponse.data || [])
+          setDocuments(await fetchAllDocuments(botId))
         } catch {
           // Docs fetch may fail if no collection exists yet — that's ok
           setDocuments([])
@@ -1120,8 +1138,7 @@ export default function OnboardingPage() {
                                 { business_id: botId, text: newDocText.trim() }
                               ])
                               // Refresh documents list
-                              const docsResponse = await axios.get(`${import.meta.env.VITE_API_URL}/api/documents/${botId}`)
-                              setDocuments(docsResponse.data || [])
+                              setDocuments(await fetchAllDocuments(botId))
                               setNewDocText('')
                               toast({
                                 title: 'Document added',
@@ -0,0 +1,147 @@
+"""
+Production entry point:
+
+    python -m server [--workers N] [--host HOST] [--port PORT]
+
+Runs the app in WEB_CONCURRENCY worker processes sharing one socket, on
+uvloop and httptools when installed. On SIGTERM each worker reports not
+ready and rejects new webhooks, finishes its running and deferred turns
+within DRAIN_TIMEOUT_SECONDS, then flushes logs and traces.
+
+The Qdrant collection is created and webhooks re-registered once, here,
+rather than by every worker; prewarming stays per worker since it fills
+per-process caches.
+
+One worker per core by default. Conversation history, cached answers and
+retrieval indexes are cached per process: a settings or document change
+bumps the business's cacheVersion in Postgres and each worker drops its
+copies on its next turn for that business, and a conversation's cached
+history is replaced when the stored one has moved on. Admission limits
+apply per worker. Ingestion jobs, profile requests and /metrics are
+shared between workers.
+"""
+import os
+import glob
+import asyncio
+import argparse
+import tempfile
+import importlib.util
+import multiprocessing
+import dotenv
+import uvicorn
+
+dotenv.load_dotenv()
+
+from server.handlers.db_handler import connect_db, disconnect_db
+from server.core.rag import init_qdrant_client, close_qdrant_client
+from server.core.qdrant_bootstrap import ensure_collection
+from server.utils.telegram_dispatcher import close_http_client
+from server.utils.utils import reregister_webhooks, WEBHOOK_REREGISTER_BACKGROUND
+from server.utils.lifecycle import BOOTSTRAPPED_ENV, DRAIN_TIMEOUT_SECONDS
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY") or os.cpu_count() or 1)
+# Above the idle timeout of common load balancers (60s), so they close first
+KEEPALIVE_TIMEOUT_SECONDS = int(os.getenv("KEEPALIVE_TIMEOUT_SECONDS", "75"))
+BACKLOG = int(os.getenv("BACKLOG", "2048"))
+ACCESS_LOG = os.getenv("ACCESS_LOG", "false").lower() == "true"
+FORWARDED_ALLOW_IPS = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+async def _ensure_collection():
+    await init_qdrant_client()
+    try:
+        await ensure_collection()
+    finally:
+        await close_qdrant_client()
+
+
+async def _reregister_webhooks():
+    await connect_db()
+    try:
+        await reregister_webhooks()
+    finally:
+        await close_http_client()
+        await disconnect_db()
+
+
+def _run_reregistration():
+    asyncio.run(_reregister_webhooks())
+
+
+def _bootstrap():
+    """
+    Startup work done once rather than by every worker: creating the
+    Qdrant collection (which workers would race) and re-registering
+    webhooks, in a side process unless WEBHOOK_REREGISTER_BACKGROUND is off.
+    """
+    # An in-memory Qdrant only exists inside each worker
+    if os.getenv("QDRANT_URL") == ":memory:":
+        return
+
+    asyncio.run(_ensure_collection())
+
+    if WEBHOOK_REREGISTER_BACKGROUND:
+        # Spawned, not forked: this process already runs the log thread
+        process = multiprocessing.get_context("spawn").Process(
+            target=_run_reregistration, name="reregister_webhooks", daemon=True
+        )
+        process.start()
+    else:
+        _run_reregistration()
+
+    os.environ[BOOTSTRAPPED_ENV] = "true"
+
+
+def _prepare_multiprocess_metrics():
+    """Give the workers one Prometheus multiprocess directory, emptied of a previous run"""
+    directory = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, "*.db")):
+            os.remove(path)
+    else:
+        directory = tempfile.mkdtemp(prefix="sunohq_metrics_")
+
+    # Inherited by the worker processes before they import prometheus_client
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = directory
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m server", description="Run the SunoHQ API server")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY)
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        _prepare_multiprocess_metrics()
+
+    _bootstrap()
+
+    uvicorn.run(
+        "server.main:app",
+        host=args.host,
+        port=args.port,
+        workers=max(args.workers, 1),
+        loop="uvloop" if _installed("uvloop") else "asyncio",
+        http="httptools" if _installed("httptools") else "h11",
+        lifespan="on",
+        backlog=BACKLOG,
+        timeout_keep_alive=KEEPALIVE_TIMEOUT_SECONDS,
+        # Webhook turns still running when the listener closes get the drain budget
+        timeout_graceful_shutdown=max(int(DRAIN_TIMEOUT_SECONDS), 1),
+        access_log=ACCESS_LOG,
+        proxy_headers=True,
+        forwarded_allow_ips=FORWARDED_ALLOW_IPS,
+        server_header=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
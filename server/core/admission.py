@@ -0,0 +1,231 @@
+import os
+import time
+import asyncio
+import dotenv
+from collections import Counter
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+from server.core.llm_router import LatencyTracker
+from server.core.scheduler import FairScheduler
+from server.utils.metrics import (
+    ADMISSION_DECISIONS,
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_QUEUED,
+    ADMISSION_DEFERRED,
+)
+from server.utils.log_utils import get_logger
+
+dotenv.load_dotenv()
+
+logger = get_logger(__name__)
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+# Turns processed at once across all bots, and per bot
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "64"))
+ADMISSION_MAX_PER_BUSINESS = int(os.getenv("ADMISSION_MAX_PER_BUSINESS", "16"))
+# Turns allowed to wait for a slot, and for how long, before shedding
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "128"))
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "2.0"))
+# When the p95 turn time is above the target, capacity is scaled down
+ADMISSION_LATENCY_TARGET_SECONDS = float(os.getenv("ADMISSION_LATENCY_TARGET_SECONDS", "10.0"))
+ADMISSION_DEGRADED_FACTOR = float(os.getenv("ADMISSION_DEGRADED_FACTOR", "0.5"))
+# "reject": tell the customer to try again; "defer": reply later
+ADMISSION_SHED_MODE = os.getenv("ADMISSION_SHED_MODE", "defer").lower()
+ADMISSION_MAX_DEFERRED = int(os.getenv("ADMISSION_MAX_DEFERRED", "256"))
+
+ADMITTED = "admitted"
+DEFERRED = "deferred"
+SHED = "shed"
+
+BUSY_DEFERRED_MESSAGE = "We're getting a lot of messages right now. We'll reply to you shortly."
+BUSY_REJECTED_MESSAGE = "We're getting a lot of messages right now. Please try again in a few minutes."
+
+
+class AdmissionController:
+    """
+    Bounds how many webhook turns run at once.
+
+    Turns over the limit wait for up to ADMISSION_QUEUE_TIMEOUT_SECONDS in
+    per-business queues that a FairScheduler serves by weight, so a
+    bursting bot cannot starve the others. When a queue is full or the wait
+    runs out the turn is shed: rejected with a busy message, or in defer
+    mode acknowledged with a busy message and processed once a slot
+    frees up. Capacity shrinks while recent turns are slow, which is
+    usually a provider struggling.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = ADMISSION_MAX_IN_FLIGHT,
+        max_per_business: int = ADMISSION_MAX_PER_BUSINESS,
+        max_queue: int = ADMISSION_MAX_QUEUE,
+        max_deferred: int = ADMISSION_MAX_DEFERRED,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_per_business = max_per_business
+        self.max_queue = max_queue
+        self.max_deferred = max_deferred
+
+        self.in_flight = 0
+        self._by_business: Dict[str, int] = {}
+        self.scheduler = FairScheduler()
+        self._deferred: Set[asyncio.Task] = set()
+
+        self.latency = LatencyTracker()
+        self.decisions = Counter()
+
+    def capacity(self) -> int:
+        p95 = self.latency.percentile("turn", 0.95)
+        if p95 is not None and p95 > ADMISSION_LATENCY_TARGET_SECONDS:
+            return max(int(self.max_in_flight * ADMISSION_DEGRADED_FACTOR), 1)
+        return self.max_in_flight
+
+    def _can_start(self, business_id: str, capacity: Optional[int] = None) -> bool:
+        return (
+            self.in_flight < (self.capacity() if capacity is None else capacity)
+            and self._by_business.get(business_id, 0) < self.max_per_business
+        )
+
+    def _start(self, business_id: str):
+        self.in_flight += 1
+        self._by_business[business_id] = self._by_business.get(business_id, 0) + 1
+        self._publish()
+
+    def _free(self, business_id: str):
+        self.in_flight -= 1
+        self._by_business[business_id] -= 1
+        if not self._by_business[business_id]:
+            del self._by_business[business_id]
+        self._publish()
+
+    def _publish(self):
+        # Set explicitly rather than read on scrape, so multiprocess mode sees them
+        ADMISSION_IN_FLIGHT.set(self.in_flight)
+        ADMISSION_QUEUED.set(self.scheduler.queued)
+        ADMISSION_DEFERRED.set(len(self._deferred))
+
+    def _grant_waiters(self):
+        # The p95 behind capacity() sorts the latency window; once per pass
+        capacity = self.capacity()
+
+        def can_start(business_id: str) -> bool:
+            return self._can_start(business_id, capacity)
+
+        while True:
+            granted = self.scheduler.next(can_start)
+            if granted is None:
+                return
+
+            business_id, future = granted
+            self._start(business_id)
+            future.set_result(True)
+
+    async def _wait_for_slot(self, business_id: str, weight: float, timeout=None) -> bool:
+        # Capacity may have grown since the last release
+        self._grant_waiters()
+
+        if self._can_start(business_id):
+            self._start(business_id)
+            return True
+
+        future = asyncio.get_running_loop().create_future()
+        entry = self.scheduler.enqueue(business_id, weight, future)
+        self._publish()
+
+        try:
+            await asyncio.wait({future}, timeout=timeout)
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._free(business_id)
+                self._grant_waiters()
+            raise
+        finally:
+            if not future.done():
+                self.scheduler.remove(business_id, entry)
+                future.cancel()
+                self._publish()
+
+        # Granted by release() (the slot is already counted as started)
+        return not future.cancelled()
+
+    async def acquire(self, business_id: str, weight: float = 1.0) -> str:
+        """Admit the turn, queueing briefly if needed; otherwise defer or shed it"""
+        if not ADMISSION_ENABLED:
+            self._start(business_id)
+            return ADMITTED
+
+        if self.scheduler.queued < self.max_queue and self.scheduler.can_enqueue(business_id):
+            if await self._wait_for_slot(business_id, weight, ADMISSION_QUEUE_TIMEOUT_SECONDS):
+                self.decisions[ADMITTED] += 1
+                ADMISSION_DECISIONS.labels(ADMITTED).inc()
+                return ADMITTED
+
+        if ADMISSION_SHED_MODE == "defer" and len(self._deferred) < self.max_deferred:
+            self.decisions[DEFERRED] += 1
+            ADMISSION_DECISIONS.labels(DEFERRED).inc()
+            return DEFERRED
+
+        self.decisions[SHED] += 1
+        ADMISSION_DECISIONS.labels(SHED).inc()
+        logger.warning("Shedding turn", extra={"business_id": business_id, "in_flight": self.in_flight, "queued": self.scheduler.queued})
+        return SHED
+
+    def release(self, business_id: str, seconds: float):
+        """Free a slot taken by acquire() and hand it to the next waiter that fits"""
+        self._free(business_id)
+        self.latency.record("turn", seconds)
+        self.scheduler.record_turn(business_id, seconds)
+        self._grant_waiters()
+
+    def defer(self, business_id: str, process: Callable[[], Awaitable], weight: float = 1.0):
+        """Run a shed turn in the background once a slot is free"""
+
+        async def run():
+            await self._wait_for_slot(business_id, weight)
+            started = time.monotonic()
+            try:
+                await process()
+            except Exception as e:
+                logger.exception("Deferred turn failed", extra={"business_id": business_id})
+            finally:
+                self.release(business_id, time.monotonic() - started)
+
+        task = asyncio.create_task(run())
+        self._deferred.add(task)
+        task.add_done_callback(self._deferred_done)
+        self._publish()
+
+    def _deferred_done(self, task: asyncio.Task):
+        self._deferred.discard(task)
+        self._publish()
+
+    @property
+    def idle(self) -> bool:
+        return not (self.in_flight or self.scheduler.queued or self._deferred)
+
+    async def drain(self, timeout: float) -> bool:
+        """Wait for running, queued and deferred turns to finish; False if time ran out"""
+        deadline = time.monotonic() + timeout
+        while not self.idle:
+            if time.monotonic() >= deadline:
+                logger.warning(
+                    "Drain timed out",
+                    extra={"in_flight": self.in_flight, "queued": self.scheduler.queued, "deferred": len(self._deferred)},
+                )
+                return False
+            await asyncio.sleep(0.1)
+        return True
+
+    def snapshot(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "capacity": self.capacity(),
+            "queued": self.scheduler.queued,
+            "deferred": len(self._deferred),
+            "turn_p95": self.latency.percentile("turn", 0.95),
+            "decisions": dict(self.decisions),
+            "tenants": self.scheduler.snapshot(),
+        }
+
+
+admission = AdmissionController()
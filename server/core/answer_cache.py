@@ -0,0 +1,145 @@
+import os
+import time
+import dotenv
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+dotenv.load_dotenv()
+
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.93"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "256"))
+ANSWER_CACHE_TTL_SECONDS = int(os.getenv("ANSWER_CACHE_TTL_SECONDS", "86400"))
+# Only reuse answers when the customer has not spoken within this window
+ANSWER_CACHE_CONTEXT_SECONDS = int(os.getenv("ANSWER_CACHE_CONTEXT_SECONDS", "1800"))
+
+
+class CachedAnswer:
+    __slots__ = ("query", "answer", "audio", "created_at", "hits")
+
+    def __init__(self, query: str, answer: str):
+        self.query = query
+        self.answer = answer
+        self.audio: Optional[bytes] = None
+        self.created_at = time.time()
+        self.hits = 0
+
+
+class SemanticAnswerCache:
+    """
+    Per-business cache of previous answers keyed by query embedding.
+
+    A lookup reuses an answer when the cosine similarity between the new
+    query and a cached query is above ANSWER_CACHE_THRESHOLD. Entries hold
+    the synthesized voice reply as well so repeat voice questions skip TTS.
+
+    Answers depend on whether the business was open when they were given
+    (the prompt says so), so entries are kept apart per `state` and only
+    reused under the same one.
+    """
+
+    def __init__(
+        self,
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = ANSWER_CACHE_TTL_SECONDS,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        # (business_id, state) -> (entry key -> entry), oldest first
+        self._entries: Dict[Tuple[str, Optional[str]], "OrderedDict[int, CachedAnswer]"] = {}
+        # (business_id, state) -> (entry key -> normalized query vector)
+        self._vectors: Dict[Tuple[str, Optional[str]], Dict[int, np.ndarray]] = {}
+        # (business_id, state) -> (keys, stacked matrix), rebuilt lazily after writes
+        self._matrix: Dict[Tuple[str, Optional[str]], tuple] = {}
+        self._next_key = 0
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        arr = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(arr)
+        return arr / norm if norm else arr
+
+    def _get_matrix(self, bucket: tuple):
+        cached = self._matrix.get(bucket)
+        if cached is None:
+            vectors = self._vectors.get(bucket, {})
+            keys = list(vectors.keys())
+            matrix = np.vstack([vectors[k] for k in keys]) if keys else None
+            cached = (keys, matrix)
+            self._matrix[bucket] = cached
+        return cached
+
+    def lookup(self, business_id: str, vector: List[float], state: Optional[str] = None) -> Optional[CachedAnswer]:
+        """Return the closest cached answer above the threshold, if any"""
+        bucket = (business_id, state)
+        entries = self._entries.get(bucket)
+        if not entries:
+            return None
+
+        keys, matrix = self._get_matrix(bucket)
+        if matrix is None:
+            return None
+
+        scores = matrix @ self._normalize(vector)
+        best = int(np.argmax(scores))
+
+        if scores[best] < self.threshold:
+            return None
+
+        key = keys[best]
+        entry = entries[key]
+
+        if time.time() - entry.created_at > self.ttl_seconds:
+            self._remove(bucket, key)
+            return None
+
+        entry.hits += 1
+        entries.move_to_end(key)
+        return entry
+
+    def store(
+        self,
+        business_id: str,
+        query: str,
+        vector: List[float],
+        answer: str,
+        state: Optional[str] = None,
+    ) -> CachedAnswer:
+        """Cache an answer for a query embedding"""
+        bucket = (business_id, state)
+        entries = self._entries.setdefault(bucket, OrderedDict())
+        vectors = self._vectors.setdefault(bucket, {})
+
+        key = self._next_key
+        self._next_key += 1
+
+        entry = CachedAnswer(query, answer)
+        entries[key] = entry
+        vectors[key] = self._normalize(vector)
+
+        # Evict least recently used entries
+        while len(entries) > self.max_entries:
+            oldest_key = next(iter(entries))
+            self._remove(bucket, oldest_key)
+
+        self._matrix.pop(bucket, None)
+        return entry
+
+    def _remove(self, bucket: tuple, key: int):
+        self._entries.get(bucket, {}).pop(key, None)
+        self._vectors.get(bucket, {}).pop(key, None)
+        self._matrix.pop(bucket, None)
+
+    def invalidate(self, business_id: str):
+        """Drop every cached answer for a business (documents or settings changed)"""
+        for bucket in [bucket for bucket in self._entries if bucket[0] == business_id]:
+            self._entries.pop(bucket, None)
+            self._vectors.pop(bucket, None)
+            self._matrix.pop(bucket, None)
+
+
+answer_cache = SemanticAnswerCache()
@@ -0,0 +1,51 @@
+from typing import Dict
+
+from server.handlers.db_handler import prisma
+from server.core.answer_cache import answer_cache
+from server.core.local_index import local_index
+from server.core.lexical import lexical_index
+from server.utils.log_utils import get_logger
+
+logger = get_logger(__name__)
+
+# business_id -> Business.cacheVersion this process's caches were built under
+_seen: Dict[str, int] = {}
+
+
+def _drop_local(business_id: str):
+    answer_cache.invalidate(business_id)
+    local_index.bump_version(business_id)
+    lexical_index.bump_version(business_id)
+
+
+async def business_changed(business_id: str):
+    """
+    Drop the cached answers and retrieval indexes of a business in this
+    process now, and in every other worker on its next turn for it.
+    """
+    _drop_local(business_id)
+
+    updated = await prisma.business.update(
+        where={"id": business_id},
+        data={"cacheVersion": {"increment": 1}},
+    )
+    if updated:
+        _seen[business_id] = max(_seen.get(business_id, 0), updated.cacheVersion)
+
+
+def sync_business(business):
+    """Drop this process's caches of a business that another worker has changed"""
+    version = getattr(business, "cacheVersion", None) or 0
+    seen = _seen.get(business.id)
+
+    if seen is not None and version > seen:
+        logger.info("Business changed in another worker, dropping caches", extra={"business_id": business.id})
+        _drop_local(business.id)
+
+    if seen is None or version > seen:
+        _seen[business.id] = version
+
+
+def forget_business(business_id: str):
+    _drop_local(business_id)
+    _seen.pop(business_id, None)
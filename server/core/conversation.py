@@ -32,6 +32,9 @@ class ConversationService:
         )
         
         if conversation:
+            # Another worker may have added messages since this one cached them
+            ConversationService._refresh_cache(conversation)
+
             # Update last activity
             await prisma.conversation.update(
                 where={"id": conversation.id},
@@ -48,6 +51,27 @@ class ConversationService:
             }
         )
     
+    @staticmethod
+    def _stored_messages(conversation) -> List[Dict]:
+        # conversation.messages is a list of Json objects
+        return [
+            {"role": m.get("role", "user"), "content": m.get("content", ""), "timestamp": m.get("timestamp", "")}
+            for m in conversation.messages or []
+            if isinstance(m, dict)
+        ]
+
+    @staticmethod
+    def _refresh_cache(conversation):
+        """Replace a cached history that no longer ends where the stored one does"""
+        cached = ConversationService._message_cache.get(conversation.id)
+        if not cached or not conversation.messages:
+            return
+
+        last = conversation.messages[-1]
+        if isinstance(last, dict) and last.get("timestamp") != cached[-1].get("timestamp"):
+            ConversationService._message_cache[conversation.id] = \
+                ConversationService._stored_messages(conversation)[-50:]
+
     @staticmethod
     async def add_message(conversation_id: str, role: str, content: str):
         """Add message to in-memory cache AND persist to database"""
@@ -99,12 +123,7 @@ class ConversationService:
                 where={"id": conversation_id}
             )
             if conversation and conversation.messages:
-                # conversation.messages is a list of Json objects
-                messages = [
-                    {"role": m.get("role", "user"), "content": m.get("content", ""), "timestamp": m.get("timestamp", "")}
-                    for m in conversation.messages
-                    if isinstance(m, dict)
-                ]
+                messages = ConversationService._stored_messages(conversation)
                 # Populate cache for future calls
                 ConversationService._message_cache[conversation_id] = messages
         
@@ -118,4 +137,23 @@ class ConversationService:
         # Format for LLM (remove timestamp)
         return [{"role": msg["role"], "content": msg["content"]} for msg in recent]
 
+    @staticmethod
+    async def has_recent_context(conversation_id: str, within_seconds: int = 1800) -> bool:
+        """Check whether the conversation had any message in the last `within_seconds`"""
+
+        # get_recent_messages populates the cache from DB on a cold start
+        await ConversationService.get_recent_messages(conversation_id, limit=1)
+        messages = ConversationService._message_cache.get(conversation_id, [])
+
+        if not messages:
+            return False
+
+        try:
+            last_timestamp = datetime.fromisoformat(messages[-1]["timestamp"])
+        except (KeyError, TypeError, ValueError):
+            # Unknown age: assume the context still matters
+            return True
+
+        return (datetime.now() - last_timestamp).total_seconds() < within_seconds
+
 conversation_service = ConversationService()
@@ -1,16 +1,37 @@
-from typing import List
+from typing import List, Optional
 from google import genai
 from google.genai import types
 import os
 import dotenv
 
+from server.core.resilience import get_provider
+from server.utils.singleflight import singleflight_group, fingerprint
+
 dotenv.load_dotenv()
 
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+# Point at a local stand-in for load tests
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")
+
+_client: Optional[genai.Client] = None
+
+
+def get_genai_client() -> genai.Client:
+    """Build the Gemini client on first use instead of at import"""
+    global _client
+
+    if _client is None:
+        _client = genai.Client(
+            api_key=os.getenv("GEMINI_API_KEY"),
+            http_options=types.HttpOptions(base_url=GEMINI_BASE_URL) if GEMINI_BASE_URL else None,
+        )
+
+    return _client
 
 EMBEDDING_MODEL = "gemini-embedding-001"
 OUTPUT_DIMENSIONS = 768
 
+embedding_flight = singleflight_group("gemini_embedding")
+
 def embed_text(
     text: List[str],
     task_type: str = "retrieval_document",
@@ -21,7 +42,7 @@ def embed_text(
       - retrieval_query (for queries)
     """
 
-    response = client.models.embed_content(
+    response = get_genai_client().models.embed_content(
         model=EMBEDDING_MODEL,
         contents=text,
         config=types.EmbedContentConfig(task_type=task_type, output_dimensionality=768)
@@ -29,3 +50,31 @@ def embed_text(
 
     # Gemini returns a list of embeddings
     return [e.values for e in response.embeddings]
+
+
+async def aembed_text(
+    text: List[str],
+    task_type: str = "retrieval_document",
+):
+    """
+    Async variant of embed_text that does not block the event loop.
+    Identical concurrent requests share one API call.
+    """
+
+    return await embedding_flight.do(
+        fingerprint(task_type, text),
+        _aembed_text,
+        text,
+        task_type,
+    )
+
+
+async def _aembed_text(text: List[str], task_type: str):
+    response = await get_provider("gemini").call(
+        get_genai_client().aio.models.embed_content,
+        model=EMBEDDING_MODEL,
+        contents=text,
+        config=types.EmbedContentConfig(task_type=task_type, output_dimensionality=OUTPUT_DIMENSIONS)
+    )
+
+    return [e.values for e in response.embeddings]
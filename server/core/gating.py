@@ -0,0 +1,90 @@
+import os
+import dotenv
+from typing import Optional
+
+from server.core.lexical import tokenize, TOKEN_PATTERN
+from server.utils.business_settings import settings_section
+from server.utils.log_utils import get_logger
+
+dotenv.load_dotenv()
+
+logger = get_logger(__name__)
+
+RETRIEVAL_GATING_ENABLED = os.getenv("RETRIEVAL_GATING_ENABLED", "true").lower() == "true"
+
+# Defaults, overridable per business under settings["retrieval_gating"]
+DEFAULT_GATING_SETTINGS = {
+    "enabled": RETRIEVAL_GATING_ENABLED,
+    # Content tokens (after stopword removal) needed to look anything up
+    "min_content_tokens": int(os.getenv("RETRIEVAL_GATING_MIN_CONTENT_TOKENS", "1")),
+    # Messages longer than this are never treated as small talk
+    "max_smalltalk_tokens": int(os.getenv("RETRIEVAL_GATING_MAX_SMALLTALK_TOKENS", "6")),
+}
+
+GREETING_WORDS = {
+    "hi", "hii", "hello", "helo", "hey", "hlo", "yo", "namaste", "namaskar",
+    "pranam", "salaam", "salam", "good", "morning", "afternoon", "evening",
+    "night", "gm", "gn", "sir", "madam", "mam", "bhai", "bhaiya", "didi",
+    "नमस्ते", "नमस्कार", "प्रणाम", "सलाम", "सुप्रभात", "शुभ", "रात्रि",
+}
+
+ACKNOWLEDGEMENT_WORDS = {
+    "ok", "okay", "okk", "k", "kk", "thanks", "thank", "thanku", "thx", "ty",
+    "welcome", "great", "nice", "cool", "fine", "done", "sure", "yes", "yeah",
+    "yup", "no", "nope", "bye", "shukriya", "dhanyavad", "dhanyawad", "theek",
+    "thik", "acha", "accha", "achha", "haan", "han", "ha", "ji", "hmm", "hm",
+    "alright", "perfect", "awesome", "got", "it", "noted", "lol",
+    "धन्यवाद", "शुक्रिया", "ठीक", "अच्छा", "हाँ", "हां", "जी", "बढ़िया", "ओके",
+}
+
+# Normalized the same way tokenize() normalizes message text
+SMALLTALK_WORDS = {
+    token
+    for word in GREETING_WORDS | ACKNOWLEDGEMENT_WORDS
+    for token in tokenize(word, drop_stopwords=False)
+}
+
+
+class GateDecision:
+    __slots__ = ("retrieve", "reason")
+
+    def __init__(self, retrieve: bool, reason: str):
+        self.retrieve = retrieve
+        self.reason = reason
+
+    def __repr__(self):
+        return f"GateDecision(retrieve={self.retrieve}, reason={self.reason})"
+
+
+def get_gating_settings(business) -> dict:
+    """Merge a business's retrieval_gating overrides onto the defaults"""
+    return {**DEFAULT_GATING_SETTINGS, **settings_section(business, "retrieval_gating")}
+
+
+def should_retrieve(text: Optional[str], business=None) -> GateDecision:
+    """
+    Decide whether a turn needs a knowledge lookup.
+
+    Greetings, acknowledgements, emoji and other low-information messages
+    skip both the query embedding and the vector search.
+    """
+    settings = get_gating_settings(business)
+
+    if not settings["enabled"]:
+        decision = GateDecision(True, "gating_disabled")
+    elif not text or not TOKEN_PATTERN.search(text.lower()):
+        decision = GateDecision(False, "no_words")
+    else:
+        all_tokens = tokenize(text, drop_stopwords=False)
+        content_tokens = [t for t in tokenize(text) if t not in SMALLTALK_WORDS]
+
+        if len(all_tokens) <= settings["max_smalltalk_tokens"] and not content_tokens:
+            decision = GateDecision(False, "smalltalk")
+        elif len(content_tokens) < settings["min_content_tokens"]:
+            decision = GateDecision(False, "low_information")
+        else:
+            decision = GateDecision(True, "informational")
+
+    business_id = getattr(business, "id", None)
+    logger.debug("Retrieval gate", extra={"business_id": business_id, "reason": decision.reason, "retrieve": decision.retrieve})
+    return decision
@@ -0,0 +1,235 @@
+import os
+import csv
+import shutil
+import asyncio
+import tempfile
+from itertools import islice
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional
+
+from fastapi import UploadFile
+
+from server.handlers.db_handler import prisma
+from server.core.rag import insert_documents, INGEST_BATCH_SIZE, INGEST_CONCURRENCY
+from server.utils.chunking import TextChunker
+from server.utils.qdrant_utils import document_id
+from server.utils.log_utils import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # PDF support is optional
+    PdfReader = None
+
+SUPPORTED_EXTENSIONS = {
+    ".txt": "text",
+    ".md": "markdown",
+    ".markdown": "markdown",
+    ".csv": "csv",
+    ".pdf": "pdf",
+}
+
+# Chunks buffered before they are handed to insert_documents
+PENDING_CHUNK_LIMIT = INGEST_BATCH_SIZE * INGEST_CONCURRENCY
+
+# Finished jobs are deleted after this long, or sooner once the table holds
+# more than INGESTION_JOB_LIMIT jobs
+INGESTION_JOB_TTL_HOURS = float(os.getenv("INGESTION_JOB_TTL_HOURS", "24"))
+INGESTION_JOB_LIMIT = int(os.getenv("INGESTION_JOB_LIMIT", "1000"))
+
+
+def detect_file_kind(filename: Optional[str]) -> Optional[str]:
+    """Map an uploaded filename to a parser kind, None if unsupported"""
+    extension = os.path.splitext(filename or "")[1].lower()
+    kind = SUPPORTED_EXTENSIONS.get(extension)
+
+    if kind == "pdf" and PdfReader is None:
+        return None
+
+    return kind
+
+
+class IngestionJobStore:
+    """Background ingestion jobs, kept in Postgres so any worker can report them"""
+
+    @staticmethod
+    def _to_dict(record) -> dict:
+        return {
+            "job_id": record.id,
+            "business_id": record.businessId,
+            "filename": record.filename,
+            "status": record.status,
+            "chunks": record.chunks,
+            "inserted": record.inserted,
+            "failed": record.failed,
+            "failed_ids": list(record.failedIds),
+            "error": record.error,
+            "created_at": record.createdAt.isoformat(),
+            "finished_at": record.finishedAt.isoformat() if record.finishedAt else None,
+        }
+
+    @staticmethod
+    async def prune():
+        """Delete expired finished jobs, then the oldest finished ones above the cap"""
+        cutoff = datetime.now() - timedelta(hours=INGESTION_JOB_TTL_HOURS)
+        await prisma.ingestionjob.delete_many(where={"finishedAt": {"lt": cutoff}})
+
+        excess = await prisma.ingestionjob.count() - INGESTION_JOB_LIMIT
+        if excess <= 0:
+            return
+
+        oldest = await prisma.ingestionjob.find_many(
+            where={"finishedAt": {"not": None}},
+            order={"finishedAt": "asc"},
+            take=excess,
+        )
+        if oldest:
+            await prisma.ingestionjob.delete_many(where={"id": {"in": [job.id for job in oldest]}})
+
+    @staticmethod
+    async def create(business_id: str, filename: str) -> dict:
+        await IngestionJobStore.prune()
+        record = await prisma.ingestionjob.create(
+            data={"businessId": business_id, "filename": filename}
+        )
+        return IngestionJobStore._to_dict(record)
+
+    @staticmethod
+    async def get(job_id: str) -> Optional[dict]:
+        record = await prisma.ingestionjob.find_unique(where={"id": job_id})
+        return IngestionJobStore._to_dict(record) if record else None
+
+    @staticmethod
+    async def save(job: dict):
+        """Write the progress of a running job"""
+        await prisma.ingestionjob.update(
+            where={"id": job["job_id"]},
+            data={
+                "status": job["status"],
+                "chunks": job["chunks"],
+                "inserted": job["inserted"],
+                "failed": job["failed"],
+                "failedIds": job["failed_ids"],
+                "error": job["error"],
+                "finishedAt": job["finished_at"],
+            },
+        )
+
+
+async def save_upload(file: UploadFile) -> str:
+    """Stream an upload to a temp file so the request can return immediately"""
+    extension = os.path.splitext(file.filename or "")[1].lower()
+    fd, path = tempfile.mkstemp(prefix="sunohq_upload_", suffix=extension)
+
+    def copy():
+        with os.fdopen(fd, "wb") as out:
+            shutil.copyfileobj(file.file, out, 1024 * 1024)
+
+    await asyncio.to_thread(copy)
+    return path
+
+
+def _iter_text_pieces(path: str, kind: str) -> Iterator[Optional[str]]:
+    """
+    Yield text pieces from a file without loading it whole.
+
+    A `None` piece marks a hard boundary (end of a CSV row, start of a
+    markdown heading) where the current chunk is closed.
+    """
+    if kind == "pdf":
+        reader = PdfReader(path)
+        for page in reader.pages:
+            yield (page.extract_text() or "") + "\n"
+        return
+
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        if kind == "csv":
+            for row in csv.reader(f):
+                cells = [cell.strip() for cell in row if cell.strip()]
+                if cells:
+                    yield " - ".join(cells)
+                    yield None
+            return
+
+        for line in f:
+            if kind == "markdown" and line.lstrip().startswith("#"):
+                yield None
+                yield line.lstrip("# ").rstrip() + ".\n"
+                continue
+            yield line
+
+
+def _iter_chunks(path: str, kind: str) -> Iterator[str]:
+    chunker = TextChunker()
+
+    for piece in _iter_text_pieces(path, kind):
+        if piece is None:
+            yield from chunker.flush()
+        else:
+            yield from chunker.feed(piece)
+
+    yield from chunker.flush()
+
+
+async def run_file_ingestion(job: dict, path: str, kind: str):
+    """Chunk an uploaded file and ingest the chunks in batches"""
+    job["status"] = "running"
+    await ingestion_jobs.save(job)
+    business_id = job["business_id"]
+    seen = set()
+    pending: List[dict] = []
+
+    async def flush_pending():
+        result = await insert_documents(pending)
+        job["inserted"] += result["inserted"]
+        job["failed"] += result["failed"]
+        job["failed_ids"].extend(result["failed_ids"])
+        pending.clear()
+        await ingestion_jobs.save(job)
+
+    try:
+        chunks = _iter_chunks(path, kind)
+
+        while True:
+            # Parsing (PDF especially) is blocking, keep it off the event loop
+            batch = await asyncio.to_thread(lambda: list(islice(chunks, INGEST_BATCH_SIZE)))
+            if not batch:
+                break
+
+            for chunk in batch:
+                point_id = document_id(business_id, chunk)
+                if point_id in seen:
+                    continue
+                seen.add(point_id)
+
+                job["chunks"] += 1
+                pending.append({"id": point_id, "business_id": business_id, "text": chunk})
+
+            if len(pending) >= PENDING_CHUNK_LIMIT:
+                await flush_pending()
+
+        if pending:
+            await flush_pending()
+
+        job["status"] = "partial" if job["failed"] else "completed"
+
+    except Exception as e:
+        logger.exception("Ingestion job failed", extra={"job_id": job["job_id"]})
+        job["status"] = "failed"
+        job["error"] = str(e)
+
+    finally:
+        job["finished_at"] = datetime.now()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+        try:
+            await ingestion_jobs.save(job)
+        except Exception:
+            logger.exception("Could not store ingestion job result", extra={"job_id": job["job_id"]})
+
+
+ingestion_jobs = IngestionJobStore()
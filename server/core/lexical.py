@@ -0,0 +1,283 @@
+import os
+import re
+import math
+import time
+import asyncio
+import unicodedata
+import dotenv
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional
+
+dotenv.load_dotenv()
+
+LEXICAL_ENABLED = os.getenv("LEXICAL_ENABLED", "true").lower() == "true"
+# Tenants with more chunks than this only use dense retrieval
+LEXICAL_MAX_DOCS = int(os.getenv("LEXICAL_MAX_DOCS", "5000"))
+LEXICAL_MAX_MB = int(os.getenv("LEXICAL_MAX_MB", "128"))
+LEXICAL_TTL_SECONDS = int(os.getenv("LEXICAL_TTL_SECONDS", "300"))
+# Fraction of the query's content terms the top document must contain,
+# and how far ahead of the runner-up it must score, to skip dense search
+LEXICAL_DECISIVE_COVERAGE = float(os.getenv("LEXICAL_DECISIVE_COVERAGE", "1.0"))
+LEXICAL_DECISIVE_MARGIN = float(os.getenv("LEXICAL_DECISIVE_MARGIN", "1.5"))
+# How much a lexical match pulls a dense score towards 1.0
+LEXICAL_WEIGHT = float(os.getenv("LEXICAL_WEIGHT", "0.3"))
+# Score given to a perfect lexical match that dense search did not return
+LEXICAL_ONLY_CEILING = float(os.getenv("LEXICAL_ONLY_CEILING", "0.75"))
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Rough per-posting cost of the nested dicts, for the memory cap
+POSTING_BYTES = 100
+
+# Devanagari runs (without danda punctuation), or Latin letters/digits
+TOKEN_PATTERN = re.compile(r"[\u0900-\u0963\u0966-\u097F]+|[a-z0-9]+")
+
+ENGLISH_STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "am", "do", "does", "did",
+    "i", "me", "my", "you", "your", "we", "our", "it", "its", "he", "she", "they",
+    "this", "that", "these", "those", "to", "of", "in", "on", "at", "for", "from",
+    "with", "by", "and", "or", "but", "so", "if", "can", "could", "will", "would",
+    "please", "pls", "plz", "tell", "about", "what", "which", "who", "how", "any",
+    "there", "here", "have", "has", "had", "just", "some", "also", "u", "ur",
+}
+
+HINDI_STOPWORDS = {
+    "है", "हैं", "था", "थे", "थी", "हो", "का", "की", "के", "को", "से", "में", "पर",
+    "और", "या", "भी", "तो", "ही", "यह", "ये", "वह", "वो", "मैं", "मुझे", "मेरा",
+    "आप", "आपका", "आपके", "आपकी", "हम", "क्या", "कि", "जी", "एक", "इस", "उस",
+    "बताइए", "बताओ", "बताएं", "दिखाओ", "दिखाइए", "चाहिए", "कृपया", "कोई", "कुछ",
+}
+
+# Romanized Hindi
+HINGLISH_STOPWORDS = {
+    "hai", "hain", "ha", "tha", "the", "thi", "ho", "ka", "ki", "ke", "ko", "se",
+    "me", "mein", "mai", "par", "pe", "aur", "ya", "bhi", "to", "toh", "hi",
+    "yah", "ye", "yeh", "vo", "voh", "mujhe", "mera", "ap", "apka", "apke", "apki",
+    "hum", "kya", "kia", "ki", "ji", "ek", "is", "us", "batao", "bataiye", "bataye",
+    "kripya", "koi", "kuch", "kuchh", "dikhao", "dikhaiye", "chahiye", "chaiye",
+}
+
+def normalize_latin(token: str) -> str:
+    """Fold common romanized-Hindi spelling variants onto one form"""
+    token = token.replace("ee", "i").replace("oo", "u").replace("w", "v").replace("ph", "f")
+    # "menuuu", "haan", "acchha" -> single letters
+    return re.sub(r"(.)\1+", r"\1", token)
+
+
+# Stored in normalized form so they match tokenize() output
+STOPWORDS = HINDI_STOPWORDS | {
+    normalize_latin(word) for word in ENGLISH_STOPWORDS | HINGLISH_STOPWORDS
+}
+
+
+def normalize_devanagari(token: str) -> str:
+    # Drop nukta and fold chandrabindu onto anusvara
+    return token.replace("\u093c", "").replace("\u0901", "\u0902")
+
+
+def tokenize(text: str, drop_stopwords: bool = True) -> List[str]:
+    """Tokenize mixed Devanagari / romanized Hindi / English text"""
+    text = unicodedata.normalize("NFC", text.lower())
+    tokens = []
+
+    for token in TOKEN_PATTERN.findall(text):
+        if token.isdigit():
+            pass
+        elif "a" <= token[0] <= "z":
+            token = normalize_latin(token)
+        else:
+            token = normalize_devanagari(token)
+
+        if drop_stopwords and token in STOPWORDS:
+            continue
+        tokens.append(token)
+
+    return tokens
+
+
+class BM25Index:
+    """Okapi BM25 over one business's document chunks"""
+
+    def __init__(self, texts: List[str], version: int):
+        self.texts = texts
+        self.version = version
+        self.loaded_at = time.time()
+
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._lengths: List[int] = []
+
+        for doc_id, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            self._lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self._postings.setdefault(term, {})[doc_id] = tf
+
+        total = len(texts)
+        self._avg_length = (sum(self._lengths) / total) if total else 0.0
+        self._idf = {
+            term: math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self._postings.items()
+        }
+        self.nbytes = sum(len(text) for text in texts) + POSTING_BYTES * sum(
+            len(docs) for docs in self._postings.values()
+        )
+
+    def search(self, query: str, limit: int = 3) -> List[dict]:
+        """
+        Return the best lexical matches.
+
+        Each result has the raw `bm25` score, `coverage` (fraction of the
+        query's content terms present in the document) and a `score` in
+        [0, 1] that is coverage scaled by bm25 relative to the top hit.
+        """
+        terms = set(tokenize(query))
+        if not terms or not self.texts:
+            return []
+
+        scores: Dict[int, float] = {}
+        matched: Dict[int, int] = {}
+
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+
+            idf = self._idf[term]
+            for doc_id, tf in postings.items():
+                length_norm = 1 - BM25_B + BM25_B * self._lengths[doc_id] / (self._avg_length or 1)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * length_norm)
+                matched[doc_id] = matched.get(doc_id, 0) + 1
+
+        if not scores:
+            return []
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        top_score = ranked[0][1]
+
+        return [
+            {
+                "text": self.texts[doc_id],
+                "bm25": bm25,
+                "coverage": matched[doc_id] / len(terms),
+                "score": round(matched[doc_id] / len(terms) * bm25 / top_score, 4),
+            }
+            for doc_id, bm25 in ranked
+        ]
+
+
+def is_decisive(results: List[dict]) -> bool:
+    """Whether the lexical top hit is clear enough to skip dense retrieval"""
+    if not results or results[0]["coverage"] < LEXICAL_DECISIVE_COVERAGE:
+        return False
+
+    if len(results) == 1:
+        return True
+
+    return results[0]["bm25"] >= LEXICAL_DECISIVE_MARGIN * results[1]["bm25"]
+
+
+def fuse(dense: List[dict], lexical: List[dict], limit: int = 3) -> List[dict]:
+    """
+    Combine dense and lexical results into one ranked list.
+
+    Dense scores keep their scale and are pulled towards 1.0 by a lexical
+    match, so existing score thresholds still apply. Documents that only
+    matched lexically get at most LEXICAL_ONLY_CEILING.
+    """
+    lexical_scores = {r["text"]: r["score"] for r in lexical}
+    fused = {}
+
+    for r in dense:
+        lex = lexical_scores.get(r["text"], 0.0)
+        fused[r["text"]] = r["score"] + LEXICAL_WEIGHT * lex * (1 - r["score"])
+
+    for text, lex in lexical_scores.items():
+        if text not in fused:
+            fused[text] = LEXICAL_ONLY_CEILING * lex
+
+    ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return [{"text": text, "score": round(score, 4)} for text, score in ranked]
+
+
+class LexicalIndexStore:
+    """
+    Per-business BM25 indexes, rebuilt when the corpus version changes.
+
+    Loading is driven by the caller, which scrolls the business once for
+    this and the local vector index. Indexes are evicted least recently
+    used first to stay under LEXICAL_MAX_MB.
+    """
+
+    def __init__(
+        self,
+        max_docs: int = LEXICAL_MAX_DOCS,
+        max_bytes: int = LEXICAL_MAX_MB * 1024 * 1024,
+        ttl_seconds: int = LEXICAL_TTL_SECONDS,
+    ):
+        self.max_docs = max_docs
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._indexes: "OrderedDict[str, BM25Index]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        # business_id -> (version, marked_at) for tenants too large to index
+        self._skipped: Dict[str, tuple] = {}
+        self._bytes = 0
+
+    def get_version(self, business_id: str) -> int:
+        return self._versions.get(business_id, 0)
+
+    def bump_version(self, business_id: str):
+        self._versions[business_id] = self.get_version(business_id) + 1
+        self._skipped.pop(business_id, None)
+        self._drop(business_id)
+
+    def _drop(self, business_id: str):
+        index = self._indexes.pop(business_id, None)
+        if index:
+            self._bytes -= index.nbytes
+
+    def _is_fresh(self, version: int, loaded_at: float, business_id: str) -> bool:
+        return version == self.get_version(business_id) and time.time() - loaded_at < self.ttl_seconds
+
+    def is_loaded(self, business_id: str) -> bool:
+        """Whether the business has a fresh index, or is known to be too large for one"""
+        skipped = self._skipped.get(business_id)
+        if skipped and self._is_fresh(skipped[0], skipped[1], business_id):
+            return True
+
+        index = self._indexes.get(business_id)
+        return bool(index and self._is_fresh(index.version, index.loaded_at, business_id))
+
+    def get(self, business_id: str) -> Optional[BM25Index]:
+        """The fresh index of a business, None if it has none"""
+        index = self._indexes.get(business_id)
+        if index and self._is_fresh(index.version, index.loaded_at, business_id):
+            self._indexes.move_to_end(business_id)
+            return index
+        return None
+
+    def mark_skipped(self, business_id: str, version: int):
+        self._skipped[business_id] = (version, time.time())
+        self._drop(business_id)
+
+    async def add(self, business_id: str, texts: List[str], version: int) -> Optional[BM25Index]:
+        """Build and keep the index of a business from its chunk texts"""
+        # Tokenizing a few thousand chunks is CPU work; keep it off the loop
+        index = await asyncio.to_thread(BM25Index, texts, version)
+
+        if version != self.get_version(business_id):
+            # Corpus changed during the load; let the next request reload
+            return None
+
+        self._drop(business_id)
+        self._indexes[business_id] = index
+        self._bytes += index.nbytes
+
+        while self._bytes > self.max_bytes and len(self._indexes) > 1:
+            self._drop(next(iter(self._indexes)))
+
+        return index
+
+
+lexical_index = LexicalIndexStore()
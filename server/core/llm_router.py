@@ -0,0 +1,174 @@
+import os
+import re
+import time
+import asyncio
+import dotenv
+from collections import deque
+from typing import Dict, List, Optional
+
+from server.core.sarvam_llm import sarvam_llm_service
+from server.utils.log_utils import get_logger
+
+dotenv.load_dotenv()
+
+logger = get_logger(__name__)
+
+# Empty model names fall back to the Sarvam API default
+LLM_TIERS = {
+    "fast": {
+        "model": os.getenv("LLM_FAST_MODEL") or None,
+        "max_tokens": int(os.getenv("LLM_FAST_MAX_TOKENS", "200")),
+        "temperature": float(os.getenv("LLM_FAST_TEMPERATURE", "0.7")),
+    },
+    "standard": {
+        "model": os.getenv("LLM_STANDARD_MODEL") or None,
+        "max_tokens": int(os.getenv("LLM_STANDARD_MAX_TOKENS", "300")),
+        "temperature": float(os.getenv("LLM_STANDARD_TEMPERATURE", "0.7")),
+    },
+}
+
+# Whole-turn budget; what is left of it picks the tier and how soon to hedge
+TURN_LATENCY_BUDGET_SECONDS = float(os.getenv("TURN_LATENCY_BUDGET_SECONDS", "8.0"))
+# Deadline for the LLM call, however much of the turn budget is already spent
+LLM_CALL_TIMEOUT_SECONDS = float(os.getenv("LLM_CALL_TIMEOUT_SECONDS", "6.0"))
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "true").lower() == "true"
+# Hedge delay used until enough samples exist to compute a p95
+LLM_HEDGE_DEFAULT_SECONDS = float(os.getenv("LLM_HEDGE_DEFAULT_SECONDS", "2.5"))
+LLM_HEDGE_MIN_SECONDS = float(os.getenv("LLM_HEDGE_MIN_SECONDS", "0.5"))
+
+LATENCY_WINDOW = 200
+LATENCY_MIN_SAMPLES = 20
+
+# Queries longer than this, or asking several things, go to the standard tier
+COMPLEX_QUERY_WORDS = int(os.getenv("LLM_COMPLEX_QUERY_WORDS", "25"))
+MULTI_QUESTION = re.compile(r"\?.*\?|\b(and also|aur bhi|also tell|compare|difference)\b|तथा|और भी")
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies per model tier"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples: Dict[str, deque] = {}
+        self.window = window
+
+    def record(self, tier: str, seconds: float):
+        self._samples.setdefault(tier, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, tier: str, pct: float) -> Optional[float]:
+        samples = self._samples.get(tier)
+        if not samples or len(samples) < LATENCY_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+    def snapshot(self) -> dict:
+        return {
+            tier: {
+                "samples": len(samples),
+                "p50": self.percentile(tier, 0.50),
+                "p95": self.percentile(tier, 0.95),
+            }
+            for tier, samples in self._samples.items()
+        }
+
+
+class LLMRouter:
+    """
+    Picks a model tier per turn and bounds how long the LLM may take.
+
+    Simple queries go to the fast tier, as does any turn whose remaining
+    latency budget is smaller than the standard tier's p95. Every call gets
+    the full LLM_CALL_TIMEOUT_SECONDS, even when earlier steps overran the
+    budget. When the first request has not answered by the tier's p95 (or
+    by the end of the budget, if sooner), a second identical request is
+    sent and whichever finishes first wins.
+    """
+
+    def __init__(self):
+        self.latency = LatencyTracker()
+
+    def choose_tier(self, query: str, has_context: bool, remaining: float) -> str:
+        complex_query = (
+            len(query.split()) > COMPLEX_QUERY_WORDS
+            or bool(MULTI_QUESTION.search(query.lower()))
+            or has_context and len(query.split()) > COMPLEX_QUERY_WORDS // 2
+        )
+
+        if not complex_query:
+            return "fast"
+
+        standard_p95 = self.latency.percentile("standard", 0.95)
+        if standard_p95 is not None and standard_p95 > remaining:
+            return "fast"
+
+        return "standard"
+
+    async def _call(self, messages: List[Dict[str, str]], tier: str) -> Optional[str]:
+        config = LLM_TIERS[tier]
+        started = time.monotonic()
+
+        response = await sarvam_llm_service.chat_completion(
+            messages=messages,
+            temperature=config["temperature"],
+            max_tokens=config["max_tokens"],
+            model=config["model"],
+        )
+
+        if response:
+            self.latency.record(tier, time.monotonic() - started)
+
+        return response
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        query: str,
+        has_context: bool = False,
+        turn_started: Optional[float] = None,
+    ) -> Optional[str]:
+        """Run the LLM turn, downgrading and hedging when the budget is tight; None on failure or timeout"""
+        elapsed = time.monotonic() - turn_started if turn_started else 0.0
+        remaining = max(TURN_LATENCY_BUDGET_SECONDS - elapsed, 0.0)
+        deadline = LLM_CALL_TIMEOUT_SECONDS
+
+        tier = self.choose_tier(query, has_context, remaining)
+        hedge_after = self.latency.percentile(tier, 0.95) or LLM_HEDGE_DEFAULT_SECONDS
+        hedge_after = max(min(hedge_after, remaining), LLM_HEDGE_MIN_SECONDS)
+
+        loop = asyncio.get_running_loop()
+        end = loop.time() + deadline
+        pending = {asyncio.create_task(self._call(messages, tier))}
+        hedged = False
+
+        try:
+            while pending:
+                now = loop.time()
+                if now >= end:
+                    logger.warning("LLM deadline of %.1fs exceeded", deadline, extra={"tier": tier})
+                    return None
+
+                wait_for = end - now
+                if LLM_HEDGE_ENABLED and not hedged:
+                    wait_for = min(wait_for, hedge_after)
+
+                done, pending = await asyncio.wait(pending, timeout=wait_for, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    result = task.result()
+                    if result:
+                        return result
+
+                if not done and LLM_HEDGE_ENABLED and not hedged and loop.time() < end:
+                    logger.info("LLM slower than %.2fs, sending hedged request", hedge_after, extra={"tier": tier})
+                    pending.add(asyncio.create_task(self._call(messages, tier)))
+                    hedged = True
+
+            return None
+
+        finally:
+            # The loser (or everything, on timeout) is no longer needed
+            for task in pending:
+                task.cancel()
+
+
+llm_router = LLMRouter()
@@ -0,0 +1,142 @@
+import os
+import time
+import dotenv
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+dotenv.load_dotenv()
+
+LOCAL_INDEX_ENABLED = os.getenv("LOCAL_INDEX_ENABLED", "true").lower() == "true"
+# Tenants with more chunks than this are always searched in Qdrant
+LOCAL_INDEX_MAX_DOCS = int(os.getenv("LOCAL_INDEX_MAX_DOCS", "500"))
+LOCAL_INDEX_MAX_MB = int(os.getenv("LOCAL_INDEX_MAX_MB", "256"))
+# Upper bound on staleness when another worker process changed the corpus
+LOCAL_INDEX_TTL_SECONDS = int(os.getenv("LOCAL_INDEX_TTL_SECONDS", "300"))
+
+
+class TenantMatrix:
+    __slots__ = ("matrix", "texts", "version", "loaded_at", "nbytes")
+
+    def __init__(self, matrix: np.ndarray, texts: List[str], version: int):
+        self.matrix = matrix
+        self.texts = texts
+        self.version = version
+        self.loaded_at = time.time()
+        self.nbytes = matrix.nbytes + sum(len(t) for t in texts)
+
+
+class LocalVectorIndex:
+    """
+    In-process brute-force vector index for small tenants.
+
+    Qdrant stays the source of truth: a tenant's vectors are loaded lazily
+    by the caller, from the same scroll as the lexical index, into one
+    contiguous float32 matrix of unit rows, and reloaded once its corpus
+    version changes. Tenants above LOCAL_INDEX_MAX_DOCS are remembered as
+    remote and keep using Qdrant. Matrices are evicted least recently used
+    first to stay under LOCAL_INDEX_MAX_MB.
+    """
+
+    def __init__(
+        self,
+        max_docs: int = LOCAL_INDEX_MAX_DOCS,
+        max_bytes: int = LOCAL_INDEX_MAX_MB * 1024 * 1024,
+        ttl_seconds: int = LOCAL_INDEX_TTL_SECONDS,
+    ):
+        self.max_docs = max_docs
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._tenants: "OrderedDict[str, TenantMatrix]" = OrderedDict()
+        self._remote: Dict[str, tuple] = {}     # business_id -> (version, marked_at)
+        self._versions: Dict[str, int] = {}
+        self._bytes = 0
+
+    def get_version(self, business_id: str) -> int:
+        return self._versions.get(business_id, 0)
+
+    def bump_version(self, business_id: str):
+        """Mark the corpus of a business as changed"""
+        self._versions[business_id] = self.get_version(business_id) + 1
+        self._remote.pop(business_id, None)
+        self._drop(business_id)
+
+    def _drop(self, business_id: str):
+        tenant = self._tenants.pop(business_id, None)
+        if tenant:
+            self._bytes -= tenant.nbytes
+
+    def _is_fresh(self, version: int, loaded_at: float, business_id: str) -> bool:
+        return version == self.get_version(business_id) and time.time() - loaded_at < self.ttl_seconds
+
+    def is_loaded(self, business_id: str) -> bool:
+        """Whether the tenant has a fresh matrix, or is known to be remote"""
+        remote = self._remote.get(business_id)
+        if remote and self._is_fresh(remote[0], remote[1], business_id):
+            return True
+
+        tenant = self._tenants.get(business_id)
+        return bool(tenant and self._is_fresh(tenant.version, tenant.loaded_at, business_id))
+
+    def get(self, business_id: str) -> Optional[TenantMatrix]:
+        """The fresh tenant matrix, None for remote or unloaded tenants"""
+        tenant = self._tenants.get(business_id)
+        if tenant and self._is_fresh(tenant.version, tenant.loaded_at, business_id):
+            self._tenants.move_to_end(business_id)
+            return tenant
+        return None
+
+    def mark_remote(self, business_id: str, version: int):
+        self._remote[business_id] = (version, time.time())
+        self._drop(business_id)
+
+    def add(self, business_id: str, texts: List[str], vectors: List[List[float]], version: int) -> Optional[TenantMatrix]:
+        """Build and keep the matrix of a tenant from its chunk texts and vectors"""
+        if version != self.get_version(business_id):
+            # Corpus changed during the load; let the next request reload
+            return None
+
+        if not vectors:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+        else:
+            matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+
+        tenant = TenantMatrix(matrix, texts, version)
+
+        self._drop(business_id)
+        self._tenants[business_id] = tenant
+        self._bytes += tenant.nbytes
+
+        while self._bytes > self.max_bytes and len(self._tenants) > 1:
+            oldest = next(iter(self._tenants))
+            self._drop(oldest)
+
+        return tenant
+
+    @staticmethod
+    def search(tenant: TenantMatrix, vector: List[float], limit: int = 3) -> List[dict]:
+        """Top-k cosine similarity, same shape as clean_qdrant_response"""
+        if not tenant.texts:
+            return []
+
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        scores = tenant.matrix @ query
+        k = min(limit, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            {"text": tenant.texts[i], "score": round(float(scores[i]), 4)}
+            for i in top
+        ]
+
+
+local_index = LocalVectorIndex()
@@ -0,0 +1,369 @@
+import os
+import re
+import tempfile
+import json
+import hashlib
+import dotenv
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+dotenv.load_dotenv()
+
+PROFILE_FAST_PATH_ENABLED = os.getenv("PROFILE_FAST_PATH_ENABLED", "true").lower() == "true"
+BUSINESS_TIMEZONE = ZoneInfo(os.getenv("BUSINESS_TIMEZONE", "Asia/Kolkata"))
+# Longer messages probably ask something more specific; leave them to the LLM
+PROFILE_FAST_PATH_MAX_WORDS = int(os.getenv("PROFILE_FAST_PATH_MAX_WORDS", "10"))
+VOICE_TEMPLATE_CACHE_SIZE = int(os.getenv("VOICE_TEMPLATE_CACHE_SIZE", "512"))
+
+DEFAULT_OPERATING_HOURS = {"weekday": "09:00-21:00", "weekend": "10:00-18:00", "closed_days": []}
+
+DAY_NAMES = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+DAY_NAMES_HI = ["सोमवार", "मंगलवार", "बुधवार", "गुरुवार", "शुक्रवार", "शनिवार", "रविवार"]
+
+# Each pattern names the business itself ("your address", "dukaan kahan
+# hai", "आपका नंबर"), or is a short Hinglish / Hindi question where the
+# shop is the implied subject ("abhi khula hai kya", "पता क्या है")
+BUSINESS_SUBJECT = r"(you|u|your|ur|shop|store|restaurant|outlet|place)"
+INTENT_PATTERNS = {
+    "open_now": re.compile(
+        r"(\b" + BUSINESS_SUBJECT + r"\b.*\b(open|closed)\b.*\b(now|today)\b)"
+        r"|(\b(now|today)\b.*\b" + BUSINESS_SUBJECT + r"\b.*\b(open|closed)\b)"
+        r"|(\b(khula|khuli|khule|band)\b.*\b(abhi|aaj)\b)|(\b(abhi|aaj)\b.*\b(khula|khuli|khule|band)\b)"
+        r"|(\b(are|r) (you|u) (open|closed)\b)"
+        r"|((अभी|आज).*(खुला|खुली|खुले|बंद))|((खुला|खुली|खुले|बंद).*(अभी|आज))"
+    ),
+    "hours": re.compile(
+        r"\b(your|ur|shop|store|restaurant|outlet)\s+(timings?|hours|opening hours|opening time|closing time)\b"
+        r"|\b(opening hours|business hours|working hours)\b"
+        r"|\b(timings?|hours|opening time|closing time)\s+(of|for)\s+(your|ur|the)\s+(shop|store|restaurant|outlet)\b"
+        r"|\b(what time|when) (do|does|will) (you|u|the shop|the store) (open|close)\b"
+        r"|\b(aapki|apki|aapka|apka|dukan ki|dukaan ki|shop ki)\s+(timings?|timing)\b"
+        r"|\b(aap|ap|dukan|dukaan|shop|store)\b.*\b(kab|kitne baje)\s+(khul|band)"
+        r"|\b(kab|kitne baje)\s+(khulte|khulta|khulti|khuloge|band hote|band hota|band hoti)\b"
+        r"|(आपकी|दुकान\s*की)\s*टाइमिंग|(खुलने|बंद होने)\s*का\s*(समय|टाइम)|(आपका|दुकान का)\s*समय"
+        r"|(कब|कितने\s*बजे)\s*(खुलते|खुलता|खुलती|खुलेंगे|खुलेगी|बंद होते|बंद होता|बंद होती)"
+    ),
+    "location": re.compile(
+        r"\b(your|ur|shop|store|restaurant|outlet)\s+(address|location)\b"
+        r"|\b(what'?s|what is|send|share)\s+(your|ur)\s+(address|location)\b"
+        r"|\bdirections to (your|ur|the) (shop|store|restaurant|outlet)\b"
+        r"|\bwhere (are|r) (you|u)\b|\bwhere is (your|ur|the) (shop|store|restaurant|outlet)\b"
+        r"|\b(aapka|apka|aapki|apki|dukan ka|dukaan ka|shop ka)\s+(address|location|pata)\b"
+        r"|(?<!my )(?<!mera )\b(address|location)\s+(kya|kahan|batao|bataiye)\b"
+        r"|\b(aap|ap|dukan|dukaan|shop|store|restaurant|outlet)\b.*\b(kahan|kaha|kidhar)\b"
+        r"|\b(kahan|kaha|kidhar)\b.*\b(dukan|dukaan|shop|store|restaurant|outlet)\b|\b(kahan|kaha|kidhar)\s+ho\b"
+        r"|(आपका|आपकी|दुकान\s*का|स्टोर\s*का)\s*(पता|एड्रेस|लोकेशन)|(?<!मेरा )(पता|एड्रेस|लोकेशन)\s*(क्या|बताइए|बताओ)"
+        r"|(आप|दुकान|स्टोर|रेस्टोरेंट)\s.*(कहाँ|कहां|किधर)|(कहाँ|कहां|किधर)\s.*(दुकान|स्टोर|रेस्टोरेंट)"
+    ),
+    "phone": re.compile(
+        r"\b(your|ur|shop|store|restaurant|outlet)\s+(phone|contact|mobile|whatsapp|number)\b"
+        r"|\b(phone|contact|mobile|whatsapp)(\s+(number|no|details))?\s+(of|for)\s+(your|ur|the)\s+(shop|store|restaurant|outlet)\b"
+        r"|\bhow (can|do) i (call|contact|reach) (you|u)\b"
+        r"|\b(aapka|apka|aapki|apki|dukan ka|dukaan ka|shop ka)\s+(number|phone|mobile|contact|whatsapp)\b"
+        r"|(आपका|आपके|आपकी|दुकान\s*का|स्टोर\s*का)\s*(फ़ोन|फोन|नंबर|नम्बर|मोबाइल|संपर्क|व्हाट्सएप)"
+    ),
+}
+
+# Messages about an order, a delivery, an offer or the menu ("delivery
+# timings", "order band hai kya") ask about that, not the business profile
+OTHER_SUBJECT = re.compile(
+    r"\b(orders?|delivery|deliveries|deliver|offers?|discount|menu|items?|dish|dishes|available|availability"
+    r"|stock|booking|parcel|happy hour|milega|milegi|milenge)\b"
+    r"|ऑर्डर|आर्डर|डिलीवरी|ऑफर|मेनू|मेन्यू|आइटम|उपलब्ध|मिलेगा|मिलेगी|मिलेंगे"
+)
+
+# Questions about a particular day or date ("are you open on sunday",
+# "kal khule ho") are left to the LLM; the templates only know about now
+SPECIFIC_DAY = re.compile(
+    r"\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday|mondays|tuesdays|wednesdays"
+    r"|thursdays|fridays|saturdays|sundays|tomorrow|tonight|weekends?|holidays?|festival|diwali|holi|eid"
+    r"|christmas|date|january|february|march|april|june|july|august|september|october|november|december"
+    r"|somvar|mangalvar|budhvar|guruvar|shukravar|shanivar|ravivar|itwar|kal|parso|parson|chutti)\b"
+    r"|\b\d{1,2}(st|nd|rd|th)\b|\b\d{1,2}[/-]\d{1,2}\b"
+    r"|" + "|".join(DAY_NAMES_HI) + r"|कल|परसों|छुट्टी|त्योहार|दिवाली|होली|तारीख"
+)
+
+# Romanized Hindi markers that make us answer in Hinglish
+HINGLISH_MARKERS = re.compile(r"\b(kya|hai|hain|kab|kahan|kaha|kitne|aap|ap|ka|ki|ke|abhi|aaj|batao|bataiye)\b")
+DEVANAGARI = re.compile(r"[\u0900-\u097F]")
+
+TEMPLATES = {
+    "en": {
+        "open": "Yes, we're open right now until {close}.",
+        "closed_opens": "We're closed right now. We open {day} at {open}.",
+        "closed_unknown": "We're closed right now.",
+        "hours": "Our hours are {weekday} on weekdays and {weekend} on weekends.",
+        "closed_days": " We are closed on {days}.",
+        "location": "We're located at {location}.",
+        "phone": "You can reach us at {phone}.",
+        "today": "today",
+        "tomorrow": "tomorrow",
+    },
+    "hinglish": {
+        "open": "Haan, hum abhi khule hain, {close} tak.",
+        "closed_opens": "Abhi hum band hain. Hum {day} {open} baje khulenge.",
+        "closed_unknown": "Abhi hum band hain.",
+        "hours": "Hamari timings weekdays mein {weekday} aur weekends par {weekend} hain.",
+        "closed_days": " {days} ko hum band rehte hain.",
+        "location": "Hamara address hai: {location}.",
+        "phone": "Aap humein {phone} par call kar sakte hain.",
+        "today": "aaj",
+        "tomorrow": "kal",
+    },
+    "hi": {
+        "open": "जी हाँ, हम अभी खुले हैं, {close} बजे तक।",
+        "closed_opens": "अभी हम बंद हैं। हम {day} {open} बजे खुलेंगे।",
+        "closed_unknown": "अभी हम बंद हैं।",
+        "hours": "हमारा समय सोमवार से शुक्रवार {weekday} और शनिवार-रविवार {weekend} है।",
+        "closed_days": " {days} को हम बंद रहते हैं।",
+        "location": "हमारा पता है: {location}।",
+        "phone": "आप हमें {phone} पर कॉल कर सकते हैं।",
+        "today": "आज",
+        "tomorrow": "कल",
+    },
+}
+
+
+def parse_operating_hours(business) -> dict:
+    """Operating hours of a business as a dict, with defaults filled in"""
+    operating_hours = getattr(business, "operatingHours", None)
+
+    if isinstance(operating_hours, str):
+        try:
+            operating_hours = json.loads(operating_hours)
+        except Exception:
+            operating_hours = None
+
+    return {**DEFAULT_OPERATING_HOURS, **(operating_hours or {})}
+
+
+def _parse_range(value: str) -> Optional[Tuple[int, int]]:
+    """'09:00-21:00' -> (540, 1260) minutes since midnight"""
+    match = re.match(r"^\s*(\d{1,2}):?(\d{2})?\s*-\s*(\d{1,2}):?(\d{2})?\s*$", value or "")
+    if not match:
+        return None
+
+    start = int(match.group(1)) * 60 + int(match.group(2) or 0)
+    end = int(match.group(3)) * 60 + int(match.group(4) or 0)
+    return start, end
+
+
+def _closed_day_indexes(hours: dict) -> set:
+    closed = set()
+    for day in hours.get("closed_days") or []:
+        day = str(day).strip().lower()
+        # A blank entry would prefix-match every day
+        if not day:
+            continue
+        for index, name in enumerate(DAY_NAMES):
+            if name.startswith(day[:3]):
+                closed.add(index)
+    return closed
+
+
+def _range_for_day(hours: dict, weekday_index: int) -> Optional[Tuple[int, int]]:
+    if weekday_index in _closed_day_indexes(hours):
+        return None
+    key = "weekend" if weekday_index >= 5 else "weekday"
+    return _parse_range(hours.get(key, ""))
+
+
+def _format_minutes(minutes: int) -> str:
+    minutes %= 24 * 60
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def business_status(business, now: Optional[datetime] = None) -> dict:
+    """
+    Whether the business is open at `now`, computed from OperatingHours.
+
+    Returns {"open": bool, "closes_at": "HH:MM"} when open, otherwise
+    {"open": False, "opens_at": "HH:MM", "opens_in_days": n} (opens_at is
+    None when no opening is found in the next week). Ranges that end
+    before they start run past midnight.
+    """
+    now = now or datetime.now(BUSINESS_TIMEZONE)
+    hours = parse_operating_hours(business)
+    minute = now.hour * 60 + now.minute
+    today = now.weekday()
+
+    # Yesterday's overnight range may still be running
+    yesterday = _range_for_day(hours, (today - 1) % 7)
+    if yesterday and yesterday[1] < yesterday[0] and minute < yesterday[1]:
+        return {"open": True, "closes_at": _format_minutes(yesterday[1])}
+
+    current = _range_for_day(hours, today)
+    if current:
+        start, end = current
+        if start <= minute < (end if end > start else end + 24 * 60):
+            return {"open": True, "closes_at": _format_minutes(end)}
+
+    for offset in range(0, 8):
+        day_range = _range_for_day(hours, (today + offset) % 7)
+        if day_range and (offset > 0 or minute < day_range[0]):
+            return {"open": False, "opens_at": _format_minutes(day_range[0]), "opens_in_days": offset}
+
+    return {"open": False, "opens_at": None, "opens_in_days": None}
+
+
+def detect_language(text: str) -> str:
+    if DEVANAGARI.search(text):
+        return "hi"
+    if HINGLISH_MARKERS.search(text.lower()):
+        return "hinglish"
+    return "en"
+
+
+def match_intent(text: str) -> Optional[str]:
+    """Return the single profile intent a short message asks about, if any"""
+    if not text or len(text.split()) > PROFILE_FAST_PATH_MAX_WORDS:
+        return None
+
+    lowered = text.lower()
+    if SPECIFIC_DAY.search(lowered) or OTHER_SUBJECT.search(lowered):
+        return None
+
+    intents = [name for name, pattern in INTENT_PATTERNS.items() if pattern.search(lowered)]
+
+    # "are you open now, what are your timings" -> status covers both
+    if set(intents) == {"open_now", "hours"}:
+        return "open_now"
+
+    return intents[0] if len(intents) == 1 else None
+
+
+def _day_label(templates: dict, language: str, offset: int, now: datetime) -> str:
+    if offset == 0:
+        return templates["today"]
+    if offset == 1:
+        return templates["tomorrow"]
+
+    index = (now.weekday() + offset) % 7
+    return DAY_NAMES_HI[index] if language == "hi" else DAY_NAMES[index].capitalize()
+
+
+def answer_profile_question(text: str, business, now: Optional[datetime] = None) -> Optional[Tuple[str, str]]:
+    """
+    Answer hours / open-now / location / phone questions from the Business
+    record without calling the LLM.
+
+    Returns (intent, reply) or None when the message is not such a question
+    or the business has not filled in the needed field.
+    """
+    if not PROFILE_FAST_PATH_ENABLED:
+        return None
+
+    intent = match_intent(text)
+    if not intent:
+        return None
+
+    language = detect_language(text)
+    templates = TEMPLATES[language]
+
+    if intent == "location":
+        if not business.location:
+            return None
+        return intent, templates["location"].format(location=business.location)
+
+    if intent == "phone":
+        if not business.phone:
+            return None
+        return intent, templates["phone"].format(phone=business.phone)
+
+    hours = parse_operating_hours(business)
+
+    if intent == "hours":
+        reply = templates["hours"].format(weekday=hours["weekday"], weekend=hours["weekend"])
+        closed_days = [str(day) for day in hours.get("closed_days") or []]
+        if closed_days:
+            reply += templates["closed_days"].format(days=", ".join(closed_days))
+        return intent, reply
+
+    now = now or datetime.now(BUSINESS_TIMEZONE)
+    status = business_status(business, now)
+
+    if status["open"]:
+        return intent, templates["open"].format(close=status["closes_at"])
+
+    if status["opens_at"] is None:
+        return intent, templates["closed_unknown"]
+
+    day = _day_label(templates, language, status["opens_in_days"], now)
+    return intent, templates["closed_opens"].format(day=day, open=status["opens_at"])
+
+
+class VoiceTemplateCache:
+    """
+    Synthesized audio for templated profile answers.
+
+    Keyed by business and reply text, so a settings change that alters the
+    reply simply misses; least recently used entries are evicted.
+    """
+
+    def __init__(self, max_entries: int = VOICE_TEMPLATE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._audio: "OrderedDict[str, bytes]" = OrderedDict()
+
+    @staticmethod
+    def _key(business_id: str, text: str) -> str:
+        return f"{business_id}:{hashlib.sha1(text.encode('utf-8')).hexdigest()}"
+
+    def get(self, business_id: str, text: str) -> Optional[bytes]:
+        key = self._key(business_id, text)
+        audio = self._audio.get(key)
+        if audio is not None:
+            self._audio.move_to_end(key)
+        return audio
+
+    def put(self, business_id: str, text: str, audio: bytes):
+        self._audio[self._key(business_id, text)] = audio
+        while len(self._audio) > self.max_entries:
+            self._audio.popitem(last=False)
+
+
+def template_replies(business, now: Optional[datetime] = None) -> List[str]:
+    """Every templated reply a business can currently give, for prewarming"""
+    probes = {
+        "en": ["are you open now", "what are your timings", "where are you located", "what is your phone number"],
+        "hinglish": ["abhi khula hai kya", "aapki timings kya hai", "address kahan hai", "aapka number kya hai"],
+        "hi": ["क्या अभी खुला है", "आपका समय क्या है", "आपका पता क्या है", "आपका फोन नंबर"],
+    }
+    replies = []
+    for questions in probes.values():
+        for question in questions:
+            answer = answer_profile_question(question, business, now)
+            if answer:
+                replies.append(answer[1])
+    return replies
+
+
+async def _synthesize_bytes(tts_service, text: str) -> Optional[bytes]:
+    fd, path = tempfile.mkstemp(suffix=".ogg")
+    os.close(fd)
+    try:
+        if not await tts_service.synthesize(text, path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+
+async def prewarm_voice_templates(business, tts_service):
+    """Pre-synthesize voice replies for every profile template of a business"""
+    for text in template_replies(business):
+        if voice_template_cache.get(business.id, text) is not None:
+            continue
+
+        audio = await _synthesize_bytes(tts_service, text)
+        if audio:
+            voice_template_cache.put(business.id, text, audio)
+        elif not tts_service.provider.available:
+            # TTS is down; replies fall back to text until it recovers
+            break
+
+
+voice_template_cache = VoiceTemplateCache()
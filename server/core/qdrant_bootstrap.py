@@ -0,0 +1,169 @@
+import os
+import asyncio
+import argparse
+import dotenv
+
+from qdrant_client.models import (
+    Disabled,
+    Distance,
+    HnswConfigDiff,
+    KeywordIndexParams,
+    KeywordIndexType,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    VectorParams,
+    VectorParamsDiff,
+)
+
+from server.core.rag import COLLECTION_NAME, get_qdrant_client, init_qdrant_client, close_qdrant_client
+from server.core.embedding import OUTPUT_DIMENSIONS
+from server.utils.log_utils import get_logger
+
+dotenv.load_dotenv()
+
+logger = get_logger(__name__)
+
+# "int8" enables scalar quantization (quantized vectors in RAM, originals on disk)
+QDRANT_QUANTIZATION = os.getenv("QDRANT_QUANTIZATION", "none").lower()
+QDRANT_HNSW_M = int(os.getenv("QDRANT_HNSW_M", "16"))
+QDRANT_HNSW_EF_CONSTRUCT = int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT", "100"))
+# Per-tenant graph links built on top of the business_id payload index
+QDRANT_HNSW_PAYLOAD_M = int(os.getenv("QDRANT_HNSW_PAYLOAD_M", "16"))
+
+TENANT_FIELD = "business_id"
+
+
+def _quantization_enabled() -> bool:
+    return QDRANT_QUANTIZATION == "int8"
+
+
+def _quantization_config():
+    if not _quantization_enabled():
+        return None
+
+    return ScalarQuantization(
+        scalar=ScalarQuantizationConfig(
+            type=ScalarType.INT8,
+            quantile=0.99,
+            always_ram=True,
+        )
+    )
+
+
+def _hnsw_config() -> HnswConfigDiff:
+    return HnswConfigDiff(
+        m=QDRANT_HNSW_M,
+        ef_construct=QDRANT_HNSW_EF_CONSTRUCT,
+        payload_m=QDRANT_HNSW_PAYLOAD_M,
+    )
+
+
+async def _ensure_tenant_index(payload_schema: dict):
+    """Create the business_id keyword index, marked as the tenant key"""
+    existing = payload_schema.get(TENANT_FIELD)
+    if existing is not None:
+        if getattr(existing.params, "is_tenant", False):
+            return
+
+        # A plain keyword index from before tenancy; is_tenant cannot be updated in place
+        await get_qdrant_client().delete_payload_index(
+            collection_name=COLLECTION_NAME,
+            field_name=TENANT_FIELD,
+            wait=True,
+        )
+        logger.info("Dropped non-tenant payload index on %s.%s", COLLECTION_NAME, TENANT_FIELD)
+
+    await get_qdrant_client().create_payload_index(
+        collection_name=COLLECTION_NAME,
+        field_name=TENANT_FIELD,
+        field_schema=KeywordIndexParams(
+            type=KeywordIndexType.KEYWORD,
+            is_tenant=True,
+        ),
+        wait=True,
+    )
+    logger.info("Created tenant payload index on %s.%s", COLLECTION_NAME, TENANT_FIELD)
+
+
+async def ensure_collection():
+    """Create the collection if it is missing, otherwise validate it"""
+
+    client = get_qdrant_client()
+
+    if not await client.collection_exists(COLLECTION_NAME):
+        try:
+            await client.create_collection(
+                collection_name=COLLECTION_NAME,
+                vectors_config=VectorParams(
+                    size=OUTPUT_DIMENSIONS,
+                    distance=Distance.COSINE,
+                    on_disk=_quantization_enabled(),
+                ),
+                hnsw_config=_hnsw_config(),
+                quantization_config=_quantization_config(),
+            )
+        except Exception:
+            # Another process created it between the check and the create
+            if not await client.collection_exists(COLLECTION_NAME):
+                raise
+            logger.info("Qdrant collection %s already exists", COLLECTION_NAME)
+        else:
+            logger.info("Created Qdrant collection %s", COLLECTION_NAME)
+            await _ensure_tenant_index({})
+            return
+
+    info = await client.get_collection(COLLECTION_NAME)
+    vectors = info.config.params.vectors
+
+    if isinstance(vectors, VectorParams):
+        if vectors.size != OUTPUT_DIMENSIONS:
+            raise RuntimeError(
+                f"Collection {COLLECTION_NAME} has vector size {vectors.size}, "
+                f"expected {OUTPUT_DIMENSIONS}"
+            )
+        # Scores and thresholds (and the local index) assume cosine similarity
+        if vectors.distance != Distance.COSINE:
+            raise RuntimeError(
+                f"Collection {COLLECTION_NAME} uses {vectors.distance} distance, "
+                f"expected {Distance.COSINE}"
+            )
+
+    await _ensure_tenant_index(info.payload_schema or {})
+
+
+async def migrate_collection():
+    """Apply the configured index, HNSW and quantization settings to an existing collection"""
+
+    await ensure_collection()
+
+    await get_qdrant_client().update_collection(
+        collection_name=COLLECTION_NAME,
+        vectors_config={"": VectorParamsDiff(on_disk=_quantization_enabled())},
+        hnsw_config=_hnsw_config(),
+        quantization_config=_quantization_config() or Disabled.DISABLED,
+    )
+    logger.info("Migrated Qdrant collection %s (quantization=%s)", COLLECTION_NAME, QDRANT_QUANTIZATION)
+
+
+async def main(migrate: bool):
+    await init_qdrant_client()
+    try:
+        if migrate:
+            await migrate_collection()
+        else:
+            await ensure_collection()
+    finally:
+        await close_qdrant_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create or migrate the Qdrant collection")
+    parser.add_argument(
+        "--migrate",
+        action="store_true",
+        help="apply payload index, HNSW and quantization settings to an existing collection",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(args.migrate))
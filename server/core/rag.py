@@ -1,25 +1,113 @@
 import os
+import asyncio
 import dotenv
-from typing import List
+from typing import AsyncIterator, Callable, Dict, List, Optional
 
-from qdrant_client import QdrantClient
-from qdrant_client.models import PointStruct
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    PointStruct,
+    PointIdsList,
+    Filter,
+    FieldCondition,
+    MatchValue,
+    SearchParams,
+    QuantizationSearchParams,
+    QueryRequest,
+)
 
-from server.core.embedding import embed_text
-from server.utils.qdrant_utils import clean_qdrant_response
+from server.core.embedding import aembed_text
+from server.core.cache_versions import business_changed
+from server.core.local_index import local_index, LOCAL_INDEX_ENABLED
+from server.core.lexical import lexical_index, LEXICAL_ENABLED, is_decisive, fuse
+from server.core.resilience import get_provider
+from server.utils.qdrant_utils import clean_qdrant_response, content_hash, document_id
+from server.utils.singleflight import singleflight_group, fingerprint
+from server.utils.metrics import record_cache
+from server.utils.log_utils import get_logger
 
 dotenv.load_dotenv()
 
-client = QdrantClient(
-    url=os.getenv("QDRANT_URL"), 
-    api_key=os.getenv("QDRANT_API_KEY"),
-)
+logger = get_logger(__name__)
+
+# Created and closed by the FastAPI app (see server/main.py)
+client: Optional[AsyncQdrantClient] = None
 
 COLLECTION_NAME = "business_faqs"
 
-def insert_documents(documents: List[dict]): 
+# Timeouts and circuit breaking for the query/scroll path
+qdrant_provider = get_provider("qdrant")
+
+search_flight = singleflight_group("rag_search")
+
+# Per-business locks around loading the in-process indexes
+_index_locks: Dict[str, asyncio.Lock] = {}
+
+# Query-time tuning; hnsw_ef defaults to Qdrant's own setting when unset
+QDRANT_SEARCH_HNSW_EF = os.getenv("QDRANT_SEARCH_HNSW_EF")
+
+SEARCH_PARAMS = SearchParams(
+    hnsw_ef=int(QDRANT_SEARCH_HNSW_EF) if QDRANT_SEARCH_HNSW_EF else None,
+    exact=os.getenv("QDRANT_SEARCH_EXACT", "false").lower() == "true",
+    # Only used when the collection has quantization enabled
+    quantization=QuantizationSearchParams(
+        rescore=os.getenv("QDRANT_RESCORE", "true").lower() == "true",
+        oversampling=float(os.getenv("QDRANT_OVERSAMPLING", "2.0")),
+    ),
+)
+
+async def init_qdrant_client() -> AsyncQdrantClient:
+    """
+    Create the shared async Qdrant client (gRPC when QDRANT_PREFER_GRPC is
+    set). QDRANT_URL=":memory:" runs an in-process store for load tests.
+    """
+    global client
+
+    if client is None and os.getenv("QDRANT_URL") == ":memory:":
+        client = AsyncQdrantClient(location=":memory:")
+
+    if client is None:
+        client = AsyncQdrantClient(
+            url=os.getenv("QDRANT_URL"),
+            api_key=os.getenv("QDRANT_API_KEY"),
+            prefer_grpc=os.getenv("QDRANT_PREFER_GRPC", "true").lower() == "true",
+            grpc_port=int(os.getenv("QDRANT_GRPC_PORT", "6334")),
+        )
+
+    return client
+
+
+async def close_qdrant_client():
+    global client
+
+    if client is not None:
+        await client.close()
+        client = None
+
+
+def get_qdrant_client() -> AsyncQdrantClient:
+    if client is None:
+        raise RuntimeError("Qdrant client is not initialized")
+    return client
+
+
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "64"))
+INGEST_CONCURRENCY = int(os.getenv("INGEST_CONCURRENCY", "4"))
+INGEST_MAX_RETRIES = int(os.getenv("INGEST_MAX_RETRIES", "3"))
+
+
+async def _corpus_changed(business_id: str):
+    """Invalidate everything derived from a business's stored documents, in every worker"""
+    # Cached answers may no longer match the knowledge base
+    try:
+        await business_changed(business_id)
+    except Exception as e:
+        logger.warning("Could not publish cache invalidation: %s", e, extra={"business_id": business_id})
+
+
+async def _insert_batch(documents: List[dict], wait: bool = False):
+    """Embed and upsert a single batch of documents"""
     document_texts = [doc["text"] for doc in documents]
-    vectors = embed_text(document_texts)
+    vectors = await aembed_text(document_texts)
 
     if len(vectors) != len(documents):
         raise RuntimeError("Embedding count mismatch")
@@ -34,63 +122,407 @@ def insert_documents(documents: List[dict]):
                 vector=vectors[i],
                 payload={
                     "text": doc["text"],
-                    "business_id": doc["business_id"]
+                    "business_id": doc["business_id"],
+                    "content_hash": content_hash(doc["text"]),
                 },
             )
         )
     
-    return client.upsert(
+    # Don't block on indexing unless asked; Qdrant applies the batch asynchronously
+    return await get_qdrant_client().upsert(
         collection_name=COLLECTION_NAME,
         points=points,
+        wait=wait,
     )
 
 
-def search_documents(query: str, business_id: str, limit: int = 3):
-    query_vector = embed_text(
-        [query],
-        task_type="retrieval_query",
+async def insert_documents(
+    documents: List[dict],
+    on_progress: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """
+    Embed and upsert documents in bounded batches with limited concurrency.
+
+    Failed batches are retried with exponential backoff. Batches that still
+    fail are reported back in `failed_ids` so the caller can resubmit just
+    those documents instead of the whole upload.
+
+    The final batch is sent on its own and waits for Qdrant to apply it.
+    Qdrant applies a collection's updates in order, so once it returns the
+    whole upload is searchable and the caches built from it can be dropped.
+    """
+    batches = [
+        documents[i:i + INGEST_BATCH_SIZE]
+        for i in range(0, len(documents), INGEST_BATCH_SIZE)
+    ]
+    semaphore = asyncio.Semaphore(INGEST_CONCURRENCY)
+
+    progress = {
+        "total": len(documents),
+        "inserted": 0,
+        "failed": 0,
+        "batches": len(batches),
+    }
+    failed_ids = []
+
+    async def run_batch(index: int, batch: List[dict], wait: bool = False):
+        async with semaphore:
+            for attempt in range(1, INGEST_MAX_RETRIES + 1):
+                try:
+                    await _insert_batch(batch, wait)
+                    progress["inserted"] += len(batch)
+                    logger.info("Ingested batch %d/%d (%d/%d)", index + 1, len(batches), progress["inserted"], progress["total"])
+                    break
+                except Exception as e:
+                    logger.warning("Ingestion batch %d attempt %d failed: %s", index + 1, attempt, e)
+                    if attempt < INGEST_MAX_RETRIES:
+                        await asyncio.sleep(2 ** (attempt - 1))
+            else:
+                progress["failed"] += len(batch)
+                failed_ids.extend(doc["id"] for doc in batch)
+
+            if on_progress:
+                on_progress(dict(progress))
+
+    await asyncio.gather(*(run_batch(i, batch) for i, batch in enumerate(batches[:-1])))
+    if batches:
+        await run_batch(len(batches) - 1, batches[-1], wait=True)
+
+    # Only now is the new corpus visible to the scrolls that rebuild the indexes
+    for business_id in {doc["business_id"] for doc in documents}:
+        await _corpus_changed(business_id)
+
+    return {
+        "status": "partial" if failed_ids else "completed",
+        **progress,
+        "failed_ids": failed_ids,
+    }
+
+
+async def search_documents(
+    query: str,
+    business_id: str,
+    limit: int = 3,
+    query_vector: Optional[List[float]] = None,
+    dense: bool = True,
+):
+    """
+    Hybrid search for a business's documents.
+
+    Degrades instead of failing: when Gemini or Qdrant is unavailable the
+    lexical results (or nothing) are returned so the turn can still be
+    answered without knowledge-base context. dense=False skips the
+    embedding and vector search entirely.
+
+    Concurrent identical searches share one lookup, so callers must not
+    mutate the returned list.
+    """
+    return await search_flight.do(
+        fingerprint(business_id, query, limit, dense),
+        _search_documents,
+        query,
+        business_id,
+        limit,
+        query_vector,
+        dense,
     )
 
-    results = client.query_points(
+
+async def _search_documents(
+    query: str,
+    business_id: str,
+    limit: int,
+    query_vector: Optional[List[float]],
+    dense: bool,
+) -> List[dict]:
+    lexical_results = []
+
+    if LEXICAL_ENABLED:
+        try:
+            await load_business_indexes(business_id)
+        except Exception as e:
+            logger.warning("Lexical index unavailable: %s", e, extra={"business_id": business_id})
+
+        bm25 = lexical_index.get(business_id)
+        if bm25 is not None:
+            lexical_results = bm25.search(query, limit)
+
+            # Exact keyword hit: skip the embedding call and vector search
+            decisive = is_decisive(lexical_results)
+            record_cache("lexical_fast_path", decisive)
+            if decisive:
+                return [{"text": r["text"], "score": r["score"]} for r in lexical_results]
+
+    dense_results = []
+
+    if dense:
+        try:
+            if query_vector is None:
+                query_vector = (await aembed_text(
+                    [query],
+                    task_type="retrieval_query",
+                ))[0]
+
+            dense_results = await _dense_search(query_vector, business_id, limit)
+        except Exception as e:
+            logger.warning("Dense search unavailable: %s", e, extra={"business_id": business_id})
+
+    if lexical_results:
+        return fuse(dense_results, lexical_results, limit)
+
+    return dense_results
+
+
+async def _dense_search(query_vector: List[float], business_id: str, limit: int) -> List[dict]:
+    if LOCAL_INDEX_ENABLED:
+        # Small tenants are searched in-process; None means use Qdrant
+        await load_business_indexes(business_id)
+        tenant = local_index.get(business_id)
+        if tenant is not None:
+            return local_index.search(tenant, query_vector, limit)
+
+    results = await qdrant_provider.call(
+        get_qdrant_client().query_points,
         collection_name=COLLECTION_NAME,
-        query=query_vector[0],
+        query=query_vector,
         limit=limit,
-        query_filter={
-            "must": [
-                {
-                    "key": "business_id",
-                    "match": {"value": business_id},
-                }
-            ]
-        },
+        search_params=SEARCH_PARAMS,
+        query_filter=_business_filter(business_id),
     )
 
     return clean_qdrant_response(results.model_dump())
 
 
-def get_documents_by_business(business_id: str):
-    """Fetch all documents stored for a business from Qdrant"""
-    from qdrant_client.models import Filter, FieldCondition, MatchValue
-    
-    results, _ = client.scroll(
+async def prewarm_business(business_id: str):
+    """Load the in-process lexical and vector indexes of a business ahead of its first query"""
+    await load_business_indexes(business_id)
+
+
+async def search_documents_batch(
+    queries: List[str],
+    business_id: str,
+    limit: int = 3,
+) -> List[List[dict]]:
+    """Search several queries for one business with a single embedding call and Qdrant request"""
+    if not queries:
+        return []
+
+    query_vectors = await aembed_text(queries, task_type="retrieval_query")
+
+    responses = await qdrant_provider.call(
+        get_qdrant_client().query_batch_points,
+        collection_name=COLLECTION_NAME,
+        requests=[
+            QueryRequest(
+                query=vector,
+                limit=limit,
+                filter=_business_filter(business_id),
+                params=SEARCH_PARAMS,
+                with_payload=True,
+            )
+            for vector in query_vectors
+        ],
+    )
+
+    return [clean_qdrant_response(response.model_dump()) for response in responses]
+
+
+def format_rag_context(results: List[dict], min_score: float = 0.65) -> str:
+    """Bullet list of the results relevant enough to put in the prompt"""
+    return "\n\n".join(f"- {doc['text']}" for doc in results if doc["score"] > min_score)
+
+
+def _business_filter(business_id: str) -> Filter:
+    return Filter(
+        must=[
+            FieldCondition(
+                key="business_id",
+                match=MatchValue(value=business_id),
+            )
+        ]
+    )
+
+
+async def _scroll_business(
+    business_id: str,
+    page_size: int = 256,
+    with_payload: bool = True,
+    with_vectors: bool = False,
+) -> AsyncIterator[list]:
+    """Walk the full scroll of a business's points one page at a time"""
+    offset = None
+
+    while True:
+        results, offset = await qdrant_provider.call(
+            get_qdrant_client().scroll,
+            collection_name=COLLECTION_NAME,
+            scroll_filter=_business_filter(business_id),
+            limit=page_size,
+            offset=offset,
+            with_payload=with_payload,
+            with_vectors=with_vectors,
+        )
+        yield results
+
+        if offset is None:
+            return
+
+
+async def load_business_indexes(business_id: str):
+    """
+    Load whichever in-process indexes of a business are missing or stale,
+    from a single scroll. Vectors are only fetched while the business is
+    still small enough for the local vector index.
+    """
+    lexical = LEXICAL_ENABLED and not lexical_index.is_loaded(business_id)
+    local = LOCAL_INDEX_ENABLED and not local_index.is_loaded(business_id)
+    if not (lexical or local):
+        return
+
+    lock = _index_locks.setdefault(business_id, asyncio.Lock())
+    async with lock:
+        # Another request may have loaded them while we waited
+        lexical = lexical and not lexical_index.is_loaded(business_id)
+        local = local and not local_index.is_loaded(business_id)
+        if not (lexical or local):
+            return
+
+        lexical_version = lexical_index.get_version(business_id)
+        local_version = local_index.get_version(business_id)
+        texts: List[str] = []
+        vector_texts: List[str] = []
+        vectors: List[List[float]] = []
+        offset = None
+
+        while True:
+            results, offset = await qdrant_provider.call(
+                get_qdrant_client().scroll,
+                collection_name=COLLECTION_NAME,
+                scroll_filter=_business_filter(business_id),
+                limit=256 if local else 1000,
+                offset=offset,
+                with_payload=True,
+                with_vectors=local,
+            )
+
+            for point in results:
+                text = (point.payload or {}).get("text")
+                if not text:
+                    continue
+                texts.append(text)
+                if local and point.vector is not None:
+                    vector_texts.append(text)
+                    vectors.append(point.vector)
+
+            if local and len(texts) > local_index.max_docs:
+                # Searched in Qdrant from now on; keep scrolling text only
+                local_index.mark_remote(business_id, local_version)
+                local = False
+                vector_texts, vectors = [], []
+
+            if lexical and len(texts) > lexical_index.max_docs:
+                lexical_index.mark_skipped(business_id, lexical_version)
+                lexical = False
+
+            if offset is None or not (lexical or local):
+                break
+
+        if local:
+            local_index.add(business_id, vector_texts, vectors, local_version)
+        if lexical:
+            await lexical_index.add(business_id, texts, lexical_version)
+
+
+async def _get_business_point_ids(business_id: str) -> set:
+    """Collect every point id stored for a business"""
+    point_ids = set()
+
+    async for page in _scroll_business(business_id, page_size=1000, with_payload=False):
+        point_ids.update(str(point.id) for point in page)
+
+    return point_ids
+
+
+async def sync_documents(business_id: str, texts: List[str]) -> dict:
+    """
+    Make the stored documents of a business match `texts` exactly.
+
+    Point ids are derived from content hashes, so unchanged text is left
+    alone, new or edited text is embedded and upserted, and points whose
+    text is no longer present are deleted.
+    """
+    desired = {}
+    for text in texts:
+        text = text.strip()
+        if text:
+            desired[document_id(business_id, text)] = text
+
+    existing = await _get_business_point_ids(business_id)
+
+    to_add = [
+        {"id": point_id, "business_id": business_id, "text": text}
+        for point_id, text in desired.items()
+        if point_id not in existing
+    ]
+    to_delete = [point_id for point_id in existing if point_id not in desired]
+
+    result = {"status": "completed", "failed_ids": []}
+
+    if to_add:
+        result = await insert_documents(to_add)
+
+    if to_delete:
+        await get_qdrant_client().delete(
+            collection_name=COLLECTION_NAME,
+            points_selector=PointIdsList(points=to_delete),
+            # Indexes rebuilt after the version bump must not see the deleted points
+            wait=True,
+        )
+        await _corpus_changed(business_id)
+
+    logger.info("Synced documents: +%d -%d", len(to_add), len(to_delete), extra={"business_id": business_id})
+
+    return {
+        "status": result["status"],
+        "added": len(to_add) - len(result["failed_ids"]),
+        "deleted": len(to_delete),
+        "unchanged": len(desired) - len(to_add),
+        "failed_ids": result["failed_ids"],
+    }
+
+
+def _format_document(point) -> dict:
+    return {
+        "id": str(point.id),
+        "text": point.payload.get("text", ""),
+    }
+
+
+async def get_documents_by_business(business_id: str, limit: int = 100, offset: Optional[str] = None) -> dict:
+    """
+    Fetch one page of documents stored for a business from Qdrant.
+
+    Pass the returned `next_offset` back as `offset` to get the next page;
+    it is None once the last page has been read.
+    """
+    results, next_offset = await qdrant_provider.call(
+        get_qdrant_client().scroll,
         collection_name=COLLECTION_NAME,
-        scroll_filter=Filter(
-            must=[
-                FieldCondition(
-                    key="business_id",
-                    match=MatchValue(value=business_id),
-                )
-            ]
-        ),
-        limit=100,
+        scroll_filter=_business_filter(business_id),
+        limit=limit,
+        offset=offset,
         with_payload=True,
         with_vectors=False,
     )
     
-    return [
-        {
-            "id": str(point.id),
-            "text": point.payload.get("text", ""),
-        }
-        for point in results
-    ]
+    return {
+        "documents": [_format_document(point) for point in results],
+        "next_offset": str(next_offset) if next_offset is not None else None,
+    }
+
+
+async def iter_documents_by_business(business_id: str, page_size: int = 256) -> AsyncIterator[dict]:
+    """Yield every document of a business, one scroll page in memory at a time"""
+    async for page in _scroll_business(business_id, page_size=page_size):
+        for point in page:
+            yield _format_document(point)
@@ -0,0 +1,224 @@
+import os
+import time
+import random
+import asyncio
+import dotenv
+from typing import Any, Awaitable, Callable, Dict
+
+from server.utils.metrics import PROVIDER_CALLS
+from server.utils.log_utils import get_logger
+
+dotenv.load_dotenv()
+
+logger = get_logger(__name__)
+
+RESILIENCE_ENABLED = os.getenv("RESILIENCE_ENABLED", "true").lower() == "true"
+
+# Defaults per provider; each value can be overridden with
+# RESILIENCE_<PROVIDER>_<SETTING>, e.g. RESILIENCE_SARVAM_TTS_TIMEOUT=4
+DEFAULT_PROVIDER_SETTINGS = {
+    "timeout": 10.0,            # seconds per attempt
+    "max_attempts": 2,          # first try included
+    "failure_threshold": 5,     # consecutive failures that open the circuit
+    "reset_seconds": 30.0,      # how long an open circuit rejects calls
+    "retry_ratio": 0.2,         # retries allowed per successful call
+    "retry_reserve": 10,        # retries allowed before any call succeeded
+    "backoff_base": 0.2,
+    "backoff_max": 2.0,
+}
+
+PROVIDER_SETTINGS = {
+    "sarvam_llm": {"timeout": 8.0, "max_attempts": 1},     # the LLM router hedges instead
+    "sarvam_stt": {"timeout": 8.0},
+    "sarvam_tts": {"timeout": 6.0},
+    "gemini": {"timeout": 3.0},
+    "qdrant": {"timeout": 3.0},
+}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit is open"""
+
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(f"{provider} is unavailable (circuit open, retry in {retry_in:.0f}s)")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures. While
+    open every call is rejected until `reset_seconds` pass; then a single
+    probe is let through (half-open) and its outcome closes or re-opens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def retry_in(self) -> float:
+        return max(self.opened_at + self.reset_seconds - time.monotonic(), 0.0)
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+
+        if self.state == "open" and self.retry_in() == 0:
+            self.state = "half_open"
+            self._probing = False
+
+        if self.state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+
+        return False
+
+    def release(self):
+        # A cancelled probe tells us nothing; let the next call probe instead
+        self._probing = False
+
+    def record_success(self):
+        if self.state != "closed":
+            logger.info("Circuit for %s closed", self.name)
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                logger.warning("Circuit for %s opened after %d failures", self.name, self.failures)
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+class RetryBudget:
+    """Caps retries at a fraction of successful calls so an outage is not amplified"""
+
+    def __init__(self, ratio: float, reserve: int):
+        self.ratio = ratio
+        self.reserve = reserve
+        self.balance = float(reserve)
+
+    def deposit(self):
+        self.balance = min(self.balance + self.ratio, float(self.reserve))
+
+    def withdraw(self) -> bool:
+        if self.balance < 1:
+            return False
+        self.balance -= 1
+        return True
+
+
+class Provider:
+    """Timeouts, jittered retries and a circuit breaker around one upstream"""
+
+    def __init__(self, name: str, settings: dict):
+        self.name = name
+        self.timeout = settings["timeout"]
+        self.max_attempts = max(int(settings["max_attempts"]), 1)
+        self.backoff_base = settings["backoff_base"]
+        self.backoff_max = settings["backoff_max"]
+
+        self.breaker = CircuitBreaker(name, int(settings["failure_threshold"]), settings["reset_seconds"])
+        self.budget = RetryBudget(settings["retry_ratio"], int(settings["retry_reserve"]))
+
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.retries = 0
+
+    @property
+    def available(self) -> bool:
+        return not RESILIENCE_ENABLED or self.breaker.state == "closed" or self.breaker.retry_in() == 0
+
+    async def call(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Await fn(*args, **kwargs) under this provider's policy.
+
+        Raises CircuitOpenError without calling fn while the circuit is
+        open, otherwise the last error once attempts or budget run out.
+        """
+        if not RESILIENCE_ENABLED:
+            return await fn(*args, **kwargs)
+
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self.rejected += 1
+                PROVIDER_CALLS.labels(self.name, "rejected").inc()
+                raise CircuitOpenError(self.name, self.breaker.retry_in())
+
+            attempt += 1
+            self.calls += 1
+
+            try:
+                result = await asyncio.wait_for(fn(*args, **kwargs), timeout=self.timeout)
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception as e:
+                self.failures += 1
+                self.breaker.record_failure()
+                PROVIDER_CALLS.labels(self.name, "error").inc()
+
+                if attempt >= self.max_attempts or self.breaker.state == "open" or not self.budget.withdraw():
+                    raise
+
+                self.retries += 1
+                PROVIDER_CALLS.labels(self.name, "retry").inc()
+                # Full jitter keeps retries from many turns from lining up
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+                logger.warning("%s call failed (%s: %s), retrying in %.2fs", self.name, type(e).__name__, e, delay)
+                await asyncio.sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            self.budget.deposit()
+            PROVIDER_CALLS.labels(self.name, "ok").inc()
+            return result
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "retry_in": round(self.breaker.retry_in(), 1) if self.breaker.state == "open" else 0,
+            "calls": self.calls,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "retries": self.retries,
+            "retry_budget": round(self.budget.balance, 2),
+        }
+
+
+def _provider_settings(name: str) -> dict:
+    settings = {**DEFAULT_PROVIDER_SETTINGS, **PROVIDER_SETTINGS.get(name, {})}
+
+    for key, default in settings.items():
+        value = os.getenv(f"RESILIENCE_{name.upper()}_{key.upper()}")
+        if value is not None:
+            settings[key] = type(default)(value)
+
+    return settings
+
+
+providers: Dict[str, Provider] = {
+    name: Provider(name, _provider_settings(name)) for name in PROVIDER_SETTINGS
+}
+
+
+def get_provider(name: str) -> Provider:
+    return providers[name]
+
+
+def resilience_snapshot() -> dict:
+    return {name: provider.snapshot() for name, provider in providers.items()}
@@ -1,58 +1,106 @@
 import base64
-import json
 import os
 import dotenv
-from sarvamai import SarvamAI
+from sarvamai import AsyncSarvamAI, SarvamAIEnvironment
+from datetime import datetime
 from typing import List, Dict, Optional
 
+from server.core.profile_answers import parse_operating_hours, business_status, BUSINESS_TIMEZONE
+from server.core.resilience import get_provider
+from server.utils.singleflight import singleflight_group, fingerprint
+from server.utils.log_utils import get_logger
+
 dotenv.load_dotenv()
 
+logger = get_logger(__name__)
+
+# Point at a local stand-in for load tests
+SARVAM_BASE_URL = os.getenv("SARVAM_BASE_URL")
+
+
+# One client (and connection pool) shared by the LLM, STT and TTS services,
+# created on first use or at app startup rather than at import
+_client: Optional[AsyncSarvamAI] = None
+
+
+def get_sarvam_client() -> AsyncSarvamAI:
+    global _client
+
+    if _client is None:
+        api_key = os.getenv("SARVAM_API_KEY")
+        if not api_key:
+            raise ValueError("SARVAM_API_KEY not found in environment")
+
+        if SARVAM_BASE_URL:
+            base = SARVAM_BASE_URL.rstrip("/")
+            environment = SarvamAIEnvironment(
+                base=base,
+                creative=f"{base}/dubbing",
+                production=base.replace("http", "ws", 1),
+            )
+            _client = AsyncSarvamAI(api_subscription_key=api_key, environment=environment)
+        else:
+            _client = AsyncSarvamAI(api_subscription_key=api_key)
+
+    return _client
+
+
 class SarvamLLMService:
     def __init__(self):
-        self.api_key = os.getenv("SARVAM_API_KEY")
+        self.provider = get_provider("sarvam_llm")
 
-        self.client = SarvamAI(
-            api_subscription_key=self.api_key
-        )
+    @property
+    def client(self) -> AsyncSarvamAI:
+        return get_sarvam_client()
 
     async def chat_completion(
         self,
         messages: List[Dict[str, str]],
         temperature: float = 0.7,
-        max_tokens: int = 500
+        max_tokens: int = 500,
+        model: Optional[str] = None,
     ) -> Optional[str]:
         """
         Get chat completion from Sarvam AI
         """
         try:
-            response = self.client.chat.completions(
+            # Only pass a model when one is configured; the API has a default
+            extra = {"model": model} if model else {}
+
+            response = await self.provider.call(
+                self.client.chat.completions,
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens,
                 stream=False,
                 n=1,
+                **extra,
             )
 
             return response.choices[0].message.content
 
         except Exception as e:
-            print(f"Sarvam LLM Exception: {str(e)}")
+            logger.warning("Sarvam LLM call failed: %s", e)
             return None
 
 
     def build_system_prompt(self, business: dict) -> str:
         """Build system prompt from business details"""
 
-        operating_hours = business.operatingHours
-
-        if isinstance(operating_hours, str):
-            try:
-                operating_hours = json.loads(operating_hours)
-            except Exception:
-                operating_hours = {"weekday": "09:00-21:00", "weekend": "10:00-18:00"}
+        operating_hours = parse_operating_hours(business)
 
         weekday = operating_hours.get("weekday", "09:00-21:00")
         weekend = operating_hours.get("weekend", "10:00-18:00")
+        closed_days = ", ".join(str(day) for day in operating_hours.get("closed_days") or []) or "None"
+
+        now = datetime.now(BUSINESS_TIMEZONE)
+        status = business_status(business, now)
+        if status["open"]:
+            open_status = f"OPEN (closes at {status['closes_at']})"
+        elif status["opens_at"]:
+            open_status = f"CLOSED (opens at {status['opens_at']})"
+        else:
+            open_status = "CLOSED"
 
         prompt = f"""You are a customer service assistant for {business.businessName}, a {business.category or 'business'}.
 
@@ -67,6 +115,7 @@ Description: {business.description or 'A friendly business serving customers.'}
 Operating Hours:
 - Weekdays (Mon-Fri): {weekday}
 - Weekends (Sat-Sun): {weekend}
+- Closed on: {closed_days}
 
 Your Role:
 You are a {business.botPersona or 'friendly and helpful customer service agent'}.
@@ -79,51 +128,51 @@ Instructions:
 5. For appointments or orders, acknowledge and say you're noting it down
 6. If you don't know something, politely say you'll have someone call them back
 
-Current Time: Check if business is currently open based on operating hours.
+Current Time: {now.strftime("%A %H:%M")}. The business is currently {open_status}.
 
 Remember: Keep responses SHORT and NATURAL for voice conversation."""
         return prompt
 
 class SarvamSTTService:
     def __init__(self):
-        self.api_key = os.getenv("SARVAM_API_KEY")
+        self.provider = get_provider("sarvam_stt")
 
-        if not self.api_key:
-            raise ValueError("SARVAM_API_KEY not found in environment")
+    @property
+    def client(self) -> AsyncSarvamAI:
+        return get_sarvam_client()
 
-        self.client = SarvamAI(
-            api_subscription_key=self.api_key
-        )
-
-    def transcribe(self, file_path: str) -> Optional[str]:
+    async def transcribe(self, file_path: str) -> Optional[str]:
         """
         Transcribe audio file using Sarvam Speech-to-Text API
         Supports Telegram .ogg (opus) files
         """
         try:
             with open(file_path, "rb") as audio_file:
-                response = self.client.speech_to_text.transcribe(
-                    file=audio_file,
-                    model="saarika:v2.5",
-                    language_code="unknown",  # auto-detect
-                )
+                audio = audio_file.read()
+
+            response = await self.provider.call(
+                self.client.speech_to_text.transcribe,
+                file=(os.path.basename(file_path), audio),
+                model="saarika:v2.5",
+                language_code="unknown",  # auto-detect
+            )
 
             return response.transcript
 
         except Exception as e:
-            print(f"Sarvam STT Exception: {str(e)}")
+            logger.warning("Sarvam STT call failed: %s", e)
             return None
 
 class SarvamTTSService:
     def __init__(self):
-        self.api_key = os.getenv("SARVAM_API_KEY")
-        if not self.api_key:
-            raise ValueError("SARVAM_API_KEY not found in environment")
+        self.provider = get_provider("sarvam_tts")
+        self.flight = singleflight_group("sarvam_tts")
 
-        # Initialize SarvamAI client
-        self.client = SarvamAI(api_subscription_key=self.api_key)
+    @property
+    def client(self) -> AsyncSarvamAI:
+        return get_sarvam_client()
 
-    def synthesize(
+    async def synthesize(
         self,
         text: str,
         output_path: str,
@@ -138,11 +187,48 @@ class SarvamTTSService:
         """
 
         if len(text) == 0:
-            print("No text provided for TTS")
+            logger.warning("No text provided for TTS")
             return False
 
+        # Concurrent requests for the same reply share one synthesis;
+        # every caller still writes its own output file
+        audio_bytes = await self.flight.do(
+            fingerprint(text, model, speaker, pace, temperature, speech_sample_rate),
+            self._synthesize_audio,
+            text,
+            model,
+            speaker,
+            pace,
+            temperature,
+            speech_sample_rate,
+        )
+
+        if audio_bytes is None:
+            return False
+
+        try:
+            with open(output_path, "wb") as f:
+                f.write(audio_bytes)
+
+            logger.debug("TTS audio saved to %s", output_path)
+            return True
+
+        except Exception as e:
+            logger.warning("Sarvam TTS call failed: %s", e)
+            return False
+
+    async def _synthesize_audio(
+        self,
+        text: str,
+        model: str,
+        speaker: Optional[str],
+        pace: float,
+        temperature: float,
+        speech_sample_rate: int,
+    ) -> Optional[bytes]:
         try:
-            response = self.client.text_to_speech.convert(
+            response = await self.provider.call(
+                self.client.text_to_speech.convert,
                 text=text,
                 model=model,
                 speaker=speaker,
@@ -154,22 +240,15 @@ class SarvamTTSService:
 
             # response['audios'] contains base64-encoded audio(s)
             if not response.audios or len(response.audios) == 0:
-                print("TTS API returned no audio")
-                return False
+                logger.warning("TTS API returned no audio")
+                return None
 
             audio_base64 = response.audios[0]
-            audio_bytes = base64.b64decode(audio_base64)
-
-            # Write to file
-            with open(output_path, "wb") as f:
-                f.write(audio_bytes)
-
-            print(f"TTS audio saved to {output_path}")
-            return True
+            return base64.b64decode(audio_base64)
 
         except Exception as e:
-            print(f"Sarvam TTS Exception: {str(e)}")
-            return False
+            logger.warning("Sarvam TTS call failed: %s", e)
+            return None
 
 sarvam_llm_service = SarvamLLMService()
 sarvam_stt_service = SarvamSTTService()
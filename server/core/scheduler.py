@@ -0,0 +1,159 @@
+import os
+import time
+import dotenv
+from collections import deque
+from typing import Callable, Dict, Optional
+
+from server.core.llm_router import LatencyTracker
+from server.utils.business_settings import business_settings
+
+dotenv.load_dotenv()
+
+# Turns a tenant may have waiting before its new turns are shed
+SCHEDULER_MAX_QUEUE_PER_BUSINESS = int(os.getenv("SCHEDULER_MAX_QUEUE_PER_BUSINESS", "32"))
+SCHEDULER_QUANTUM = float(os.getenv("SCHEDULER_QUANTUM", "1.0"))
+
+# Used when a business has no explicit settings["weight"]
+PLAN_WEIGHTS = {
+    "free": 1.0,
+    "starter": 2.0,
+    "pro": 4.0,
+    "enterprise": 8.0,
+}
+DEFAULT_WEIGHT = float(os.getenv("SCHEDULER_DEFAULT_WEIGHT", "1.0"))
+
+
+def scheduling_weight(business) -> float:
+    """Weight from settings["weight"], else settings["plan"], else the default"""
+    settings = business_settings(business)
+
+    try:
+        weight = float(settings["weight"])
+    except (KeyError, TypeError, ValueError):
+        weight = PLAN_WEIGHTS.get(str(settings.get("plan", "")).lower(), DEFAULT_WEIGHT)
+
+    return weight if weight > 0 else DEFAULT_WEIGHT
+
+
+class TenantQueue:
+    __slots__ = ("weight", "waiters", "deficit", "served")
+
+    def __init__(self, weight: float):
+        self.weight = weight
+        self.waiters: deque = deque()   # [future, enqueued_at]
+        self.deficit = 0.0
+        self.served = 0
+
+
+class FairScheduler:
+    """
+    Deficit round-robin over per-business queues of waiting turns.
+
+    Every turn costs one unit. Each time a tenant comes up in the round
+    it earns quantum * weight credit and is served while it has at least
+    one unit, so under contention tenants get turn slots in proportion
+    to their weights however deep the busiest queue is.
+    """
+
+    def __init__(
+        self,
+        quantum: float = SCHEDULER_QUANTUM,
+        max_queue_per_business: int = SCHEDULER_MAX_QUEUE_PER_BUSINESS,
+    ):
+        # Below one unit a round could grant nothing, and next() would spin
+        self.quantum = max(quantum, 1.0)
+        self.max_queue_per_business = max_queue_per_business
+
+        self._queues: Dict[str, TenantQueue] = {}
+        self._active: deque = deque()   # business ids with waiters, in round order
+        self.queued = 0
+
+        # Per business: time spent queued, and time spent running
+        self.wait = LatencyTracker()
+        self.turns = LatencyTracker()
+
+    def can_enqueue(self, business_id: str) -> bool:
+        queue = self._queues.get(business_id)
+        return queue is None or len(queue.waiters) < self.max_queue_per_business
+
+    def enqueue(self, business_id: str, weight: float, future) -> list:
+        queue = self._queues.get(business_id)
+        if queue is None:
+            queue = self._queues[business_id] = TenantQueue(weight)
+        queue.weight = weight
+
+        if not queue.waiters:
+            self._active.append(business_id)
+
+        entry = [future, time.monotonic()]
+        queue.waiters.append(entry)
+        self.queued += 1
+        return entry
+
+    def remove(self, business_id: str, entry: list):
+        """Drop a waiter that gave up before being served"""
+        queue = self._queues.get(business_id)
+        if queue is None or entry not in queue.waiters:
+            return
+
+        queue.waiters.remove(entry)
+        self.queued -= 1
+        if not queue.waiters:
+            self._deactivate(business_id)
+
+    def _deactivate(self, business_id: str):
+        self._active.remove(business_id)
+        # An idle tenant does not bank credit for later bursts
+        self._queues[business_id].deficit = 0.0
+
+    def next(self, can_start: Callable[[str], bool]) -> Optional[tuple]:
+        """Pop the next waiter to run, as (business_id, future), or None"""
+        if not any(can_start(business_id) for business_id in self._active):
+            return None
+
+        while True:
+            business_id = self._active[0]
+            queue = self._queues[business_id]
+
+            if can_start(business_id) and queue.deficit >= 1:
+                future, enqueued_at = queue.waiters.popleft()
+                queue.deficit -= 1
+                queue.served += 1
+                self.queued -= 1
+
+                if not queue.waiters:
+                    self._deactivate(business_id)
+                elif queue.deficit < 1:
+                    # Quantum used up; the next tenant's turn in the round
+                    self._active.rotate(-1)
+
+                self.wait.record(business_id, time.monotonic() - enqueued_at)
+                return business_id, future
+
+            # Tenants blocked by their own in-flight cap earn nothing this round
+            if can_start(business_id):
+                queue.deficit += self.quantum * queue.weight
+                if queue.deficit >= 1:
+                    continue
+
+            self._active.rotate(-1)
+
+    def record_turn(self, business_id: str, seconds: float):
+        self.turns.record(business_id, seconds)
+
+    def snapshot(self) -> dict:
+        tenants = {}
+
+        for business_id in set(self._queues) | set(self.turns._samples):
+            queue = self._queues.get(business_id)
+            tenants[business_id] = {
+                "weight": queue.weight if queue else None,
+                "queued": len(queue.waiters) if queue else 0,
+                "served_from_queue": queue.served if queue else 0,
+                "wait_p50": self.wait.percentile(business_id, 0.50),
+                "wait_p95": self.wait.percentile(business_id, 0.95),
+                "turn_p50": self.turns.percentile(business_id, 0.50),
+                "turn_p95": self.turns.percentile(business_id, 0.95),
+            }
+
+        return tenants
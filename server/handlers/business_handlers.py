@@ -73,6 +73,9 @@ class BusinessCRUD:
         if 'operating_hours' in data:
             data['operatingHours'] = json.dumps(data.pop('operating_hours'))
         
+        if 'settings' in data:
+            data['settings'] = json.dumps(data['settings'])
+        
         # Convert snake_case to camelCase for Prisma
         prisma_data = {}
         field_mapping = {
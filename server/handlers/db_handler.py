@@ -1,17 +1,20 @@
 from prisma import Prisma
 from contextlib import asynccontextmanager
+from server.utils.log_utils import get_logger
+
+logger = get_logger(__name__)
 
 prisma = Prisma()
 
 async def connect_db():
     """Connect to database"""
     await prisma.connect()
-    print("Database connected")
+    logger.info("Database connected")
 
 async def disconnect_db():
     """Disconnect from database"""
     await prisma.disconnect()
-    print("Database disconnected")
+    logger.info("Database disconnected")
 
 @asynccontextmanager
 async def get_db():
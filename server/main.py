@@ -1,21 +1,87 @@
 import os
+import asyncio
 import dotenv
+from contextlib import asynccontextmanager
 
 dotenv.load_dotenv()
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from server.utils.metrics import metrics_registry, mark_process_dead
 from fastapi.middleware.cors import CORSMiddleware
 from server.routers.qdrant_routers import qdrant_router
 from server.routers.business_routers import business_router
 from server.routers.telegram_routers import telegram_router
 from server.routers.chat_routers import chat_router
-from server.utils.utils import reregister_webhooks
+from server.routers.admin_routers import admin_router
+from server.utils.utils import (
+    reregister_webhooks,
+    prewarm_active_businesses,
+    WEBHOOK_REREGISTER_BACKGROUND,
+    PREWARM_ENABLED,
+)
+from server.utils.lifecycle import lifecycle, bootstrapped_by_launcher, DRAIN_TIMEOUT_SECONDS
 from server.handlers.db_handler import connect_db, disconnect_db
+from server.core.qdrant_bootstrap import ensure_collection
+from server.core.rag import init_qdrant_client, close_qdrant_client
+from server.core.sarvam_llm import get_sarvam_client
+from server.core.embedding import get_genai_client
+from server.core.resilience import resilience_snapshot
+from server.utils.singleflight import singleflight_snapshot
+from server.core.admission import admission
+from server.utils.telegram_dispatcher import telegram_dispatcher, close_http_client
+from server.utils.tracing import trace_exporter
+from server.utils.log_utils import setup_logging, shutdown_logging, logging_snapshot
+
+setup_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Independent connections; open them together
+    await asyncio.gather(connect_db(), init_qdrant_client())
+    # Build the provider clients now rather than on the first turn
+    get_sarvam_client()
+    get_genai_client()
+
+    # One-time work; the launcher does it once for all its workers
+    if not bootstrapped_by_launcher():
+        # Create or validate the Qdrant collection and its tenant index
+        await ensure_collection()
+
+        # Re-register all active webhooks with the current BASE_URL
+        if WEBHOOK_REREGISTER_BACKGROUND:
+            lifecycle.spawn(reregister_webhooks(), "reregister_webhooks")
+        else:
+            await reregister_webhooks()
+
+    if PREWARM_ENABLED:
+        lifecycle.spawn(prewarm_active_businesses(), "prewarm")
+
+    lifecycle.install_signal_handlers()
+    lifecycle.mark_ready()
+    yield
+
+    # The server has stopped taking connections and finished its requests;
+    # deferred turns run outside them, so wait for those before closing clients
+    lifecycle.start_draining()
+    await lifecycle.cancel_background()
+    await admission.drain(DRAIN_TIMEOUT_SECONDS)
+    await close_qdrant_client()
+    await close_http_client()
+    await disconnect_db()
+    trace_exporter.shutdown()
+    mark_process_dead()
+    shutdown_logging()
+
 
 app = FastAPI(
     title="SunoHQ API",
     description="No-code voice agent platform for Indian businesses",
     version="0.1",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -27,25 +93,35 @@ app.add_middleware(
 )
 
 
-@app.on_event("startup")
-async def startup():
-    await connect_db()
-    # Re-register all active webhooks with the current BASE_URL
-    await reregister_webhooks()
-
-@app.on_event("shutdown")
-async def shutdown():
-    await disconnect_db()
-
 app.include_router(qdrant_router)
 app.include_router(business_router)
 app.include_router(telegram_router)
 app.include_router(chat_router)
+app.include_router(admin_router)
 
 @app.get("/")
 def root():
     return {"status": "ok"}
 
+@app.get("/ready")
+def ready():
+    # For load balancers and orchestrators; /health stays up while draining
+    if not lifecycle.accepting:
+        return ORJSONResponse(lifecycle.snapshot(), status_code=503)
+    return lifecycle.snapshot()
+
 @app.get("/health")
 def health():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "providers": resilience_snapshot(),
+        "coalescing": singleflight_snapshot(),
+        "admission": admission.snapshot(),
+        "telegram": telegram_dispatcher.snapshot(),
+        "logging": logging_snapshot(),
+        "lifecycle": lifecycle.snapshot(),
+    }
+
+@app.get("/metrics")
+def metrics():
+    return Response(generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
@@ -13,6 +13,11 @@ class ItemSearch(BaseModel):
     business_id: str
 
 
+class DocumentSync(BaseModel):
+    """Full desired document set for a business"""
+    texts: List[str]
+
+
 # Business Models
 class OperatingHours(BaseModel):
     weekday: str = "09:00-21:00"
@@ -70,6 +75,7 @@ class BusinessUpdate(BaseModel):
     phone: Optional[str] = None
     email: Optional[str] = None
     status: Optional[str] = None
+    settings: Optional[Dict] = None
 
 class BusinessResponse(BaseModel):
     id: str
@@ -88,6 +94,7 @@ class BusinessResponse(BaseModel):
     status: str
     webhookUrl: Optional[str] = None
     webhookEnabled: bool
+    settings: Optional[Dict] = None
     createdAt: datetime
     
     model_config = ConfigDict(
@@ -100,11 +107,4 @@ class BusinessResponse(BaseModel):
 class WebhookUpdate(BaseModel):
     enabled: bool
 
-
-class TelegramWebhookPayload(BaseModel):
-    """Telegram webhook payload"""
-    update_id: int
-    message: Optional[Dict] = None
-    edited_message: Optional[Dict] = None
-    channel_post: Optional[Dict] = None
-    edited_channel_post: Optional[Dict] = None
+# Incoming Telegram updates are decoded by server/models/telegram_models.py
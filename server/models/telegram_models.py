@@ -0,0 +1,66 @@
+import msgspec
+from typing import Optional
+
+# Typed subset of the Telegram Bot API `Update` object. Fields we do not
+# use are skipped by the decoder without being materialized.
+
+
+class User(msgspec.Struct):
+    id: int
+    is_bot: bool = False
+    first_name: str = "Unknown"
+    username: Optional[str] = None
+    language_code: Optional[str] = None
+
+
+class Chat(msgspec.Struct):
+    id: int
+    type: str = "private"
+
+
+class Voice(msgspec.Struct):
+    file_id: str
+    duration: int = 0
+    mime_type: Optional[str] = None
+    file_size: Optional[int] = None
+
+
+class Message(msgspec.Struct, rename={"from_": "from"}):
+    message_id: int
+    chat: Chat
+    date: int = 0
+    from_: Optional[User] = None
+    text: Optional[str] = None
+    caption: Optional[str] = None
+    voice: Optional[Voice] = None
+
+    @property
+    def kind(self) -> str:
+        """voice, text or other; used as the metrics channel"""
+        if self.voice is not None:
+            return "voice"
+        if self.text is not None:
+            return "text"
+        return "other"
+
+
+class CallbackQuery(msgspec.Struct, rename={"from_": "from"}):
+    id: str
+    from_: User
+    message: Optional[Message] = None
+    data: Optional[str] = None
+
+
+class Update(msgspec.Struct):
+    update_id: int
+    message: Optional[Message] = None
+    edited_message: Optional[Message] = None
+    callback_query: Optional[CallbackQuery] = None
+
+
+_update_decoder = msgspec.json.Decoder(Update)
+
+
+def decode_update(body: bytes) -> Update:
+    """Decode and validate a webhook body; raises msgspec.DecodeError when malformed"""
+    return _update_decoder.decode(body)
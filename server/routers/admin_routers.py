@@ -0,0 +1,89 @@
+import os
+import hmac
+from fastapi import APIRouter, Header, HTTPException, Query, status
+from typing import Optional
+
+from server.handlers.business_handlers import business_crud
+from server.utils.profiler import profile_requests
+from server.utils.tracing import trace_exporter, TRACING_ENABLED
+
+admin_router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+def _check_admin_token(token: Optional[str]):
+    # Admin endpoints are disabled unless ADMIN_TOKEN is configured
+    expected = os.getenv("ADMIN_TOKEN")
+    if not expected or not hmac.compare_digest((token or "").encode(), expected.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access denied"
+        )
+
+
+async def _check_bot_exists(bot_uuid: str):
+    # Also keeps bot_uuid, used as a directory name, to known bots
+    business = await business_crud.get_business_by_uuid(bot_uuid)
+    if not business:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Bot not found"
+        )
+
+
+@admin_router.post("/profile/{bot_uuid}")
+async def profile_bot(
+    bot_uuid: str,
+    turns: int = Query(5, ge=1, le=100),
+    x_admin_token: Optional[str] = Header(None),
+):
+    """Profile the next `turns` turns of a bot with the sampling profiler"""
+    _check_admin_token(x_admin_token)
+
+    # Profiles are taken by the turn tracer
+    if not TRACING_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Profiling requires TRACING_ENABLED=true"
+        )
+
+    await _check_bot_exists(bot_uuid)
+
+    profile_requests.request(bot_uuid, turns)
+
+    return {
+        "message": f"Profiling the next {turns} turns",
+        "bot_uuid": bot_uuid,
+        "pending": profile_requests.pending(),
+    }
+
+
+@admin_router.delete("/profile/{bot_uuid}")
+async def cancel_profile(bot_uuid: str, x_admin_token: Optional[str] = Header(None)):
+    _check_admin_token(x_admin_token)
+    await _check_bot_exists(bot_uuid)
+
+    return {"cancelled": profile_requests.cancel(bot_uuid)}
+
+
+@admin_router.get("/profile/{bot_uuid}")
+async def list_profiles(bot_uuid: str, x_admin_token: Optional[str] = Header(None)):
+    """Stored folded-stack profiles for a bot, newest first"""
+    _check_admin_token(x_admin_token)
+    await _check_bot_exists(bot_uuid)
+
+    return {
+        "bot_uuid": bot_uuid,
+        "remaining_turns": profile_requests.remaining(bot_uuid),
+        "profiles": profile_requests.stored(bot_uuid),
+    }
+
+
+@admin_router.get("/traces")
+async def trace_stats(x_admin_token: Optional[str] = Header(None)):
+    _check_admin_token(x_admin_token)
+
+    return {
+        "path": trace_exporter.path,
+        "exported": trace_exporter.exported,
+        "dropped": trace_exporter.dropped,
+    }
@@ -1,8 +1,12 @@
 import os
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, HTTPException, status
 from server.models.models import BusinessCreate, BusinessUpdate, BusinessResponse, WebhookUpdate
 from server.handlers.business_handlers import business_crud
 from server.utils.telegram_utils import TelegramBot
+from server.core.cache_versions import business_changed, forget_business
+from server.core.profile_answers import prewarm_voice_templates
+from server.core.sarvam_llm import sarvam_tts_service
+from server.utils.utils import PREWARM_VOICE_TEMPLATES
 
 from typing import List
 
@@ -70,7 +74,7 @@ async def get_business(business_id: str):
 
 
 @business_router.put("/{business_id}", response_model=BusinessResponse)
-async def update_business(business_id: str, update_data: BusinessUpdate):
+async def update_business(business_id: str, update_data: BusinessUpdate, background_tasks: BackgroundTasks):
     """Update business"""
     business = await business_crud.get_business_by_id(business_id)
     
@@ -81,6 +85,17 @@ async def update_business(business_id: str, update_data: BusinessUpdate):
         )
     
     updated = await business_crud.update_business(business_id, update_data)
+
+    # Cached answers were generated with the old business settings
+    await business_changed(business_id)
+    # Voice replies for hours/location/phone questions, ready before the first ask
+    profile_changed = any(
+        getattr(business, field) != getattr(updated, field)
+        for field in ("location", "phone", "operatingHours")
+    )
+    if PREWARM_VOICE_TEMPLATES and profile_changed:
+        background_tasks.add_task(prewarm_voice_templates, updated, sarvam_tts_service)
+
     return updated
 
 @business_router.post("/{business_id}/webhook", response_model=BusinessResponse)
@@ -142,4 +157,6 @@ async def delete_business(business_id: str):
             detail="Failed to delete business"
         )
     
+    forget_business(business_id)
+    
     return None
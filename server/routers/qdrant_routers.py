@@ -1,39 +1,115 @@
-import uuid
-from typing import List
-from fastapi import APIRouter
+import json
+from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
 
-from server.models.models import ItemCreate, ItemSearch
-from server.core.rag import search_documents, insert_documents, get_documents_by_business
+from server.models.models import ItemCreate, ItemSearch, DocumentSync
+from server.core.rag import (
+    search_documents,
+    insert_documents,
+    get_documents_by_business,
+    iter_documents_by_business,
+    sync_documents,
+)
+from server.core.ingestion import ingestion_jobs, detect_file_kind, save_upload, run_file_ingestion
+from server.core.resilience import CircuitOpenError
+from server.utils.qdrant_utils import document_id
+from server.utils.log_utils import get_logger
 
+logger = get_logger(__name__)
 
 qdrant_router = APIRouter(prefix="/api")
 
 @qdrant_router.get("/documents/{business_id}")
-def get_documents_handler(business_id: str):
-    """Get all documents for a business"""
+async def get_documents_handler(
+    business_id: str,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: Optional[str] = None,
+):
+    """Get a page of documents for a business"""
+    # An empty page would read as the last one and truncate the caller's list
     try:
-        return get_documents_by_business(business_id)
+        return await get_documents_by_business(business_id, limit=limit, offset=offset)
+    except CircuitOpenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(max(int(e.retry_in), 1))},
+        )
     except Exception as e:
-        return []
+        logger.warning("Fetching documents failed: %s", e, extra={"business_id": business_id})
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch documents"
+        )
+
+@qdrant_router.get("/documents/{business_id}/stream")
+async def stream_documents_handler(business_id: str):
+    """Stream every document for a business as newline-delimited JSON"""
+
+    async def ndjson():
+        async for doc in iter_documents_by_business(business_id):
+            yield json.dumps(doc, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@qdrant_router.put("/documents/{business_id}")
+async def sync_documents_handler(business_id: str, sync: DocumentSync):
+    """Replace a business's knowledge base with the given document set"""
+    return await sync_documents(business_id, sync.texts)
+
+@qdrant_router.post("/documents/{business_id}/upload", status_code=status.HTTP_202_ACCEPTED)
+async def upload_documents_handler(
+    business_id: str,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+):
+    """Upload a CSV/TXT/Markdown/PDF file and ingest it in the background"""
+    kind = detect_file_kind(file.filename)
+
+    if not kind:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Unsupported file type. Upload a .csv, .txt, .md or .pdf file"
+        )
+
+    path = await save_upload(file)
+    job = await ingestion_jobs.create(business_id, file.filename)
+    background_tasks.add_task(run_file_ingestion, job, path, kind)
+
+    return job
+
+@qdrant_router.get("/documents/jobs/{job_id}")
+async def get_ingestion_job_handler(job_id: str):
+    """Get the status of a file ingestion job"""
+    job = await ingestion_jobs.get(job_id)
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ingestion job not found"
+        )
+
+    return job
 
 @qdrant_router.post("/add_documents")
-def add_documents_handler(items: List[ItemCreate]):
+async def add_documents_handler(items: List[ItemCreate]):
     documents = []
 
     for item in items:
         new_item = {
-            "id": str(uuid.uuid4()),
+            "id": document_id(item.business_id, item.text),
             "business_id": item.business_id,
             "text": item.text,
         }
         documents.append(new_item)
 
-    return insert_documents(documents)
+    return await insert_documents(documents)
 
 @qdrant_router.post("/search_query")
-def search_documents_handler(query: ItemSearch):
+async def search_documents_handler(query: ItemSearch):
 
-    return search_documents(
+    return await search_documents(
         query=query.query,
         business_id=query.business_id,
     )
\ No newline at end of file
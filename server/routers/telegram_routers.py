@@ -1,52 +1,251 @@
 from fastapi import APIRouter, HTTPException, Request, status
-from server.models.models import TelegramWebhookPayload
+from server.models.telegram_models import Update, decode_update
 from server.handlers.business_handlers import business_crud
-from server.core.rag import search_documents
+from server.core.rag import search_documents, format_rag_context
+from server.core.embedding import aembed_text
+from server.core.cache_versions import sync_business
+from server.core.answer_cache import answer_cache, ANSWER_CACHE_ENABLED, ANSWER_CACHE_CONTEXT_SECONDS
+from server.core.gating import should_retrieve
+from server.core.profile_answers import answer_profile_question, business_status, voice_template_cache
 from server.utils.telegram_utils import TelegramBot
 from server.core.sarvam_llm import sarvam_llm_service, sarvam_stt_service, sarvam_tts_service
 from server.core.conversation import conversation_service
+from server.core.llm_router import llm_router
+from server.core.admission import (
+    admission,
+    ADMITTED,
+    DEFERRED,
+    BUSY_DEFERRED_MESSAGE,
+    BUSY_REJECTED_MESSAGE,
+)
+from server.core.scheduler import scheduling_weight
+from server.utils.metrics import track_stage, record_cache, record_turn
+from server.utils.tracing import turn_trace, estimate_tokens
+from server.utils.log_utils import get_logger, bind_log_context, log_verbose
+from server.utils.lifecycle import lifecycle
 from datetime import datetime
+from typing import List, Optional
+import os
+import time
+import msgspec
+
+logger = get_logger(__name__)
 
 telegram_router = APIRouter(prefix="/api/telegram", tags=["telegram"])
 
+
+async def _embed_query(text: str, channel: str, business_id: str) -> Optional[List[float]]:
+    """Query embedding for the answer cache; None when Gemini is unavailable"""
+    with track_stage("query_embedding", "gemini", channel, business_id) as stage:
+        try:
+            return (await aembed_text([text], task_type="retrieval_query"))[0]
+        except Exception as e:
+            logger.warning("Query embedding unavailable: %s", e)
+            stage.fail()
+            return None
+
+
+async def _send_text_reply(
+    telegram_bot: TelegramBot,
+    chat_id: int,
+    text: str,
+    channel: str,
+    business_id: str,
+) -> bool:
+    with track_stage("telegram_send", "telegram", channel, business_id) as stage:
+        success = await telegram_bot.send_message(chat_id, text)
+        if not success:
+            stage.fail()
+        return success
+
+
+async def _send_voice_reply(
+    telegram_bot: TelegramBot,
+    chat_id: int,
+    text: str,
+    output_path: str,
+    audio: Optional[bytes] = None,
+    business_id: Optional[str] = None,
+) -> Optional[bytes]:
+    """
+    Send a reply as a voice note, or as a text message when TTS fails.
+    Returns the audio that was sent so callers can cache it.
+    """
+    if audio is None:
+        with track_stage("tts", "sarvam", "voice", business_id) as stage:
+            if await sarvam_tts_service.synthesize(text, output_path):
+                with open(output_path, "rb") as f:
+                    audio = f.read()
+                stage.set(text_chars=len(text), audio_bytes=len(audio))
+            else:
+                stage.fail()
+    else:
+        with open(output_path, "wb") as f:
+            f.write(audio)
+
+    if audio is None:
+        logger.warning("TTS unavailable, replying with text")
+        await _send_text_reply(telegram_bot, chat_id, text, "voice", business_id)
+        return None
+
+    with track_stage("telegram_send", "telegram", "voice", business_id) as stage:
+        stage.set(audio_bytes=len(audio))
+        if not await telegram_bot.send_voice(chat_id, output_path):
+            stage.fail()
+    return audio
+
+
+async def _persist_turn(conversation_id: str, user_text: str, reply: str, channel: str, business_id: str):
+    """Store the customer message and our reply"""
+    with track_stage("persist", "postgres", channel, business_id):
+        await conversation_service.add_message(
+            conversation_id=conversation_id,
+            role="user",
+            content=user_text
+        )
+
+        await conversation_service.add_message(
+            conversation_id=conversation_id,
+            role="assistant",
+            content=reply
+        )
+
+
 @telegram_router.post("/webhook/{bot_uuid}")
 async def telegram_webhook(bot_uuid: str, request: Request):
 
-    business = await business_crud.get_business_by_uuid(bot_uuid)
+    # Telegram redelivers the update after a non-2xx, so nothing is lost
+    # while this process shuts down
+    if lifecycle.draining:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is shutting down",
+            headers={"Retry-After": "1"},
+        )
+
+    with turn_trace(bot_uuid) as trace:
+        result = await _process_webhook(bot_uuid, request, trace)
+        if trace is not None:
+            trace.set(status=result.get("status"))
+        return result
+
+
+async def _process_webhook(bot_uuid: str, request: Request, trace):
+
+    turn_started = time.monotonic()
+
+    # Malformed updates are rejected before touching the database
+    try:
+        update = decode_update(await request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid update payload: {str(e)}"
+        )
+
+    with track_stage("business_lookup", "postgres", "webhook"):
+        business = await business_crud.get_business_by_uuid(bot_uuid)
     
     if not business:
-        print(f"Bot not found: {bot_uuid}")
+        logger.info("Bot not found")
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Bot not found"
         )
     
     if not business.webhookEnabled:
-        print(f"Webhook disabled for: {business.businessName}")
+        logger.info("Webhook disabled", extra={"business_id": business.id})
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Webhook not enabled for this bot"
         )
+
+    # Settings or documents may have changed in another worker
+    sync_business(business)
     
+    message = update.message
+
+    bind_log_context(business_id=business.id)
+    if trace is not None:
+        trace.set(business_id=business.id, channel=message.kind if message else "other")
+        trace.start_profiler()
+
+    # Only customer messages start a turn; other updates are cheap
+    if message is None:
+        return await _handle_update(business, bot_uuid, update, turn_started)
+
+    weight = scheduling_weight(business)
+    decision = await admission.acquire(business.id, weight)
+
+    if decision == ADMITTED:
+        started = time.monotonic()
+        channel = "voice" if message.voice else "text"
+        result_status = "error"
+        try:
+            result = await _handle_update(business, bot_uuid, update, turn_started)
+            result_status = result.get("status", "ok")
+            return result
+        finally:
+            admission.release(business.id, time.monotonic() - started)
+            record_turn(channel, result_status, time.monotonic() - turn_started, business.id)
+
+    chat_id = message.chat.id
+    telegram_bot = TelegramBot(business.botToken)
+
+    if decision == DEFERRED:
+        await telegram_bot.send_message(chat_id, BUSY_DEFERRED_MESSAGE)
+        admission.defer(
+            business.id,
+            lambda: _handle_deferred_update(business, bot_uuid, update, turn_started),
+            weight
+        )
+        return {"status": "deferred", "bot_uuid": bot_uuid}
+
+    await telegram_bot.send_message(chat_id, BUSY_REJECTED_MESSAGE)
+    return {"status": "shed", "bot_uuid": bot_uuid}
+
+
+async def _handle_deferred_update(business, bot_uuid: str, update: Update, received: float):
+    # Its own trace, and a latency budget that starts when the turn runs
+    channel = "voice" if update.message.voice else "text"
+    result_status = "error"
     try:
-        payload = await request.json()
-        message = payload.get('message', {})
-        
+        with turn_trace(bot_uuid, business_id=business.id, deferred=True) as trace:
+            bind_log_context(business_id=business.id)
+            if trace is not None:
+                trace.start_profiler()
+            result = await _handle_update(business, bot_uuid, update, time.monotonic())
+            result_status = result.get("status", "ok")
+            if trace is not None:
+                trace.set(status=result_status)
+            return result
+    finally:
+        # Measured from the webhook, like admitted turns, so the wait counts
+        record_turn(channel, result_status, time.monotonic() - received, business.id)
+
+
+async def _handle_update(business, bot_uuid: str, update: Update, turn_started: float):
+    """Process one Telegram update for a business and reply to the customer"""
+    try:
+        message = update.message
+
+        # Edited messages and callback queries are acknowledged without a turn
         if message:
-            chat_id = message.get('chat', {}).get('id')
-            customer_id = str(message.get('from', {}).get('id'))
-            customer_name = message.get('from', {}).get('first_name', 'Unknown')
-            username = message.get('from', {}).get('username', 'N/A')
+            chat_id = message.chat.id
+            sender = message.from_
+            customer_id = str(sender.id) if sender else "None"
+            customer_name = sender.first_name if sender else "Unknown"
+            username = (sender.username if sender else None) or "N/A"
             
-            text = message.get('text')
-            voice = message.get('voice')
+            text = message.text
+            voice = message.voice
             
             if voice:
                 message_type = "voice"
-                file_id = voice.get("file_id")
-                duration = voice.get("duration", 0)
+                file_id = voice.file_id
+                duration = voice.duration
 
-                print(f"Voice message received ({duration}s)")
+                logger.debug("Voice message received", extra={"duration_seconds": duration})
 
                 telegram_bot = TelegramBot(business.botToken)
                 await telegram_bot.send_chat_action(chat_id, "record_voice")
@@ -55,47 +254,124 @@ async def telegram_webhook(bot_uuid: str, request: Request):
                 tts_output_path = f"/tmp/{file_id}_reply.ogg"
 
                 try:
-                    await telegram_bot.download_file(file_id, ogg_input_path)
-
-                    user_text = sarvam_stt_service.transcribe(ogg_input_path)
+                    with track_stage("telegram_download", "telegram", "voice", business.id) as stage:
+                        if await telegram_bot.download_file(file_id, ogg_input_path):
+                            stage.set(audio_bytes=os.path.getsize(ogg_input_path), duration_seconds=duration)
+                        else:
+                            stage.fail()
+
+                    with track_stage("stt", "sarvam", "voice", business.id) as stage:
+                        user_text = await sarvam_stt_service.transcribe(ogg_input_path)
+                        if user_text:
+                            stage.set(transcript_chars=len(user_text))
+                        else:
+                            stage.fail()
 
                     if not user_text:
+                        if not sarvam_stt_service.provider.available:
+                            await telegram_bot.send_message(
+                                chat_id,
+                                "Sorry, I can't listen to voice messages right now. Please type your question instead."
+                            )
+                            return {"status": "stt_unavailable"}
+
                         await telegram_bot.send_message(
                             chat_id,
                             "Sorry, I couldn't understand your voice message. Please try again."
                         )
                         return {"status": "stt_failed"}
 
-                    print("Transcribed Text:", user_text)
+                    log_verbose(logger, "Transcribed voice message", transcript=user_text)
 
-                    rag_results = search_documents(
-                        query=user_text,
-                        business_id=str(business.id),
-                        limit=3
-                    )
+                    with track_stage("conversation_lookup", "postgres", "voice", business.id):
+                        conversation = await conversation_service.get_or_create_conversation(
+                            business_id=business.id,
+                            customer_id=customer_id,
+                            customer_name=customer_name
+                        )
 
-                    rag_context = ""
+                    profile_answer = answer_profile_question(user_text, business)
+                    record_cache("profile_fast_path", profile_answer is not None, "voice")
 
-                    if rag_results:
-                        filtered_results = [r for r in rag_results if r["score"] > 0.65]
-                        if filtered_results:
-                            rag_context = "\n\n".join(
-                                [f"- {doc['text']}" for doc in filtered_results]
-                            )
+                    if profile_answer:
+                        intent, response_text = profile_answer
+                        logger.debug("Profile fast path", extra={"intent": intent})
 
-                    print("RAG Results:", rag_results)
-                    print("RAG Context:", rag_context)
+                        cached_audio = voice_template_cache.get(business.id, response_text)
+                        record_cache("voice_template", cached_audio is not None, "voice")
+                        audio = await _send_voice_reply(
+                            telegram_bot, chat_id, response_text, tts_output_path, cached_audio, business.id
+                        )
 
-                    conversation = await conversation_service.get_or_create_conversation(
-                        business_id=business.id,
-                        customer_id=customer_id,
-                        customer_name=customer_name
-                    )
+                        if audio is not None and cached_audio is None:
+                            voice_template_cache.put(business.id, response_text, audio)
 
-                    recent_messages = await conversation_service.get_recent_messages(
-                        conversation_id=conversation.id,
-                        limit=5
-                    )
+                        await _persist_turn(conversation.id, user_text, response_text, "voice", business.id)
+
+                        return {
+                            "status": "voice_success",
+                            "business_id": business.id,
+                            "chat_id": chat_id,
+                            "fast_path": intent
+                        }
+
+                    with track_stage("history_fetch", "postgres", "voice", business.id) as stage:
+                        recent_messages = await conversation_service.get_recent_messages(
+                            conversation_id=conversation.id,
+                            limit=5
+                        )
+                        stage.set(messages=len(recent_messages))
+
+                    query_vector = None
+                    embedding_failed = False
+                    gate = should_retrieve(user_text, business)
+
+                    if gate.retrieve and ANSWER_CACHE_ENABLED and not await conversation_service.has_recent_context(
+                        conversation.id, ANSWER_CACHE_CONTEXT_SECONDS
+                    ):
+                        query_vector = await _embed_query(user_text, "voice", business.id)
+                        # Gemini is failing; do not wait on it again for the RAG search
+                        embedding_failed = query_vector is None
+                        # The prompt tells the LLM whether the business is open
+                        open_state = "open" if business_status(business)["open"] else "closed"
+                        cached = answer_cache.lookup(business.id, query_vector, open_state) if query_vector else None
+                        record_cache("answer", cached is not None, "voice")
+
+                        if cached:
+                            logger.debug("Answer cache hit")
+
+                            audio = await _send_voice_reply(
+                                telegram_bot, chat_id, cached.answer, tts_output_path, cached.audio, business.id
+                            )
+                            # A failed TTS or send must not wipe audio that worked before
+                            if audio is not None:
+                                cached.audio = audio
+
+                            await _persist_turn(conversation.id, user_text, cached.answer, "voice", business.id)
+
+                            return {
+                                "status": "voice_success",
+                                "business_id": business.id,
+                                "chat_id": chat_id,
+                                "cached": True
+                            }
+
+                    rag_results = []
+
+                    if gate.retrieve:
+                        with track_stage("rag_search", "qdrant", "voice", business.id) as stage:
+                            rag_results = await search_documents(
+                                query=user_text,
+                                business_id=str(business.id),
+                                limit=3,
+                                query_vector=query_vector,
+                                dense=not embedding_failed
+                            )
+                            stage.set(results=len(rag_results), gate=gate.reason)
+
+                    rag_context = format_rag_context(rag_results)
+
+                    log_verbose(logger, "RAG results", results=rag_results, context=rag_context)
 
                     system_prompt = sarvam_llm_service.build_system_prompt(business)
 
@@ -122,11 +398,18 @@ Instructions:
                         "content": user_text
                     })
 
-                    response_text = await sarvam_llm_service.chat_completion(
-                        messages=llm_messages,
-                        temperature=0.7,
-                        max_tokens=300
-                    )
+                    with track_stage("llm", "sarvam", "voice", business.id) as stage:
+                        stage.set(prompt_tokens_estimate=estimate_tokens(llm_messages), messages=len(llm_messages))
+                        response_text = await llm_router.complete(
+                            llm_messages,
+                            query=user_text,
+                            has_context=bool(rag_context),
+                            turn_started=turn_started
+                        )
+                        if response_text:
+                            stage.set(response_chars=len(response_text))
+                        else:
+                            stage.fail()
 
                     if not response_text:
                         await telegram_bot.send_message(
@@ -135,23 +418,17 @@ Instructions:
                         )
                         return {"status": "llm_failed"}
 
-                    print("LLM Response:", response_text)
+                    log_verbose(logger, "LLM response", response=response_text)
 
-                    await conversation_service.add_message(
-                        conversation_id=conversation.id,
-                        role="user",
-                        content=user_text
-                    )
+                    await _persist_turn(conversation.id, user_text, response_text, "voice", business.id)
 
-                    await conversation_service.add_message(
-                        conversation_id=conversation.id,
-                        role="assistant",
-                        content=response_text
+                    audio = await _send_voice_reply(
+                        telegram_bot, chat_id, response_text, tts_output_path, business_id=business.id
                     )
 
-                    sarvam_tts_service.synthesize(response_text, tts_output_path)
-
-                    await telegram_bot.send_voice(chat_id, tts_output_path)
+                    if query_vector is not None:
+                        entry = answer_cache.store(business.id, user_text, query_vector, response_text, open_state)
+                        entry.audio = audio
 
                     return {
                         "status": "voice_success",
@@ -160,7 +437,7 @@ Instructions:
                     }
 
                 except Exception as e:
-                    print("Voice processing error:", str(e))
+                    logger.exception("Voice processing error")
                     await telegram_bot.send_message(
                         chat_id,
                         "Something went wrong processing your voice message."
@@ -174,39 +451,90 @@ Instructions:
                 telegram_bot = TelegramBot(business.botToken)
                 await telegram_bot.send_chat_action(chat_id, "typing")
                 
-                conversation = await conversation_service.get_or_create_conversation(
-                    business_id=business.id,
-                    customer_id=customer_id,
-                    customer_name=customer_name
-                )
-                
-                print(f"Conversation ID: {conversation.id}")
+                with track_stage("conversation_lookup", "postgres", "text", business.id):
+                    conversation = await conversation_service.get_or_create_conversation(
+                        business_id=business.id,
+                        customer_id=customer_id,
+                        customer_name=customer_name
+                    )
+
+                logger.debug("Conversation", extra={"conversation_id": conversation.id})
+
+                profile_answer = answer_profile_question(content, business)
+                record_cache("profile_fast_path", profile_answer is not None, "text")
+
+                if profile_answer:
+                    intent, response_text = profile_answer
+                    logger.debug("Profile fast path", extra={"intent": intent})
+                    success = await _send_text_reply(telegram_bot, chat_id, response_text, "text", business.id)
+
+                    await _persist_turn(conversation.id, content, response_text, "text", business.id)
+
+                    return {
+                        "status": "success",
+                        "business_id": business.id,
+                        "bot_uuid": bot_uuid,
+                        "chat_id": chat_id,
+                        "customer_id": customer_id,
+                        "response_sent": success,
+                        "fast_path": intent
+                    }
                 
-                recent_messages = await conversation_service.get_recent_messages(
-                    conversation_id=conversation.id,
-                    limit=5
-                )
-
-                rag_results = search_documents(
-                    query=content,
-                    business_id=str(business.id),
-                    limit=3
-                )
-
-                rag_context = ""
-
-                if rag_results:
-                    filtered_results = [r for r in rag_results if r["score"] > 0.65]
-                    if filtered_results:
-                        rag_context = "\n\n".join(
-                            [f"- {doc['text']}" for doc in filtered_results]
+                with track_stage("history_fetch", "postgres", "text", business.id) as stage:
+                    recent_messages = await conversation_service.get_recent_messages(
+                        conversation_id=conversation.id,
+                        limit=5
+                    )
+                    stage.set(messages=len(recent_messages))
+
+                query_vector = None
+                embedding_failed = False
+                gate = should_retrieve(content, business)
+
+                if gate.retrieve and ANSWER_CACHE_ENABLED and not await conversation_service.has_recent_context(
+                    conversation.id, ANSWER_CACHE_CONTEXT_SECONDS
+                ):
+                    query_vector = await _embed_query(content, "text", business.id)
+                    # Gemini is failing; do not wait on it again for the RAG search
+                    embedding_failed = query_vector is None
+                    # The prompt tells the LLM whether the business is open
+                    open_state = "open" if business_status(business)["open"] else "closed"
+                    cached = answer_cache.lookup(business.id, query_vector, open_state) if query_vector else None
+                    record_cache("answer", cached is not None, "text")
+
+                    if cached:
+                        logger.debug("Answer cache hit")
+                        success = await _send_text_reply(telegram_bot, chat_id, cached.answer, "text", business.id)
+
+                        await _persist_turn(conversation.id, content, cached.answer, "text", business.id)
+
+                        return {
+                            "status": "success",
+                            "business_id": business.id,
+                            "bot_uuid": bot_uuid,
+                            "chat_id": chat_id,
+                            "customer_id": customer_id,
+                            "response_sent": success,
+                            "cached": True
+                        }
+
+                rag_results = []
+
+                if gate.retrieve:
+                    with track_stage("rag_search", "qdrant", "text", business.id) as stage:
+                        rag_results = await search_documents(
+                            query=content,
+                            business_id=str(business.id),
+                            limit=3,
+                            query_vector=query_vector,
+                            dense=not embedding_failed
                         )
+                        stage.set(results=len(rag_results), gate=gate.reason)
 
-                print("RAG Results:", rag_results)
-                print("RAG Context:", rag_context)
+                rag_context = format_rag_context(rag_results)
+
+                log_verbose(logger, "RAG results", results=rag_results, context=rag_context)
 
-                print(f"Retrieved {len(recent_messages)} previous messages")
-                
                 system_prompt = sarvam_llm_service.build_system_prompt(business)
                 
                 if rag_context:
@@ -232,30 +560,29 @@ Instructions:
                 else:
                     llm_messages[-1] = {"role": "user", "content": content}
 
-                print(f"Message sequence: {' → '.join([m['role'] for m in llm_messages])}")
-                print(f"Calling Sarvam LLM with {len(llm_messages)} messages...")
-                
-                response_text = await sarvam_llm_service.chat_completion(
-                    messages=llm_messages,
-                    temperature=0.7,
-                    max_tokens=300
-                )
+                log_verbose(logger, "LLM prompt", roles=[m["role"] for m in llm_messages], messages=llm_messages)
+
+                with track_stage("llm", "sarvam", "text", business.id) as stage:
+                    stage.set(prompt_tokens_estimate=estimate_tokens(llm_messages), messages=len(llm_messages))
+                    response_text = await llm_router.complete(
+                        llm_messages,
+                        query=content,
+                        has_context=bool(rag_context),
+                        turn_started=turn_started
+                    )
+                    if response_text:
+                        stage.set(response_chars=len(response_text))
+                    else:
+                        stage.fail()
                 
                 if response_text:
-                    print(f"LLM Response: {response_text[:100]}...")
-                    success = await telegram_bot.send_message(chat_id, response_text)
+                    log_verbose(logger, "LLM response", response=response_text)
+                    success = await _send_text_reply(telegram_bot, chat_id, response_text, "text", business.id)
 
-                    await conversation_service.add_message(
-                        conversation_id=conversation.id,
-                        role="user",
-                        content=content
-                    )
-                    
-                    await conversation_service.add_message(
-                        conversation_id=conversation.id,
-                        role="assistant",
-                        content=response_text
-                    )
+                    if query_vector is not None:
+                        answer_cache.store(business.id, content, query_vector, response_text, open_state)
+
+                    await _persist_turn(conversation.id, content, response_text, "text", business.id)
                     
                     return {
                         "status": "success",
@@ -278,11 +605,8 @@ Instructions:
         return {"status": "ok", "bot_uuid": bot_uuid}
     
     except Exception as e:
-        print(f"\nERROR processing webhook")
-        print(f"Bot UUID: {bot_uuid}")
-        print(f"Business: {business.businessName if business else 'Unknown'}")
-        print(f"Error: {str(e)}\n")
-        
+        logger.exception("Error processing webhook")
+
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing webhook: {str(e)}"
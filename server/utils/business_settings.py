@@ -0,0 +1,20 @@
+import json
+
+
+def business_settings(business) -> dict:
+    """Business.settings as a dict; {} when it is missing or not a JSON object"""
+    settings = getattr(business, "settings", None)
+
+    if isinstance(settings, str):
+        try:
+            settings = json.loads(settings)
+        except ValueError:
+            settings = None
+
+    return settings if isinstance(settings, dict) else {}
+
+
+def settings_section(business, key: str) -> dict:
+    """A nested settings object such as retrieval_gating; {} unless it is a dict"""
+    section = business_settings(business).get(key)
+    return section if isinstance(section, dict) else {}
@@ -0,0 +1,113 @@
+import os
+import re
+from typing import List
+
+CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "800"))
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "150"))
+
+# Sentence ends: Latin punctuation, Devanagari danda / double danda, or a
+# blank line between paragraphs
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?।॥])\s+|\n\s*\n")
+
+
+class TextChunker:
+    """
+    Incremental sentence-aware chunker.
+
+    Text is fed in arbitrary pieces (lines, pages, network reads) and
+    complete chunks are returned as soon as they fill up, so a document
+    never has to be held in memory as a whole. Consecutive chunks share
+    up to `overlap` characters of whole trailing sentences.
+    """
+
+    def __init__(self, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP):
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+
+        self._buffer = ""           # trailing text without a sentence end yet
+        self._sentences: List[str] = []
+        self._length = 0
+        self._fresh = 0             # sentences added since the last emitted chunk
+
+    def feed(self, text: str) -> List[str]:
+        """Add text and return any chunks that are complete"""
+        self._buffer += text
+        parts = SENTENCE_BOUNDARY.split(self._buffer)
+        self._buffer = parts.pop()
+
+        chunks = []
+        for sentence in parts:
+            chunks.extend(self._add(sentence))
+
+        # Text without any sentence boundary: hard split on whitespace
+        while len(self._buffer) > self.chunk_size:
+            cut = self._cut(self._buffer)
+            chunks.extend(self._add(self._buffer[:cut]))
+            self._buffer = self._buffer[cut:]
+
+        return chunks
+
+    def flush(self) -> List[str]:
+        """Return the remaining text as a final chunk"""
+        chunks = self._add(self._buffer)
+        self._buffer = ""
+
+        if self._fresh:
+            chunks.append(" ".join(self._sentences))
+
+        self._sentences = []
+        self._length = 0
+        self._fresh = 0
+        return chunks
+
+    def _cut(self, text: str) -> int:
+        """Where to split text longer than a chunk: the last space that fits"""
+        cut = text.rfind(" ", 0, self.chunk_size)
+        return cut if cut > 0 else self.chunk_size
+
+    def _add(self, sentence: str) -> List[str]:
+        sentence = " ".join(sentence.split())
+        if not sentence:
+            return []
+
+        chunks = []
+        # A single sentence longer than a chunk is split like unpunctuated text
+        while len(sentence) > self.chunk_size:
+            cut = self._cut(sentence)
+            chunks.extend(self._add(sentence[:cut]))
+            sentence = sentence[cut:].lstrip()
+
+        if self._fresh and self._length + len(sentence) > self.chunk_size:
+            chunks.append(self._emit())
+
+        # Give up overlap rather than exceed the chunk size
+        while not self._fresh and self._sentences and self._length + len(sentence) > self.chunk_size:
+            self._length -= len(self._sentences.pop(0)) + 1
+
+        self._sentences.append(sentence)
+        self._length += len(sentence) + 1
+        self._fresh += 1
+        return chunks
+
+    def _emit(self) -> str:
+        chunk = " ".join(self._sentences)
+
+        # Carry whole trailing sentences over as overlap
+        overlap: List[str] = []
+        size = 0
+        for sentence in reversed(self._sentences[1:]):
+            if size + len(sentence) > self.overlap:
+                break
+            overlap.insert(0, sentence)
+            size += len(sentence) + 1
+
+        self._sentences = overlap
+        self._length = size
+        self._fresh = 0
+        return chunk
+
+
+def chunk_text(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """Chunk a complete string"""
+    chunker = TextChunker(chunk_size, overlap)
+    return chunker.feed(text) + chunker.flush()
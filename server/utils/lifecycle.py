@@ -0,0 +1,129 @@
+import os
+import time
+import signal
+import asyncio
+import threading
+import dotenv
+from typing import Awaitable, Set
+
+from server.utils.log_utils import get_logger
+
+dotenv.load_dotenv()
+
+logger = get_logger(__name__)
+
+# How long shutdown waits for running and deferred turns
+DRAIN_TIMEOUT_SECONDS = float(os.getenv("DRAIN_TIMEOUT_SECONDS", "30"))
+# Keep serving (but report not ready) this long after SIGTERM, so a load
+# balancer stops routing here before the listener closes
+DRAIN_DELAY_SECONDS = float(os.getenv("DRAIN_DELAY_SECONDS", "0"))
+
+# Set by `python -m server` once it has created the Qdrant collection and
+# taken over webhook re-registration, so its workers skip both
+BOOTSTRAPPED_ENV = "SUNOHQ_BOOTSTRAPPED"
+
+
+def bootstrapped_by_launcher() -> bool:
+    return os.getenv(BOOTSTRAPPED_ENV) == "true"
+
+
+class Lifecycle:
+    """
+    Readiness of this process and the startup work it runs in the background.
+
+    `ready` flips once the lifespan startup has finished; `draining` once
+    shutdown has begun. Background tasks (webhook re-registration, cache
+    prewarming) never hold up readiness and are cancelled on shutdown.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.draining = False
+        self.started_at = time.time()
+        self.ready_at = None
+
+        self._tasks: Set[asyncio.Task] = set()
+
+    def mark_ready(self):
+        self.ready = True
+        self.ready_at = time.time()
+        logger.info("Ready", extra={"startup_seconds": round(self.ready_at - self.started_at, 2)})
+
+    def start_draining(self):
+        if not self.draining:
+            self.draining = True
+            logger.info("Draining")
+
+    def install_signal_handlers(self, delay: float = DRAIN_DELAY_SECONDS):
+        """
+        Start draining as soon as the server is told to stop.
+
+        Wraps the handlers the server (uvicorn) installed, which are then
+        called `delay` seconds later to begin its graceful shutdown; a
+        second signal calls them straight away. Call from the lifespan,
+        where those handlers are already in place.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+
+        loop = asyncio.get_running_loop()
+        pending = {}
+
+        def forward(signum, frame, previous):
+            pending.pop("handle", None)
+            previous(signum, frame)
+
+        def begin(signum, frame, previous):
+            handle = pending.pop("handle", None)
+            if handle is not None:
+                handle.cancel()
+                forward(signum, frame, previous)
+            elif not self.draining:
+                self.start_draining()
+                pending["handle"] = loop.call_later(delay, forward, signum, frame, previous)
+            else:
+                forward(signum, frame, previous)
+
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            previous = signal.getsignal(sig)
+            if not callable(previous):
+                continue
+
+            # Signal handlers only schedule; the work runs on the event loop
+            signal.signal(sig, lambda signum, frame, previous=previous: loop.call_soon_threadsafe(begin, signum, frame, previous))
+
+    @property
+    def accepting(self) -> bool:
+        return self.ready and not self.draining
+
+    def spawn(self, coro: Awaitable, name: str) -> asyncio.Task:
+        """Run startup work in the background, keeping a reference until it finishes"""
+        task = asyncio.ensure_future(coro)
+        task.set_name(name)
+        self._tasks.add(task)
+        task.add_done_callback(self._finish)
+        return task
+
+    def _finish(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if task.cancelled():
+            return
+        if task.exception():
+            logger.error("Background task failed", exc_info=task.exception(), extra={"task": task.get_name()})
+
+    async def cancel_background(self):
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.ready,
+            "draining": self.draining,
+            "startup_seconds": round(self.ready_at - self.started_at, 2) if self.ready_at else None,
+            "background_tasks": sorted(task.get_name() for task in self._tasks),
+        }
+
+
+lifecycle = Lifecycle()
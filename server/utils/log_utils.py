@@ -0,0 +1,222 @@
+import os
+import sys
+import copy
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+import dotenv
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+dotenv.load_dotenv()
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# "json" for production, "text" for reading logs locally
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Verbose debug fields (prompts, RAG results, LLM output) per event and minute
+LOG_VERBOSE_PER_MINUTE = int(os.getenv("LOG_VERBOSE_PER_MINUTE", "30"))
+LOG_FIELD_MAX_CHARS = int(os.getenv("LOG_FIELD_MAX_CHARS", "1000"))
+
+# Attributes every LogRecord has; anything else came in through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+# Correlation fields (trace_id, bot_uuid, business_id) of the current turn
+_log_context: ContextVar[Dict[str, Any]] = ContextVar("log_context", default={})
+
+
+@contextmanager
+def log_context(**fields):
+    """Attach fields to every log line emitted inside the block"""
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+def bind_log_context(**fields):
+    """Add fields to the current context until the enclosing block exits"""
+    _log_context.set({**_log_context.get(), **fields})
+
+
+class _ContextFilter(logging.Filter):
+    # Runs in the caller's task, where the context variable is visible
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in _log_context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread. Formatting, serialization and
+    the write to stdout all happen there; a full queue drops the record
+    instead of blocking the event loop.
+    """
+
+    def __init__(self, log_queue: "queue.Queue"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve args and tracebacks now; they may not survive the thread hop
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = " ".join(
+            f"{key}={value}"
+            for key, value in vars(record).items()
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_")
+        )
+        return f"{line} {fields}" if fields else line
+
+
+_queue_handler: Optional[_DroppingQueueHandler] = None
+_listener: Optional[QueueListener] = None
+_setup_lock = threading.Lock()
+
+
+def setup_logging():
+    """Route the `server` loggers through a queue to a JSON stdout writer. Idempotent."""
+    global _queue_handler, _listener
+
+    with _setup_lock:
+        if _listener is not None:
+            return
+
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else TextFormatter())
+
+        log_queue: "queue.Queue" = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        _queue_handler = _DroppingQueueHandler(log_queue)
+        _queue_handler.addFilter(_ContextFilter())
+
+        logger = logging.getLogger("server")
+        logger.setLevel(LOG_LEVEL)
+        logger.addHandler(_queue_handler)
+        logger.propagate = False
+
+        _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Write out queued records and stop the listener thread"""
+    global _listener
+
+    with _setup_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
+        logging.getLogger("server").removeHandler(_queue_handler)
+
+
+def get_logger(name: str) -> logging.Logger:
+    setup_logging()
+    return logging.getLogger(name)
+
+
+def logging_snapshot() -> dict:
+    return {
+        "level": LOG_LEVEL,
+        "dropped": _queue_handler.dropped if _queue_handler else 0,
+    }
+
+
+class _VerboseSampler:
+    """Per-event token bucket for debug lines that carry large payloads"""
+
+    def __init__(self, per_minute: int):
+        self.rate = per_minute / 60.0
+        self.capacity = max(per_minute, 1)
+        self._buckets: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, event: str):
+        """Return (allowed, lines suppressed since the last allowed one)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, suppressed = self._buckets.get(event, (self.capacity, now, 0))
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+            if tokens < 1:
+                self._buckets[event] = (tokens, now, suppressed + 1)
+                return False, 0
+            self._buckets[event] = (tokens - 1, now, 0)
+            return True, suppressed
+
+
+_verbose_sampler = _VerboseSampler(LOG_VERBOSE_PER_MINUTE)
+
+
+def _truncate(value: Any) -> Any:
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    text = value if isinstance(value, str) else json.dumps(value, default=str, ensure_ascii=False)
+    if len(text) > LOG_FIELD_MAX_CHARS:
+        return f"{text[:LOG_FIELD_MAX_CHARS]}... ({len(text)} chars)"
+    return text
+
+
+def log_verbose(logger: logging.Logger, event: str, **fields):
+    """
+    Log large debug payloads at DEBUG, rate limited per event and truncated.
+    Costs one level check when DEBUG is off.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+
+    allowed, suppressed = _verbose_sampler.allow(event)
+    if not allowed:
+        return
+
+    extra = {key: _truncate(value) for key, value in fields.items()}
+    if suppressed:
+        extra["suppressed"] = suppressed
+    logger.debug(event, extra=extra)
@@ -0,0 +1,129 @@
+import os
+import time
+import dotenv
+from contextlib import contextmanager
+from typing import Optional
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+
+from server.utils.tracing import span
+
+dotenv.load_dotenv()
+
+# Set (by `python -m server`) when several worker processes share one /metrics
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# Per-business labels multiply series by the number of bots; off by default
+METRICS_PER_TENANT = os.getenv("METRICS_PER_TENANT", "false").lower() == "true"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0)
+
+STAGE_SECONDS = Histogram(
+    "sunohq_stage_seconds",
+    "Time spent in each stage of a turn",
+    ["stage", "provider", "channel", "business"],
+    buckets=LATENCY_BUCKETS,
+)
+
+STAGE_ERRORS = Counter(
+    "sunohq_stage_errors_total",
+    "Stages that failed or returned no result",
+    ["stage", "provider", "channel", "business"],
+)
+
+TURN_SECONDS = Histogram(
+    "sunohq_turn_seconds",
+    "End-to-end webhook turn time",
+    ["channel", "status", "business"],
+    buckets=LATENCY_BUCKETS,
+)
+
+CACHE_LOOKUPS = Counter(
+    "sunohq_cache_lookups_total",
+    "Cache and fast-path lookups by result",
+    ["cache", "result", "channel"],
+)
+
+PROVIDER_CALLS = Counter(
+    "sunohq_provider_calls_total",
+    "Upstream calls by outcome (ok, error, retry, rejected)",
+    ["provider", "outcome"],
+)
+
+ADMISSION_DECISIONS = Counter(
+    "sunohq_admission_decisions_total",
+    "Webhook turns admitted, deferred or shed",
+    ["decision"],
+)
+
+# Summed over the live worker processes
+ADMISSION_IN_FLIGHT = Gauge("sunohq_admission_in_flight", "Turns currently being processed", multiprocess_mode="livesum")
+ADMISSION_QUEUED = Gauge("sunohq_admission_queued", "Turns waiting for an admission slot", multiprocess_mode="livesum")
+ADMISSION_DEFERRED = Gauge("sunohq_admission_deferred", "Shed turns waiting to be processed later", multiprocess_mode="livesum")
+
+
+def metrics_registry() -> CollectorRegistry:
+    """The registry to expose: this process's, or all workers' in multiprocess mode"""
+    if not PROMETHEUS_MULTIPROC_DIR:
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def mark_process_dead():
+    """Drop this worker's live gauges from the shared metrics on shutdown"""
+    if PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def tenant_label(business_id) -> str:
+    return str(business_id) if METRICS_PER_TENANT and business_id is not None else "all"
+
+
+class StageTimer:
+    __slots__ = ("failed", "span")
+
+    def __init__(self, span):
+        self.failed = False
+        self.span = span
+
+    def fail(self):
+        """Count the stage as an error without raising"""
+        self.failed = True
+        self.set(failed=True)
+
+    def set(self, **attributes):
+        """Attach attributes (sizes, counts) to the stage's trace span"""
+        self.span.set(**attributes)
+
+
+@contextmanager
+def track_stage(stage: str, provider: str = "internal", channel: str = "none", business_id: Optional[str] = None):
+    """
+    Time a block as one pipeline stage, in the metrics and as a span of
+    the current turn's trace. Exceptions count as errors and propagate.
+    """
+    labels = (stage, provider, channel, tenant_label(business_id))
+    started = time.perf_counter()
+
+    with span(stage, provider=provider, channel=channel) as stage_span:
+        timer = StageTimer(stage_span)
+        try:
+            yield timer
+        except Exception:
+            timer.failed = True
+            raise
+        finally:
+            STAGE_SECONDS.labels(*labels).observe(time.perf_counter() - started)
+            if timer.failed:
+                STAGE_ERRORS.labels(*labels).inc()
+
+
+def record_cache(cache: str, hit: bool, channel: str = "none"):
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss", channel).inc()
+
+
+def record_turn(channel: str, status: str, seconds: float, business_id: Optional[str] = None):
+    TURN_SECONDS.labels(channel, status, tenant_label(business_id)).observe(seconds)
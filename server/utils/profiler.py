@@ -0,0 +1,215 @@
+import os
+import sys
+import time
+import fcntl
+import threading
+import dotenv
+from collections import Counter
+from typing import Dict, List, Optional, Set
+
+dotenv.load_dotenv()
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_INTERVAL_SECONDS = float(os.getenv("PROFILE_INTERVAL_SECONDS", "0.005"))
+# How soon a request made through another worker is noticed
+PROFILE_REQUEST_REFRESH_SECONDS = float(os.getenv("PROFILE_REQUEST_REFRESH_SECONDS", "5.0"))
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread at a fixed interval from a background
+    thread and aggregates it into folded stacks ("a;b;c count"), the
+    input format of flamegraph.pl and speedscope.
+
+    The event loop runs every coroutine on one thread, so concurrent turns
+    of other bots show up in the samples too.
+    """
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_INTERVAL_SECONDS):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="turn-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def halt(self):
+        """Stop sampling without waiting for the sampler thread"""
+        self._stop.set()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+
+class ProfileRequests:
+    """
+    Bots whose next N turns should be profiled, set from the admin API.
+
+    A request is a small file next to the bot's stored profiles, so every
+    worker process sees it; turns claim it under a file lock. Webhooks
+    only check an in-memory set of requested bots, which request() and
+    cancel() update at once and a background thread reloads from the
+    files every PROFILE_REQUEST_REFRESH_SECONDS for the other workers.
+    """
+
+    REQUEST_FILE = "requested"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = False
+        self._requested: Set[str] = set()
+        self._refresher: Optional[threading.Thread] = None
+
+    @classmethod
+    def _request_path(cls, bot_uuid: str) -> str:
+        return os.path.join(PROFILE_DIR, bot_uuid, cls.REQUEST_FILE)
+
+    def request(self, bot_uuid: str, turns: int):
+        path = self._request_path(bot_uuid)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        temp_path = f"{path}.{os.getpid()}"
+        with open(temp_path, "w") as f:
+            f.write(str(turns))
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self._requested.add(bot_uuid)
+
+    def cancel(self, bot_uuid: str) -> bool:
+        with self._lock:
+            self._requested.discard(bot_uuid)
+        try:
+            os.remove(self._request_path(bot_uuid))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def remaining(self, bot_uuid: str) -> int:
+        try:
+            with open(self._request_path(bot_uuid)) as f:
+                return int(f.read() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def pending(self) -> Dict[str, int]:
+        if not os.path.isdir(PROFILE_DIR):
+            return {}
+        pending = {}
+        for bot_uuid in os.listdir(PROFILE_DIR):
+            turns = self.remaining(bot_uuid)
+            if turns:
+                pending[bot_uuid] = turns
+        return pending
+
+    def _ensure_refresher(self):
+        if self._refresher is None or not self._refresher.is_alive():
+            self._refresher = threading.Thread(target=self._refresh, name="profile-requests", daemon=True)
+            self._refresher.start()
+
+    def _refresh(self):
+        while True:
+            try:
+                requested = set(self.pending())
+            except OSError:
+                requested = None
+            if requested is not None:
+                with self._lock:
+                    self._requested = requested
+            time.sleep(PROFILE_REQUEST_REFRESH_SECONDS)
+
+    def is_requested(self, bot_uuid: str) -> bool:
+        """Whether a profile is requested for the bot, without touching the disk"""
+        self._ensure_refresher()
+        return bot_uuid in self._requested
+
+    def _claim(self, bot_uuid: str) -> bool:
+        """Take one turn from the bot's request, shared by all workers"""
+        path = self._request_path(bot_uuid)
+        try:
+            f = open(path, "r+")
+        except FileNotFoundError:
+            with self._lock:
+                self._requested.discard(bot_uuid)
+            return False
+
+        with f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                turns = int(f.read() or 0)
+            except ValueError:
+                turns = 0
+            if turns <= 0:
+                return False
+
+            # Write the new count before unlinking, so a worker that opened
+            # the file before the unlink reads 0
+            f.seek(0)
+            f.truncate()
+            f.write(str(turns - 1))
+            f.flush()
+            if turns == 1:
+                os.remove(path)
+                with self._lock:
+                    self._requested.discard(bot_uuid)
+            return True
+
+    def start(self, bot_uuid: str) -> Optional[SamplingProfiler]:
+        """Start profiling this turn if one was requested and none is running"""
+        if not self.is_requested(bot_uuid):
+            return None
+
+        with self._lock:
+            if self._active:
+                return None
+            self._active = True
+
+        if not self._claim(bot_uuid):
+            with self._lock:
+                self._active = False
+            return None
+
+        profiler = SamplingProfiler(threading.get_ident())
+        profiler.start()
+        return profiler
+
+    @staticmethod
+    def profile_path(bot_uuid: str, trace_id: str) -> str:
+        return os.path.join(PROFILE_DIR, bot_uuid, f"{int(time.time())}_{trace_id}.folded")
+
+    def finish(self, profiler: SamplingProfiler, path: str):
+        """Stop the profiler and store its folded stacks at path"""
+        samples = profiler.stop()
+        with self._lock:
+            self._active = False
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "w") as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+    @staticmethod
+    def stored(bot_uuid: str) -> List[str]:
+        directory = os.path.join(PROFILE_DIR, bot_uuid)
+        if not os.path.isdir(directory):
+            return []
+        return sorted((name for name in os.listdir(directory) if name.endswith(".folded")), reverse=True)
+
+
+profile_requests = ProfileRequests()
@@ -1,3 +1,17 @@
+import hashlib
+import uuid
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of the normalized document text"""
+    return hashlib.sha256(text.strip().encode("utf-8")).hexdigest()
+
+
+def document_id(business_id: str, text: str) -> str:
+    """Deterministic Qdrant point id for a business document"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{business_id}:{content_hash(text)}"))
+
+
 def clean_qdrant_response(raw_response: dict):
     cleaned = []
 
@@ -0,0 +1,69 @@
+import json
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, List
+
+
+def fingerprint(*parts) -> str:
+    """Stable key for a call from its (JSON-serializable) arguments"""
+    raw = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical async calls.
+
+    The first caller for a key starts the upstream call; callers arriving
+    while it is in flight await the same task and get the same result (or
+    exception). Nothing is cached once the call finishes. A waiter being
+    cancelled does not cancel the shared call for the others.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: str, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        self.calls += 1
+        task = self._inflight.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.shared += 1
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+        # Mark the exception retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def snapshot(self) -> dict:
+        return {
+            "in_flight": len(self._inflight),
+            "calls": self.calls,
+            "shared": self.shared,
+        }
+
+
+_groups: List[SingleFlight] = []
+
+
+def singleflight_group(name: str) -> SingleFlight:
+    group = SingleFlight(name)
+    _groups.append(group)
+    return group
+
+
+def singleflight_snapshot() -> dict:
+    return {group.name: group.snapshot() for group in _groups}
@@ -0,0 +1,317 @@
+import os
+import time
+import heapq
+import random
+import asyncio
+import itertools
+import dotenv
+import httpx
+import orjson
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from server.utils.log_utils import get_logger
+
+dotenv.load_dotenv()
+
+logger = get_logger(__name__)
+
+# Point at a local stand-in for load tests
+TELEGRAM_API_BASE = os.getenv("TELEGRAM_API_BASE", "https://api.telegram.org").rstrip("/")
+
+# Telegram allows about 30 messages/s per bot, 1 message/s per private
+# chat (short bursts are tolerated) and 20 messages/min per group
+TELEGRAM_BOT_RATE = float(os.getenv("TELEGRAM_BOT_RATE", "30"))
+TELEGRAM_CHAT_RATE = float(os.getenv("TELEGRAM_CHAT_RATE", "1"))
+TELEGRAM_CHAT_BURST = int(os.getenv("TELEGRAM_CHAT_BURST", "3"))
+TELEGRAM_GROUP_RATE = float(os.getenv("TELEGRAM_GROUP_RATE", str(20 / 60)))
+TELEGRAM_MAX_RETRIES = int(os.getenv("TELEGRAM_MAX_RETRIES", "5"))
+TELEGRAM_TIMEOUT_SECONDS = float(os.getenv("TELEGRAM_TIMEOUT_SECONDS", "30"))
+# Chat actions are only useful while they are current
+TELEGRAM_CHAT_ACTION_MAX_WAIT_SECONDS = float(os.getenv("TELEGRAM_CHAT_ACTION_MAX_WAIT_SECONDS", "1.0"))
+TELEGRAM_MAX_CHAT_BUCKETS = int(os.getenv("TELEGRAM_MAX_CHAT_BUCKETS", "10000"))
+
+# Lower runs first
+PRIORITY_REPLY = 0
+PRIORITY_CHAT_ACTION = 10
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared keep-alive client for every Telegram API call"""
+    global _http_client
+
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=TELEGRAM_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+
+    return _http_client
+
+
+async def close_http_client():
+    global _http_client
+
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+class PriorityTokenBucket:
+    """
+    Token bucket whose waiters are served lowest priority value first,
+    then in arrival order. pause() stops handing out tokens for a while,
+    used when Telegram answers 429 with retry_after.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+        self._waiters: list = []    # heap of (priority, seq, future)
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def _refill(self):
+        now = time.monotonic()
+        if now < self.paused_until:
+            self.updated = now
+            return
+        self.tokens = min(self.capacity, self.tokens + (now - max(self.updated, self.paused_until)) * self.rate)
+        self.updated = now
+
+    @property
+    def idle(self) -> bool:
+        self._refill()
+        return not self._waiters and self.tokens >= self.capacity
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether the bucket has no whole token left"""
+        self._refill()
+        return self.tokens < 1
+
+    async def acquire(self, priority: int = PRIORITY_REPLY):
+        self._refill()
+
+        if not self._waiters and self.tokens >= 1:
+            self.tokens -= 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._schedule()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as we were cancelled; give the token back
+                self.release()
+            raise
+
+    def release(self):
+        """Return a token taken by acquire() that was not used"""
+        self.tokens = min(self.capacity, self.tokens + 1)
+        self._drain()
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+        self._schedule()
+
+    def _schedule(self):
+        if self._timer is not None:
+            self._timer.cancel()
+
+        now = time.monotonic()
+        if now < self.paused_until:
+            delay = self.paused_until - now
+        else:
+            delay = max((1 - self.tokens) / self.rate, 0.0)
+
+        self._timer = asyncio.get_running_loop().call_later(delay, self._drain)
+
+    def _drain(self):
+        self._timer = None
+        self._refill()
+
+        while self._waiters and self.tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.tokens -= 1
+            future.set_result(None)
+
+        # Drop waiters that gave up so they do not keep the timer alive
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+
+        if self._waiters:
+            self._schedule()
+
+
+class TelegramDispatcher:
+    """
+    Rate-limited sender for outbound Telegram calls.
+
+    Every call takes a token from its chat's bucket and then its bot's
+    bucket. Replies outrank chat actions in both. A 429 pauses the chat
+    for the server's retry_after (the whole bot as well, unless the chat
+    had used up its own bucket) and the call is retried. Transient errors
+    are retried with jittered backoff, so bursts are delayed rather than
+    dropped. Chat actions that cannot go out within
+    TELEGRAM_CHAT_ACTION_MAX_WAIT_SECONDS are skipped.
+    """
+
+    def __init__(self):
+        self._bots: Dict[str, PriorityTokenBucket] = {}
+        self._chats: "OrderedDict[Tuple[str, int], PriorityTokenBucket]" = OrderedDict()
+
+        self.sent = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.failed = 0
+        self.skipped_actions = 0
+
+    def _bot_bucket(self, bot_token: str) -> PriorityTokenBucket:
+        bucket = self._bots.get(bot_token)
+        if bucket is None:
+            bucket = self._bots[bot_token] = PriorityTokenBucket(TELEGRAM_BOT_RATE, int(TELEGRAM_BOT_RATE) or 1)
+        return bucket
+
+    def _chat_bucket(self, bot_token: str, chat_id) -> PriorityTokenBucket:
+        key = (bot_token, chat_id)
+        bucket = self._chats.get(key)
+
+        if bucket is None:
+            # Group and channel ids are negative
+            is_group = str(chat_id).startswith("-")
+            rate = TELEGRAM_GROUP_RATE if is_group else TELEGRAM_CHAT_RATE
+            bucket = self._chats[key] = PriorityTokenBucket(rate, TELEGRAM_CHAT_BURST)
+            self._evict_idle_chats()
+        else:
+            self._chats.move_to_end(key)
+
+        return bucket
+
+    def _evict_idle_chats(self):
+        if len(self._chats) <= TELEGRAM_MAX_CHAT_BUCKETS:
+            return
+
+        for key in list(self._chats):
+            if len(self._chats) <= TELEGRAM_MAX_CHAT_BUCKETS:
+                return
+            if self._chats[key].idle:
+                del self._chats[key]
+
+    async def _acquire(self, bot_token: str, chat_id, priority: int):
+        chat_bucket = self._chat_bucket(bot_token, chat_id)
+        await chat_bucket.acquire(priority)
+
+        try:
+            await self._bot_bucket(bot_token).acquire(priority)
+        except asyncio.CancelledError:
+            # Timed out waiting for the bot; the chat token was never used
+            chat_bucket.release()
+            raise
+
+    async def send(
+        self,
+        bot_token: str,
+        method: str,
+        chat_id,
+        data: dict,
+        files: Optional[dict] = None,
+        priority: int = PRIORITY_REPLY,
+    ) -> dict:
+        """
+        Call a Bot API method for a chat under the rate limits.
+        Returns Telegram's response body ({"ok": False, ...} on failure).
+        """
+        if priority >= PRIORITY_CHAT_ACTION:
+            try:
+                await asyncio.wait_for(
+                    self._acquire(bot_token, chat_id, priority),
+                    timeout=TELEGRAM_CHAT_ACTION_MAX_WAIT_SECONDS,
+                )
+            except asyncio.TimeoutError:
+                self.skipped_actions += 1
+                return {"ok": False, "description": "skipped: rate limited"}
+        else:
+            await self._acquire(bot_token, chat_id, priority)
+
+        url = f"{TELEGRAM_API_BASE}/bot{bot_token}/{method}"
+        client = get_http_client()
+        result: dict = {"ok": False}
+
+        for attempt in range(TELEGRAM_MAX_RETRIES + 1):
+            if attempt:
+                self.retries += 1
+                await self._acquire(bot_token, chat_id, priority)
+
+            try:
+                if files:
+                    response = await client.post(url, data=data, files=files)
+                else:
+                    response = await client.post(
+                        url, content=orjson.dumps(data), headers={"Content-Type": "application/json"}
+                    )
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                # The request never reached Telegram, so retrying cannot duplicate it
+                result = {"ok": False, "description": str(e)}
+                await asyncio.sleep(random.uniform(0, min(0.5 * 2 ** attempt, 8.0)))
+                continue
+            except httpx.HTTPError as e:
+                result = {"ok": False, "description": str(e)}
+                break
+
+            try:
+                result = orjson.loads(response.content)
+            except ValueError:
+                result = {"ok": False, "error_code": response.status_code, "description": response.text[:200]}
+
+            if result.get("ok"):
+                self.sent += 1
+                return result
+
+            error_code = result.get("error_code") or response.status_code
+
+            if error_code == 429:
+                self.rate_limited += 1
+                retry_after = (result.get("parameters") or {}).get("retry_after", 1)
+                logger.warning("Telegram rate limit on %s, retrying after %ss", method, retry_after, extra={"chat_id": chat_id})
+                chat_bucket = self._chat_bucket(bot_token, chat_id)
+                # A chat with tokens to spare was not over its own limit, so the bot was
+                if not chat_bucket.exhausted:
+                    self._bot_bucket(bot_token).pause(retry_after)
+                chat_bucket.pause(retry_after)
+                continue
+
+            if error_code >= 500:
+                await asyncio.sleep(random.uniform(0, min(0.5 * 2 ** attempt, 8.0)))
+                continue
+
+            # Other 4xx errors will not succeed on retry
+            break
+
+        self.failed += 1
+        return result
+
+    def snapshot(self) -> dict:
+        return {
+            "bots": len(self._bots),
+            "chats": len(self._chats),
+            "sent": self.sent,
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "failed": self.failed,
+            "skipped_chat_actions": self.skipped_actions,
+        }
+
+
+telegram_dispatcher = TelegramDispatcher()
@@ -1,95 +1,106 @@
 import os
-import httpx
+import orjson
 from typing import Optional
 
+from server.utils.telegram_dispatcher import (
+    telegram_dispatcher,
+    get_http_client,
+    TELEGRAM_API_BASE,
+    PRIORITY_REPLY,
+    PRIORITY_CHAT_ACTION,
+)
+from server.utils.log_utils import get_logger
+
+logger = get_logger(__name__)
+
 class TelegramBot:
     def __init__(self, bot_token: str):
         self.bot_token = bot_token
-        self.base_url = f"https://api.telegram.org/bot{bot_token}"
-        self.file_base_url = f"https://api.telegram.org/file/bot{bot_token}"  # <- Important!
+        self.base_url = f"{TELEGRAM_API_BASE}/bot{bot_token}"
+        self.file_base_url = f"{TELEGRAM_API_BASE}/file/bot{bot_token}"  # <- Important!
 
     async def get_bot_info(self) -> Optional[dict]:
         """Get bot information"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{self.base_url}/getMe")
-                data = response.json()
-                if data.get("ok"):
-                    return data.get("result")
-                return None
+            response = await get_http_client().get(f"{self.base_url}/getMe")
+            data = orjson.loads(response.content)
+            if data.get("ok"):
+                return data.get("result")
+            return None
         except Exception as e:
-            print(f"Error getting bot info: {e}")
+            logger.warning("Error getting bot info: %s", e)
             return None
     
     async def set_webhook(self, webhook_url: str) -> bool:
         """Set webhook for bot"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/setWebhook",
-                    json={"url": webhook_url}
-                )
-                data = response.json()
-                return data.get("ok", False)
+            response = await get_http_client().post(
+                f"{self.base_url}/setWebhook",
+                json={"url": webhook_url}
+            )
+            data = orjson.loads(response.content)
+            return data.get("ok", False)
         except Exception as e:
-            print(f"Error setting webhook: {e}")
+            logger.warning("Error setting webhook: %s", e)
             return False
     
     async def delete_webhook(self) -> bool:
         """Delete webhook"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(f"{self.base_url}/deleteWebhook")
-                data = response.json()
-                return data.get("ok", False)
+            response = await get_http_client().post(f"{self.base_url}/deleteWebhook")
+            data = orjson.loads(response.content)
+            return data.get("ok", False)
         except Exception as e:
-            print(f"Error deleting webhook: {e}")
+            logger.warning("Error deleting webhook: %s", e)
             return False
     
     async def get_webhook_info(self) -> Optional[dict]:
         """Get current webhook info"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{self.base_url}/getWebhookInfo")
-                data = response.json()
-                if data.get("ok"):
-                    return data.get("result")
-                return None
+            response = await get_http_client().get(f"{self.base_url}/getWebhookInfo")
+            data = orjson.loads(response.content)
+            if data.get("ok"):
+                return data.get("result")
+            return None
         except Exception as e:
-            print(f"Error getting webhook info: {e}")
+            logger.warning("Error getting webhook info: %s", e)
             return None
     
     async def send_message(self, chat_id: int, text: str) -> bool:
         """Send text message to chat"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/sendMessage",
-                    json={
-                        "chat_id": chat_id,
-                        "text": text,
-                        "parse_mode": "Markdown"
-                    }
-                )
-                data = response.json()
-                return data.get("ok", False)
+            data = await telegram_dispatcher.send(
+                self.bot_token,
+                "sendMessage",
+                chat_id,
+                {
+                    "chat_id": chat_id,
+                    "text": text,
+                    "parse_mode": "Markdown"
+                },
+            )
+
+            if not data.get("ok"):
+                logger.warning("Failed to send message: %s", data)
+            return data.get("ok", False)
         except Exception as e:
-            print(f"Error sending message: {e}")
+            logger.warning("Error sending message: %s", e)
             return False
     
     async def send_chat_action(self, chat_id: int, action: str = "typing") -> bool:
         """Send chat action (typing indicator)"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/sendChatAction",
-                    json={
-                        "chat_id": chat_id,
-                        "action": action
-                    }
-                )
-                data = response.json()
-                return data.get("ok", False)
+            data = await telegram_dispatcher.send(
+                self.bot_token,
+                "sendChatAction",
+                chat_id,
+                {
+                    "chat_id": chat_id,
+                    "action": action
+                },
+                priority=PRIORITY_CHAT_ACTION,
+            )
+            return data.get("ok", False)
         except Exception as e:
             return False
 
@@ -98,24 +109,31 @@ class TelegramBot:
         Send a voice message (.ogg/.mp3) to a Telegram chat
         """
         if not os.path.exists(file_path):
-            print(f"Voice file not found: {file_path}")
+            logger.warning("Voice file not found: %s", file_path)
             return False
 
         try:
-            async with httpx.AsyncClient() as client:
-                with open(file_path, "rb") as f:
-                    files = {"voice": f}
-                    data = {"chat_id": chat_id}
-                    if caption:
-                        data["caption"] = caption
-
-                    response = await client.post(f"{self.base_url}/sendVoice", data=data, files=files)
-                    result = response.json()
-                    if not result.get("ok", False):
-                        print(f"Failed to send voice: {result}")
-                    return result.get("ok", False)
+            # Read up front so a retried upload sends the whole file again
+            with open(file_path, "rb") as f:
+                files = {"voice": (os.path.basename(file_path), f.read())}
+
+            data = {"chat_id": chat_id}
+            if caption:
+                data["caption"] = caption
+
+            result = await telegram_dispatcher.send(
+                self.bot_token,
+                "sendVoice",
+                chat_id,
+                data,
+                files=files,
+                priority=PRIORITY_REPLY,
+            )
+            if not result.get("ok", False):
+                logger.warning("Failed to send voice: %s", result)
+            return result.get("ok", False)
         except Exception as e:
-            print(f"Error sending voice message: {e}")
+            logger.warning("Error sending voice message: %s", e)
             return False
         
     async def download_file(self, file_id: str, destination_path: str) -> bool:
@@ -123,35 +141,36 @@ class TelegramBot:
         Download a file (voice/photo/document) from Telegram servers using file_id
         """
         try:
-            async with httpx.AsyncClient() as client:
-                # Step 1: Get file path from Telegram API
-                resp = await client.get(f"{self.base_url}/getFile", params={"file_id": file_id})
-                resp_data = resp.json()
+            client = get_http_client()
+
+            # Step 1: Get file path from Telegram API
+            resp = await client.get(f"{self.base_url}/getFile", params={"file_id": file_id})
+            resp_data = orjson.loads(resp.content)
 
-                if not resp_data.get("ok"):
-                    print(f"Failed to get file info: {resp_data}")
-                    return False
+            if not resp_data.get("ok"):
+                logger.warning("Failed to get file info: %s", resp_data)
+                return False
 
-                file_path = resp_data["result"]["file_path"]
+            file_path = resp_data["result"]["file_path"]
 
-                # Step 2: Download the actual file
-                file_url = f"{self.file_base_url}/{file_path}"  # use file_base_url here
-                file_resp = await client.get(file_url)
+            # Step 2: Download the actual file
+            file_url = f"{self.file_base_url}/{file_path}"  # use file_base_url here
+            file_resp = await client.get(file_url)
 
-                if file_resp.status_code != 200:
-                    print(f"Failed to download file, status: {file_resp.status_code}")
-                    return False
+            if file_resp.status_code != 200:
+                logger.warning("Failed to download file, status: %s", file_resp.status_code)
+                return False
 
-                # Ensure directory exists
-                os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+            # Ensure directory exists
+            os.makedirs(os.path.dirname(destination_path), exist_ok=True)
 
-                # Save to destination path
-                with open(destination_path, "wb") as f:
-                    f.write(file_resp.content)
+            # Save to destination path
+            with open(destination_path, "wb") as f:
+                f.write(file_resp.content)
 
-                print(f"File downloaded to: {destination_path}")
-                return True
+            logger.debug("File downloaded to: %s", destination_path)
+            return True
 
         except Exception as e:
-            print(f"Error downloading file: {e}")
+            logger.warning("Error downloading file: %s", e)
             return False
\ No newline at end of file
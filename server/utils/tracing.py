@@ -0,0 +1,216 @@
+import os
+import json
+import time
+import uuid
+import queue
+import random
+import threading
+import dotenv
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from server.utils.profiler import SamplingProfiler, profile_requests
+from server.utils.log_utils import get_logger, log_context
+
+dotenv.load_dotenv()
+
+logger = get_logger(__name__)
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+# Fraction of turns exported; slow and profiled turns are always exported
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+TRACE_SLOW_SECONDS = float(os.getenv("TRACE_SLOW_SECONDS", "8.0"))
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "traces/turns.jsonl")
+
+
+class Span:
+    __slots__ = ("name", "span_id", "start", "end", "attributes", "error")
+
+    def __init__(self, name: str, attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.attributes = attributes
+        self.error = False
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> dict:
+        return {
+            "spanId": self.span_id,
+            "name": self.name,
+            "startTimeUnixNano": int(self.start * 1e9),
+            "endTimeUnixNano": int((self.end or self.start) * 1e9),
+            "durationMs": round(((self.end or self.start) - self.start) * 1000, 2),
+            "attributes": self.attributes,
+            "status": "error" if self.error else "ok",
+        }
+
+
+class Trace:
+    """Spans and attributes of one webhook turn"""
+
+    def __init__(self, bot_uuid: str, sampled: bool):
+        self.trace_id = uuid.uuid4().hex
+        self.bot_uuid = bot_uuid
+        self.sampled = sampled
+        self.root = Span("telegram_webhook", {"bot_uuid": bot_uuid})
+        self.spans: List[Span] = []
+        self.profiler: Optional[SamplingProfiler] = None
+        self.profile_path: Optional[str] = None
+
+    def set(self, **attributes):
+        self.root.set(**attributes)
+
+    def start_profiler(self):
+        """Profile the rest of the turn if one was requested for this bot"""
+        if self.profiler is None:
+            self.profiler = profile_requests.start(self.bot_uuid)
+
+    def to_dict(self) -> dict:
+        return {
+            "traceId": self.trace_id,
+            "resource": {"service.name": "sunohq-server"},
+            **self.root.to_dict(),
+            "profile": self.profile_path,
+            "spans": [span.to_dict() for span in self.spans],
+        }
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attributes):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+
+class JsonFileExporter:
+    """Appends finished traces as JSON lines from a background thread"""
+
+    def __init__(self, path: str = TRACE_EXPORT_PATH):
+        self.path = path
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self.exported = 0
+        self.dropped = 0
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+            self._thread.start()
+
+    def submit(self, item):
+        """Queue a trace dict to export, or a callable to run off the event loop"""
+        self._ensure_thread()
+        self._queue.put(item)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                if callable(item):
+                    item()
+                else:
+                    self._write(item)
+            except Exception as e:
+                self.dropped += 1
+                logger.warning("Trace export failed: %s", e)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, trace: dict):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(trace, default=str, ensure_ascii=False) + "\n")
+        self.exported += 1
+
+    def flush(self):
+        """Block until everything queued so far is written"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def shutdown(self):
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+
+trace_exporter = JsonFileExporter()
+
+
+@contextmanager
+def turn_trace(bot_uuid: str, **attributes):
+    """
+    Trace one turn. Every turn records spans; the trace is exported when
+    it was sampled, ran longer than TRACE_SLOW_SECONDS or was profiled.
+    Callers start the profiler with trace.start_profiler() once the bot
+    is known to exist.
+    """
+    if not TRACING_ENABLED:
+        # Log lines of the turn still share a correlation id
+        with log_context(trace_id=uuid.uuid4().hex, bot_uuid=bot_uuid):
+            yield None
+        return
+
+    trace = Trace(bot_uuid, sampled=random.random() < TRACE_SAMPLE_RATE)
+    trace.set(**attributes)
+    token = current_trace.set(trace)
+
+    try:
+        with log_context(trace_id=trace.trace_id, bot_uuid=bot_uuid):
+            yield trace
+    except Exception:
+        trace.root.error = True
+        raise
+    finally:
+        current_trace.reset(token)
+        trace.root.end = time.time()
+        profiler = trace.profiler
+
+        if profiler is not None:
+            profiler.halt()
+            trace.profile_path = profile_requests.profile_path(bot_uuid, trace.trace_id)
+            # Stopping joins the sampler thread; keep it off the event loop
+            trace_exporter.submit(lambda: profile_requests.finish(profiler, trace.profile_path))
+
+        slow = trace.root.end - trace.root.start >= TRACE_SLOW_SECONDS
+        if trace.sampled or slow or profiler is not None:
+            trace.set(slow=slow)
+            trace_exporter.submit(trace.to_dict())
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Record a child span of the current turn; a no-op outside a turn"""
+    trace = current_trace.get()
+    if trace is None:
+        yield NOOP_SPAN
+        return
+
+    current = Span(name, attributes)
+    trace.spans.append(current)
+
+    try:
+        yield current
+    except Exception:
+        current.error = True
+        raise
+    finally:
+        current.end = time.time()
+
+
+def estimate_tokens(messages: List[Dict[str, str]]) -> int:
+    """Rough prompt size: about four characters per token"""
+    return sum(len(m.get("content") or "") for m in messages) // 4
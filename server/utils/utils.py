@@ -1,35 +1,109 @@
 import os
+import asyncio
+import dotenv
 from server.handlers.db_handler import prisma
+from server.core.rag import prewarm_business
+from server.core.cache_versions import sync_business
+from server.core.profile_answers import prewarm_voice_templates
+from server.core.sarvam_llm import sarvam_tts_service
 from server.utils.telegram_utils import TelegramBot
+from server.utils.log_utils import get_logger
+
+dotenv.load_dotenv()
+
+logger = get_logger(__name__)
+
+# setWebhook calls in flight at once while re-registering
+WEBHOOK_REREGISTER_CONCURRENCY = int(os.getenv("WEBHOOK_REREGISTER_CONCURRENCY", "16"))
+# Re-register after the server is ready instead of blocking startup
+WEBHOOK_REREGISTER_BACKGROUND = os.getenv("WEBHOOK_REREGISTER_BACKGROUND", "true").lower() == "true"
+
+# Load the retrieval indexes of the most recently active businesses at startup
+PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "false").lower() == "true"
+PREWARM_BUSINESSES = int(os.getenv("PREWARM_BUSINESSES", "20"))
+# Also synthesize their templated voice replies (costs TTS calls)
+PREWARM_VOICE_TEMPLATES = os.getenv("PREWARM_VOICE_TEMPLATES", "false").lower() == "true"
+PREWARM_CONCURRENCY = int(os.getenv("PREWARM_CONCURRENCY", "4"))
+
+
+async def _reregister_webhook(business, webhook_url: str, semaphore: asyncio.Semaphore) -> bool:
+    async with semaphore:
+        telegram_bot = TelegramBot(business.botToken)
+        success = await telegram_bot.set_webhook(webhook_url)
+
+        if not success:
+            logger.warning("Failed to update webhook", extra={"business_id": business.id})
+            return False
+
+        await prisma.business.update(
+            where={"id": business.id},
+            data={"webhookUrl": webhook_url}
+        )
+        logger.info("Webhook updated", extra={"business_id": business.id, "webhook_url": webhook_url})
+        return True
+
 
 async def reregister_webhooks():
     """Re-register all active webhooks with the current BASE_URL on startup."""
-    
+
     base_url = os.getenv("BASE_URL")
     if not base_url:
-        print("BASE_URL not set — skipping webhook re-registration")
+        logger.warning("BASE_URL not set — skipping webhook re-registration")
         return
 
     businesses = await prisma.business.find_many(
         where={"webhookEnabled": True}
     )
 
+    semaphore = asyncio.Semaphore(WEBHOOK_REREGISTER_CONCURRENCY)
+    pending = []
+
     for business in businesses:
         new_webhook_url = f"{base_url}/api/telegram/webhook/{business.botUuid}"
 
         # Skip if webhook URL is already correct
         if business.webhookUrl == new_webhook_url:
-            print(f"Webhook already correct for {business.businessName}")
+            logger.debug("Webhook already correct", extra={"business_id": business.id})
             continue
 
-        telegram_bot = TelegramBot(business.botToken)
-        success = await telegram_bot.set_webhook(new_webhook_url)
-
-        if success:
-            await prisma.business.update(
-                where={"id": business.id},
-                data={"webhookUrl": new_webhook_url}
-            )
-            print(f"Webhook updated for {business.businessName}: {new_webhook_url}")
-        else:
-            print(f"Failed to update webhook for {business.businessName}")
\ No newline at end of file
+        pending.append(_reregister_webhook(business, new_webhook_url, semaphore))
+
+    if not pending:
+        return
+
+    results = await asyncio.gather(*pending, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning("Webhook re-registration error: %s", result)
+
+    logger.info(
+        "Webhook re-registration finished",
+        extra={"updated": sum(result is True for result in results), "attempted": len(results)},
+    )
+
+
+async def _prewarm(business, semaphore: asyncio.Semaphore):
+    async with semaphore:
+        try:
+            sync_business(business)
+            await prewarm_business(business.id)
+            if PREWARM_VOICE_TEMPLATES:
+                await prewarm_voice_templates(business, sarvam_tts_service)
+        except Exception as e:
+            logger.warning("Prewarm failed: %s", e, extra={"business_id": business.id})
+
+
+async def prewarm_active_businesses(limit: int = PREWARM_BUSINESSES):
+    """Warm the per-business caches of the businesses with the latest conversations"""
+    conversations = await prisma.conversation.find_many(
+        where={"business": {"is": {"status": "active"}}},
+        order={"lastActivity": "desc"},
+        distinct=["businessId"],
+        take=limit,
+        include={"business": True},
+    )
+
+    semaphore = asyncio.Semaphore(PREWARM_CONCURRENCY)
+    await asyncio.gather(*(_prewarm(conversation.business, semaphore) for conversation in conversations))
+
+    logger.info("Prewarm finished", extra={"businesses": len(conversations)})
@@ -0,0 +1,34 @@
+import os
+import sys
+from types import ModuleType
+
+# Import the server from the repository root without a live environment
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("SARVAM_API_KEY", "test")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("TRACING_ENABLED", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def _stub_prisma():
+    """Stand in for the Prisma client until `prisma generate` has been run"""
+    try:
+        from prisma import Json, Prisma  # noqa: F401
+        return
+    except (ImportError, RuntimeError):
+        pass
+
+    class Prisma:
+        def __init__(self, *args, **kwargs):
+            pass
+
+    class Json(dict):
+        pass
+
+    stub = ModuleType("prisma")
+    stub.Prisma = Prisma
+    stub.Json = Json
+    sys.modules["prisma"] = stub
+
+
+_stub_prisma()
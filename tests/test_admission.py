@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+import server.core.admission as admission_module
+from server.core.admission import ADMITTED, DEFERRED, SHED, AdmissionController
+from server.core.scheduler import FairScheduler
+
+
+@pytest.fixture(autouse=True)
+def short_queue(monkeypatch):
+    monkeypatch.setattr(admission_module, "ADMISSION_QUEUE_TIMEOUT_SECONDS", 0.05)
+
+
+def test_queued_turn_is_shed_after_the_timeout(monkeypatch):
+    monkeypatch.setattr(admission_module, "ADMISSION_SHED_MODE", "reject")
+
+    async def run():
+        controller = AdmissionController(max_in_flight=1)
+        assert await controller.acquire("business-1") == ADMITTED
+
+        assert await controller.acquire("business-2") == SHED
+        assert controller.scheduler.queued == 0
+        assert controller.in_flight == 1
+
+    asyncio.run(run())
+
+
+def test_defer_mode_defers_until_the_deferred_limit(monkeypatch):
+    monkeypatch.setattr(admission_module, "ADMISSION_SHED_MODE", "defer")
+
+    async def run():
+        controller = AdmissionController(max_in_flight=1, max_deferred=1)
+        assert await controller.acquire("business-1") == ADMITTED
+
+        assert await controller.acquire("business-2") == DEFERRED
+        ran = asyncio.Event()
+
+        async def process():
+            ran.set()
+
+        controller.defer("business-2", process)
+        assert await controller.acquire("business-3") == SHED
+
+        # The deferred turn runs once the slot is released
+        controller.release("business-1", 0.1)
+        await asyncio.wait_for(ran.wait(), 1)
+        assert await controller.drain(1)
+
+    asyncio.run(run())
+
+
+def test_queued_turn_gets_the_released_slot():
+    async def run():
+        controller = AdmissionController(max_in_flight=1)
+        assert await controller.acquire("business-1") == ADMITTED
+
+        waiting = asyncio.create_task(controller.acquire("business-2"))
+        await asyncio.sleep(0.01)
+        controller.release("business-1", 0.1)
+
+        assert await waiting == ADMITTED
+        assert controller.in_flight == 1
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def run():
+        controller = AdmissionController(max_in_flight=1)
+        await controller.acquire("business-1")
+
+        waiting = asyncio.create_task(controller._wait_for_slot("business-2", 1.0))
+        await asyncio.sleep(0.01)
+        assert controller.scheduler.queued == 1
+
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+        assert controller.scheduler.queued == 0
+        controller.release("business-1", 0.1)
+        assert controller.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_scheduler_serves_tenants_by_weight():
+    async def run():
+        loop = asyncio.get_running_loop()
+        scheduler = FairScheduler(quantum=1.0)
+        for _ in range(30):
+            scheduler.enqueue("heavy", 3.0, loop.create_future())
+            scheduler.enqueue("light", 1.0, loop.create_future())
+
+        served = [scheduler.next(lambda business_id: True)[0] for _ in range(20)]
+        assert served.count("heavy") == 15
+        assert served.count("light") == 5
+
+    asyncio.run(run())
+
+
+def test_scheduler_quantum_is_at_least_one_unit():
+    async def run():
+        scheduler = FairScheduler(quantum=0)
+        scheduler.enqueue("business-1", 1.0, asyncio.get_running_loop().create_future())
+
+        assert scheduler.next(lambda business_id: True)[0] == "business-1"
+
+    asyncio.run(run())
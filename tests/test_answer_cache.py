@@ -0,0 +1,22 @@
+from server.core.answer_cache import SemanticAnswerCache
+
+
+def test_answers_are_not_reused_across_open_state():
+    cache = SemanticAnswerCache(threshold=0.9)
+    cache.store("business-1", "can I order now?", [1.0, 0.0, 0.0], "Yes, we're open.", "open")
+
+    assert cache.lookup("business-1", [1.0, 0.0, 0.0], "open").answer == "Yes, we're open."
+    assert cache.lookup("business-1", [1.0, 0.0, 0.0], "closed") is None
+
+
+def test_invalidate_drops_every_state():
+    cache = SemanticAnswerCache(threshold=0.9)
+    cache.store("business-1", "q", [1.0, 0.0], "a", "open")
+    cache.store("business-1", "q", [1.0, 0.0], "b", "closed")
+    cache.store("business-2", "q", [1.0, 0.0], "c", "open")
+
+    cache.invalidate("business-1")
+
+    assert cache.lookup("business-1", [1.0, 0.0], "open") is None
+    assert cache.lookup("business-1", [1.0, 0.0], "closed") is None
+    assert cache.lookup("business-2", [1.0, 0.0], "open").answer == "c"
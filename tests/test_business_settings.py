@@ -0,0 +1,27 @@
+from types import SimpleNamespace
+
+from server.core.gating import DEFAULT_GATING_SETTINGS, get_gating_settings
+from server.core.scheduler import DEFAULT_WEIGHT, PLAN_WEIGHTS, scheduling_weight
+
+
+def test_gating_overrides_are_merged_onto_the_defaults():
+    business = SimpleNamespace(settings='{"retrieval_gating": {"enabled": false}}')
+    assert get_gating_settings(business) == {**DEFAULT_GATING_SETTINGS, "enabled": False}
+
+
+def test_non_dict_gating_overrides_fall_back_to_the_defaults():
+    for settings in ({"retrieval_gating": True}, {"retrieval_gating": [1]}, '{"retrieval_gating": "off"}'):
+        assert get_gating_settings(SimpleNamespace(settings=settings)) == DEFAULT_GATING_SETTINGS
+
+
+def test_non_dict_settings_fall_back_to_the_defaults():
+    for settings in (None, True, [1, 2], "not json", "[1, 2]", "3"):
+        business = SimpleNamespace(settings=settings)
+        assert get_gating_settings(business) == DEFAULT_GATING_SETTINGS
+        assert scheduling_weight(business) == DEFAULT_WEIGHT
+
+
+def test_scheduling_weight_reads_weight_then_plan():
+    assert scheduling_weight(SimpleNamespace(settings={"weight": 3, "plan": "pro"})) == 3.0
+    assert scheduling_weight(SimpleNamespace(settings='{"plan": "Pro"}')) == PLAN_WEIGHTS["pro"]
+    assert scheduling_weight(SimpleNamespace(settings={"weight": -1})) == DEFAULT_WEIGHT
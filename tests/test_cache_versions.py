@@ -0,0 +1,38 @@
+import asyncio
+from types import SimpleNamespace
+
+import server.core.cache_versions as cache_versions
+from server.core.answer_cache import answer_cache
+from server.core.lexical import lexical_index
+
+
+def test_worker_drops_caches_when_another_bumped_the_version():
+    business = SimpleNamespace(id="business-sync", cacheVersion=3)
+    cache_versions.sync_business(business)
+    answer_cache.store(business.id, "q", [1.0, 0.0], "old answer", "open")
+
+    # Same version: caches are kept
+    cache_versions.sync_business(business)
+    assert answer_cache.lookup(business.id, [1.0, 0.0], "open") is not None
+
+    # Another worker bumped it
+    version = lexical_index.get_version(business.id)
+    cache_versions.sync_business(SimpleNamespace(id=business.id, cacheVersion=4))
+
+    assert answer_cache.lookup(business.id, [1.0, 0.0], "open") is None
+    assert lexical_index.get_version(business.id) == version + 1
+
+
+def test_own_change_is_not_dropped_twice(monkeypatch):
+    async def update(where, data):
+        return SimpleNamespace(cacheVersion=8)
+
+    monkeypatch.setattr(cache_versions, "prisma", SimpleNamespace(business=SimpleNamespace(update=update)))
+    business_id = "business-own"
+    cache_versions.sync_business(SimpleNamespace(id=business_id, cacheVersion=7))
+
+    asyncio.run(cache_versions.business_changed(business_id))
+    answer_cache.store(business_id, "q", [1.0, 0.0], "new answer", "open")
+    cache_versions.sync_business(SimpleNamespace(id=business_id, cacheVersion=8))
+
+    assert answer_cache.lookup(business_id, [1.0, 0.0], "open").answer == "new answer"
@@ -0,0 +1,21 @@
+from server.utils.chunking import chunk_text
+
+
+def test_pipe_is_not_a_sentence_end():
+    assert chunk_text("Menu | Price | Size", chunk_size=10, overlap=0) == ["Menu |", "Price |", "Size"]
+    assert chunk_text("Menu | Price", chunk_size=100, overlap=0) == ["Menu | Price"]
+
+
+def test_danda_ends_a_sentence():
+    chunks = chunk_text("दुकान सुबह खुलती है। रविवार को बंद है।", chunk_size=25, overlap=0)
+
+    assert chunks == ["दुकान सुबह खुलती है।", "रविवार को बंद है।"]
+
+
+def test_long_sentence_is_split_on_whitespace():
+    sentence = " ".join(f"word{i}" for i in range(200)) + "."
+    chunks = chunk_text("Intro. " + sentence + " Outro.", chunk_size=100, overlap=30)
+
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert not any(piece.startswith("ord") for chunk in chunks for piece in chunk.split())
+    assert " ".join(chunks).count("word199.") >= 1
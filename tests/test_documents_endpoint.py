@@ -0,0 +1,31 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import server.routers.qdrant_routers as qdrant_routers
+from server.core.resilience import CircuitOpenError
+
+
+def client_failing_with(monkeypatch, error: Exception) -> TestClient:
+    async def get_documents_by_business(business_id, limit=100, offset=None):
+        raise error
+
+    monkeypatch.setattr(qdrant_routers, "get_documents_by_business", get_documents_by_business)
+    app = FastAPI()
+    app.include_router(qdrant_routers.qdrant_router)
+    return TestClient(app)
+
+
+def test_open_circuit_is_503_not_an_empty_last_page(monkeypatch):
+    client = client_failing_with(monkeypatch, CircuitOpenError("qdrant", 12.0))
+
+    response = client.get("/api/documents/business-1", params={"offset": "abc"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "12"
+
+
+def test_qdrant_error_is_500(monkeypatch):
+    client = client_failing_with(monkeypatch, RuntimeError("collection not found"))
+
+    response = client.get("/api/documents/business-1")
+    assert response.status_code == 500
+    assert "documents" not in response.json()
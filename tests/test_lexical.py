@@ -0,0 +1,30 @@
+import asyncio
+
+from server.core.lexical import LexicalIndexStore, tokenize
+
+
+def test_main_is_a_content_word():
+    assert tokenize("main branch on main road") == ["main", "branch", "main", "road"]
+
+
+def test_store_evicts_least_recently_used_over_the_cap():
+    store = LexicalIndexStore(max_bytes=7000)
+    texts = ["free home delivery above 500 rupees"] * 5
+
+    asyncio.run(store.add("business-1", texts, 0))
+    asyncio.run(store.add("business-2", texts, 0))
+    assert store.get("business-1") is not None
+
+    asyncio.run(store.add("business-3", texts, 0))
+
+    assert store.get("business-1") is not None
+    assert store.get("business-2") is None
+    assert store.get("business-3") is not None
+
+
+def test_index_built_for_an_old_version_is_dropped():
+    store = LexicalIndexStore()
+    store.bump_version("business-1")
+
+    assert asyncio.run(store.add("business-1", ["text"], 0)) is None
+    assert not store.is_loaded("business-1")
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+import server.core.llm_router as llm_router_module
+from server.core.llm_router import LLMRouter
+
+
+class FakeLLM:
+    """Answers each call after the next delay; records calls and cancellations"""
+
+    def __init__(self, *delays):
+        self.delays = list(delays)
+        self.calls = 0
+        self.cancelled = []
+
+    async def chat_completion(self, messages, temperature, max_tokens, model):
+        call = self.calls
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delays[call])
+        except asyncio.CancelledError:
+            self.cancelled.append(call)
+            raise
+        return f"answer {call}"
+
+
+@pytest.fixture(autouse=True)
+def short_timings(monkeypatch):
+    monkeypatch.setattr(llm_router_module, "LLM_HEDGE_ENABLED", True)
+    monkeypatch.setattr(llm_router_module, "LLM_HEDGE_DEFAULT_SECONDS", 0.05)
+    monkeypatch.setattr(llm_router_module, "LLM_HEDGE_MIN_SECONDS", 0.01)
+    monkeypatch.setattr(llm_router_module, "LLM_CALL_TIMEOUT_SECONDS", 0.5)
+
+
+def complete(monkeypatch, llm):
+    monkeypatch.setattr(llm_router_module, "sarvam_llm_service", llm)
+
+    async def run():
+        result = await LLMRouter().complete([{"role": "user", "content": "hi"}], "hi")
+        # Let cancelled calls unwind
+        await asyncio.sleep(0)
+        return result
+
+    return asyncio.run(run())
+
+
+def test_fast_answer_is_not_hedged(monkeypatch):
+    llm = FakeLLM(0.0, 0.0)
+    assert complete(monkeypatch, llm) == "answer 0"
+    assert llm.calls == 1
+
+
+def test_hedged_request_wins_and_the_slow_one_is_cancelled(monkeypatch):
+    llm = FakeLLM(1.0, 0.0)
+    assert complete(monkeypatch, llm) == "answer 1"
+    assert llm.calls == 2
+    assert llm.cancelled == [0]
+
+
+def test_first_request_still_wins_after_hedging(monkeypatch):
+    llm = FakeLLM(0.1, 1.0)
+    assert complete(monkeypatch, llm) == "answer 0"
+    assert llm.calls == 2
+    assert llm.cancelled == [1]
+
+
+def test_deadline_cancels_every_request(monkeypatch):
+    monkeypatch.setattr(llm_router_module, "LLM_CALL_TIMEOUT_SECONDS", 0.1)
+    llm = FakeLLM(1.0, 1.0)
+    assert complete(monkeypatch, llm) is None
+    assert sorted(llm.cancelled) == [0, 1]
@@ -0,0 +1,75 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from server.core.profile_answers import BUSINESS_TIMEZONE, answer_profile_question, template_replies
+
+# A Monday at noon, inside the default weekday hours
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=BUSINESS_TIMEZONE)
+
+
+@pytest.fixture
+def business():
+    return SimpleNamespace(location="12 MG Road, Bengaluru", phone="+91 98450 12345", operatingHours=None)
+
+
+@pytest.mark.parametrize("text, intent", [
+    ("are you open now", "open_now"),
+    ("abhi khula hai kya", "open_now"),
+    ("क्या अभी खुला है", "open_now"),
+    ("what are your timings", "hours"),
+    ("aap kab khulte ho", "hours"),
+    ("दुकान कब खुलती है", "hours"),
+    ("where are you located", "location"),
+    ("dukaan kahan hai", "location"),
+    ("आपका पता क्या है", "location"),
+    ("what is your phone number", "phone"),
+    ("aapka number kya hai", "phone"),
+    ("आपका फोन नंबर", "phone"),
+])
+def test_answers_business_questions(business, text, intent):
+    answer = answer_profile_question(text, business, NOW)
+    assert answer is not None and answer[0] == intent
+
+
+@pytest.mark.parametrize("text", [
+    # Orders and dishes share words with the profile intents
+    "mera order kahan hai",
+    "मेरा ऑर्डर कहाँ है",
+    "मुझे पता नहीं क्या order करूँ",
+    "मेरा ऑर्डर नंबर 123 है",
+    "order ka number kya hai",
+    "इस समय पनीर मिलेगा?",
+    "where is the menu",
+    "my phone number is 9876543210",
+    "order kab band hoga",
+    # A particular day is not "now"
+    "are you open on sunday",
+    "kal khule ho?",
+    "क्या रविवार को खुला है",
+    # Timings, status and contacts of something other than the shop
+    "what are the delivery timings?",
+    "happy hour timings",
+    "closing time for orders",
+    "is the offer closed now",
+    "is the biryani available now or closed",
+    "order band hai kya abhi",
+    "what's the address for delivery",
+    "send location of my order",
+    "phone number of the delivery boy",
+    "whatsapp number pe menu bhejo",
+])
+def test_leaves_other_questions_to_the_llm(business, text):
+    assert answer_profile_question(text, business, NOW) is None
+
+
+def test_blank_closed_day_closes_nothing(business):
+    business.operatingHours = {"weekday": "09:00-21:00", "closed_days": ["", "  "]}
+
+    assert answer_profile_question("are you open now", business, NOW)[1].startswith("Yes")
+
+
+def test_template_probes_cover_every_reply(business):
+    # Three languages times four intents
+    assert len(set(template_replies(business, NOW))) == 12
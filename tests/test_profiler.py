@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+import server.utils.profiler as profiler_module
+from server.utils.profiler import ProfileRequests
+
+
+@pytest.fixture
+def requests(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler_module, "PROFILE_DIR", str(tmp_path))
+    requests = ProfileRequests()
+    # Refreshing from disk is exercised directly, not from the thread
+    monkeypatch.setattr(requests, "_ensure_refresher", lambda: None)
+    return requests
+
+
+def test_unrequested_bot_does_not_touch_the_disk(requests, monkeypatch):
+    def fail(*args):
+        raise AssertionError("checked the disk")
+
+    monkeypatch.setattr(profiler_module.os.path, "exists", fail)
+    monkeypatch.setattr(requests, "_claim", fail)
+
+    assert requests.start("unknown-bot") is None
+
+
+def test_requested_turns_are_claimed_until_used_up(requests):
+    requests.request("bot-1", 2)
+    assert requests.is_requested("bot-1")
+
+    for _ in range(2):
+        profiler = requests.start("bot-1")
+        assert profiler is not None
+        requests.finish(profiler, requests.profile_path("bot-1", "trace"))
+
+    assert not requests.is_requested("bot-1")
+    assert requests.start("bot-1") is None
+    assert requests.remaining("bot-1") == 0
+
+
+def test_refresh_picks_up_requests_from_other_workers(requests, tmp_path, monkeypatch):
+    # Another worker wrote the request file
+    os.makedirs(tmp_path / "bot-2")
+    (tmp_path / "bot-2" / ProfileRequests.REQUEST_FILE).write_text("1")
+    assert not requests.is_requested("bot-2")
+
+    def stop(seconds):
+        raise StopIteration
+
+    monkeypatch.setattr(profiler_module.time, "sleep", stop)
+    with pytest.raises(StopIteration):
+        requests._refresh()
+
+    assert requests.is_requested("bot-2")
+
+
+def test_cancel_clears_the_flag(requests):
+    requests.request("bot-3", 1)
+    assert requests.cancel("bot-3")
+    assert not requests.is_requested("bot-3")
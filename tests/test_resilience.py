@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import pytest
+
+import server.core.resilience as resilience_module
+from server.core.resilience import DEFAULT_PROVIDER_SETTINGS, CircuitOpenError, Provider
+
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch):
+    monkeypatch.setattr(resilience_module, "RESILIENCE_ENABLED", True)
+
+
+def make_provider(**settings) -> Provider:
+    return Provider("test", {**DEFAULT_PROVIDER_SETTINGS, "backoff_base": 0.0, **settings})
+
+
+class Upstream:
+    def __init__(self, fail: bool = True, delay: float = 0.0):
+        self.fail = fail
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("upstream down")
+        return "ok"
+
+
+def test_circuit_opens_and_rejects_without_calling():
+    provider = make_provider(max_attempts=1, failure_threshold=2, reset_seconds=30.0)
+    upstream = Upstream()
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await provider.call(upstream)
+
+        assert provider.breaker.state == "open"
+        assert not provider.available
+        with pytest.raises(CircuitOpenError):
+            await provider.call(upstream)
+
+    asyncio.run(run())
+    assert upstream.calls == 2
+    assert provider.rejected == 1
+
+
+def test_half_open_lets_one_probe_through():
+    provider = make_provider(max_attempts=1, failure_threshold=1, reset_seconds=0.05)
+
+    async def run():
+        with pytest.raises(ConnectionError):
+            await provider.call(Upstream())
+        await asyncio.sleep(0.06)
+        assert provider.available
+
+        # Only one of two concurrent calls probes; the other is rejected
+        probe = Upstream(fail=False, delay=0.02)
+        results = await asyncio.gather(provider.call(probe), provider.call(probe), return_exceptions=True)
+        assert probe.calls == 1
+        assert "ok" in results
+        assert any(isinstance(result, CircuitOpenError) for result in results)
+        assert provider.breaker.state == "closed"
+
+    asyncio.run(run())
+
+
+def test_failed_probe_reopens_the_circuit():
+    provider = make_provider(max_attempts=1, failure_threshold=1, reset_seconds=0.05)
+
+    async def run():
+        with pytest.raises(ConnectionError):
+            await provider.call(Upstream())
+        await asyncio.sleep(0.06)
+
+        with pytest.raises(ConnectionError):
+            await provider.call(Upstream())
+        assert provider.breaker.state == "open"
+        assert provider.breaker.opened_at > time.monotonic() - 0.05
+
+    asyncio.run(run())
+
+
+def test_retries_stop_when_the_budget_runs_out():
+    provider = make_provider(max_attempts=3, failure_threshold=100, retry_ratio=0.0, retry_reserve=2)
+    upstream = Upstream()
+
+    async def run():
+        with pytest.raises(ConnectionError):
+            await provider.call(upstream)
+        # Two retries spent the reserve; the next failure is not retried
+        assert upstream.calls == 3
+
+        with pytest.raises(ConnectionError):
+            await provider.call(upstream)
+        assert upstream.calls == 4
+
+    asyncio.run(run())
+    assert provider.retries == 2
+
+
+def test_successes_refill_the_retry_budget():
+    provider = make_provider(retry_ratio=0.5, retry_reserve=1)
+    provider.budget.balance = 0.0
+
+    async def run():
+        for _ in range(2):
+            await provider.call(Upstream(fail=False))
+
+    asyncio.run(run())
+    assert provider.budget.withdraw()
@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+import server.utils.telegram_dispatcher as dispatcher_module
+from server.utils.telegram_dispatcher import TelegramDispatcher
+
+
+def use_responses(monkeypatch, responses):
+    """Serve the queued (status, body) pairs and record request times per chat"""
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append((time.monotonic(), request.read()))
+        status_code, body = responses.pop(0) if responses else (200, {"ok": True, "result": {}})
+        return httpx.Response(status_code, json=body)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(dispatcher_module, "_http_client", client)
+    return sent
+
+
+@pytest.fixture(autouse=True)
+def fast_chats(monkeypatch):
+    # A pause empties the bucket; refill quickly once it ends
+    monkeypatch.setattr(dispatcher_module, "TELEGRAM_CHAT_RATE", 50.0)
+
+
+RATE_LIMITED = (429, {"ok": False, "error_code": 429, "parameters": {"retry_after": 0.2}})
+
+
+def test_429_pauses_the_bot_for_retry_after_and_retries(monkeypatch):
+    sent = use_responses(monkeypatch, [RATE_LIMITED])
+    dispatcher = TelegramDispatcher()
+
+    async def run():
+        started = time.monotonic()
+        result = await dispatcher.send("token", "sendMessage", 1, {"chat_id": 1, "text": "hi"})
+        assert result["ok"]
+
+        # The retry waited out retry_after
+        assert len(sent) == 2
+        assert sent[1][0] - started >= 0.2
+
+        # The chat had tokens left, so the whole bot was paused
+        assert dispatcher._bot_bucket("token").paused_until >= started + 0.2
+
+    asyncio.run(run())
+    assert dispatcher.rate_limited == 1
+    assert dispatcher.retries == 1
+
+
+def test_other_chats_wait_while_the_bot_is_paused(monkeypatch):
+    sent = use_responses(monkeypatch, [RATE_LIMITED])
+    dispatcher = TelegramDispatcher()
+
+    async def run():
+        started = time.monotonic()
+        first = asyncio.create_task(dispatcher.send("token", "sendMessage", 1, {"chat_id": 1, "text": "a"}))
+        await asyncio.sleep(0.05)
+        await dispatcher.send("token", "sendMessage", 2, {"chat_id": 2, "text": "b"})
+        assert time.monotonic() - started >= 0.2
+        assert (await first)["ok"]
+
+    asyncio.run(run())
+    assert len(sent) == 3
+
+
+def test_chat_over_its_own_limit_pauses_only_the_chat(monkeypatch):
+    use_responses(monkeypatch, [RATE_LIMITED])
+    dispatcher = TelegramDispatcher()
+
+    async def run():
+        chat_bucket = dispatcher._chat_bucket("token", 1)
+        chat_bucket.tokens = 1.0
+        chat_bucket.rate = 0.001
+
+        # The send takes the chat's last token, so the 429 was the chat's own
+        task = asyncio.create_task(dispatcher.send("token", "sendMessage", 1, {"chat_id": 1, "text": "a"}))
+        await asyncio.sleep(0.05)
+
+        assert dispatcher._bot_bucket("token").paused_until == 0.0
+        assert chat_bucket.paused_until > time.monotonic()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())